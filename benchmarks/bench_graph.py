@@ -0,0 +1,43 @@
+"""
+End-to-end graph overhead with a stubbed LLM.
+
+The LLM is replaced by tests.fakes.FakeLLMClient, so the timings measure
+only what the pipeline itself costs per task: graph construction, state
+handling, routing, tracing hooks and test execution.
+"""
+
+from benchmarks.harness import measure
+from src.agents.llm import Architecture
+from src.graph import nodes
+from src.graph.graph import build_graph, run_graph
+from tests.fakes import FakeLLMClient
+
+
+_TASK = dict(
+    task_description="Echo the input line.",
+    test_inputs=["1\n", "2\n", "3\n"],
+    test_outputs=["1\n", "2\n", "3\n"],
+)
+
+
+def run(quick: bool = False) -> dict:
+    repeat = 3 if quick else 10
+    results = {"build_graph": measure(build_graph, repeat=repeat)}
+
+    original = nodes.get_llm_client
+    try:
+        for label, client in [
+            ("passing", FakeLLMClient(story_points=1)),
+            ("escalating_s_m_l", FakeLLMClient(story_points=1, code="print(0)")),
+        ]:
+            nodes.get_llm_client = lambda *args, client=client, **kwargs: client
+            for architecture in (Architecture.A, Architecture.C):
+                results[f"run_graph.{architecture.value}.{label}"] = measure(
+                    lambda architecture=architecture: run_graph(
+                        task_id="bench_graph", architecture=architecture, **_TASK
+                    ),
+                    repeat=repeat,
+                )
+    finally:
+        nodes.get_llm_client = original
+    return results
@@ -0,0 +1,53 @@
+"""Benchmarks of LLMClient._extract_first_json_object on typical model outputs."""
+
+import json
+
+from benchmarks.harness import measure
+from src.agents.client import LLMClient
+
+
+_SOLUTION = """import sys
+from collections import defaultdict
+
+def main():
+    data = sys.stdin.read().split()
+    n = int(data[0])
+    counts = defaultdict(int)
+    for token in data[1:n + 1]:
+        counts[token] += 1
+    best = max(counts.items(), key=lambda kv: (kv[1], kv[0]))
+    print(f"{best[0]} {{count: {best[1]}}}")
+
+main()
+"""
+
+# Shapes seen in model responses: bare JSON, fenced JSON, JSON surrounded
+# by prose, and code with braces/escaped quotes inside JSON strings.
+OUTPUTS = {
+    "planner_bare": json.dumps({
+        "id": "apps_1", "story_points": 3,
+        "rationale": "Needs a hash map and a single pass; moderate edge cases.",
+    }),
+    "planner_fenced": "```json\n" + json.dumps({
+        "id": "apps_2", "story_points": 5, "rationale": "Dynamic programming over subsets.",
+    }, indent=2) + "\n```",
+    "developer_code": json.dumps({"generated_code": _SOLUTION}),
+    "reviewer_with_prose": (
+        "Here is my review of the code.\n\n"
+        + json.dumps({"feedback": "Handles empty input; {edge} cases ok.", "reviewed_code": _SOLUTION * 3})
+        + "\n\nLet me know if you need anything else."
+    ),
+    "developer_long": json.dumps({"generated_code": _SOLUTION * 40}),
+}
+
+
+def run(quick: bool = False) -> dict:
+    extract = LLMClient._extract_first_json_object
+    number = 20 if quick else 500
+    results = {}
+    for name, text in OUTPUTS.items():
+        extract(text)  # fail loudly if a sample does not parse
+        stats = measure(lambda text=text: extract(text), number=number, repeat=3 if quick else 7)
+        stats["chars"] = len(text)
+        results[name] = stats
+    return results
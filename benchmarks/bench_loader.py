@@ -0,0 +1,86 @@
+"""
+Benchmarks of APPSTaskLoader on a synthetic local Arrow cache.
+
+The cache has the layout written by build_local_cache(), so no network
+access or HuggingFace download is needed.
+"""
+
+import json
+import os
+import random
+import tempfile
+
+import pyarrow as pa
+
+from benchmarks.harness import measure
+from src.data.task_loader import APPSTaskLoader, LOCAL_CACHE_SCHEMA
+
+
+DIFFICULTIES = ["introductory", "interview", "competition"]
+
+
+def _write_cache(directory: str, num_tasks: int, cases_per_task: int) -> None:
+    rows = [
+        {
+            "problem_id": problem_id,
+            "question": f"Question {problem_id} " + "lorem ipsum " * 100,
+            "difficulty": DIFFICULTIES[problem_id % 3],
+            "inputs": [f"{problem_id} {case}\n" for case in range(cases_per_task)],
+            "outputs": [f"{case}\n" for case in range(cases_per_task)],
+            "starter_code": "",
+        }
+        for problem_id in range(num_tasks)
+    ]
+    path = os.path.join(directory, "apps_test.arrow")
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, LOCAL_CACHE_SCHEMA) as writer:
+            writer.write_table(pa.Table.from_pylist(rows, schema=LOCAL_CACHE_SCHEMA))
+
+
+def _raw_item(problem_id: int, cases: int) -> dict:
+    return {
+        "problem_id": problem_id,
+        "question": "Question",
+        "difficulty": "interview",
+        "input_output": json.dumps({
+            "inputs": [f"{case}\n" * 50 for case in range(cases)],
+            "outputs": [f"{case}\n" for case in range(cases)],
+        }),
+        "starter_code": "",
+    }
+
+
+def run(quick: bool = False) -> dict:
+    num_tasks = 500 if quick else 5000
+    repeat = 3 if quick else 5
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="bench_loader_") as directory:
+        _write_cache(directory, num_tasks, cases_per_task=20)
+
+        def open_and_index():
+            loader = APPSTaskLoader(cache_dir=directory)
+            return loader.index
+
+        results["open_and_index"] = measure(open_and_index, repeat=repeat)
+        results["open_and_index"]["tasks"] = num_tasks
+
+        loader = APPSTaskLoader(cache_dir=directory)
+        ids = random.Random(0).sample(range(num_tasks), 100)
+        results["get_task.100_random"] = measure(
+            lambda: [loader.get_task(problem_id) for problem_id in ids], repeat=repeat
+        )
+        results["get_task_and_read_cases.100_random"] = measure(
+            lambda: [list(iter(loader.get_task(problem_id).inputs)) for problem_id in ids], repeat=repeat
+        )
+        results["load_balanced.per_level_50"] = measure(
+            lambda: loader.load_balanced(per_level=50, seed=0), repeat=repeat
+        )
+        loader._table = None  # release the memory map before the directory is removed
+
+    parse_loader = APPSTaskLoader(cache_dir=tempfile.gettempdir())
+    item = _raw_item(1, cases=200)
+    results["parse_task.200_cases"] = measure(
+        lambda: parse_loader._parse_task(item), number=20 if quick else 200, repeat=repeat
+    )
+    return results
@@ -0,0 +1,67 @@
+"""
+Startup cost of the entry points, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter; the benchmark reports the
+cumulative import time of the module itself and which heavy third-party
+packages ended up imported. A Tester-only worker (src.graph.nodes) and
+the CLI should not import any of HEAVY_MODULES.
+"""
+
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "main",
+    "src.graph.graph",
+    "src.graph.nodes",
+    "src.data.task_loader",
+    "src.evaluation.results",
+    "src.agents.client",
+]
+
+HEAVY_MODULES = ["datasets", "huggingface_hub", "langgraph", "langchain_core", "pydantic", "pandas", "pyarrow"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_cost(module: str) -> tuple[float, list[str]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        (cumulative import time of the module in ms, heavy modules loaded)
+    """
+    code = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(3) == module and not match.group(2):
+            cumulative_us = int(match.group(1))
+    return cumulative_us / 1000, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(quick: bool = False) -> dict:
+    repeat = 2 if quick else 5
+    results = {}
+    for module in MODULES:
+        samples, heavy = [], []
+        for _ in range(repeat):
+            milliseconds, heavy = import_cost(module)
+            samples.append(milliseconds)
+        results[module] = {
+            "repeat": repeat,
+            "min_ms": round(min(samples), 2),
+            "median_ms": round(statistics.median(samples), 2),
+            "heavy_modules": heavy,
+        }
+    return results
@@ -0,0 +1,50 @@
+"""Benchmarks of test execution: _execute_code and tester_node on synthetic programs."""
+
+from benchmarks.harness import measure
+from src.data.case_store import get_case_store
+from src.graph import nodes
+from src.graph.state import create_initial_state
+
+
+PROGRAMS = {
+    "echo": "print(input())",
+    "sum_numbers": "print(sum(map(int, input().split())))",
+    "cpu_loop": "n = int(input())\nprint(sum(i * i for i in range(n)))",
+}
+
+_INPUTS = {
+    "echo": "hello\n",
+    "sum_numbers": " ".join(str(i) for i in range(1000)) + "\n",
+    "cpu_loop": "200000\n",
+}
+
+
+def _tester_state(cases: int):
+    inputs = [f"{i}\n" for i in range(cases)]
+    task_id = f"bench_tester_{cases}"
+    state = create_initial_state(
+        task_id=task_id,
+        task_description="Echo the input line.",
+        test_ref=get_case_store().put(task_id, inputs, inputs),
+    )
+    state["reviewed_code"] = PROGRAMS["echo"]
+    return state
+
+
+def run(quick: bool = False) -> dict:
+    repeat = 3 if quick else 5
+    results = {}
+    for name, code in PROGRAMS.items():
+        stdin = _INPUTS[name]
+        results[f"execute_code.{name}"] = measure(
+            lambda code=code, stdin=stdin: nodes._execute_code(code, stdin), repeat=repeat
+        )
+
+    for cases in ([5] if quick else [5, 20]):
+        state = _tester_state(cases)
+        stats = measure(lambda: nodes.tester_node(state), repeat=repeat)
+        stats["cases"] = cases
+        stats["cases_per_sec"] = round(cases * stats["ops_per_sec"], 2)
+        results[f"tester_node.{cases}_cases"] = stats
+        get_case_store().release(state["test_ref"])
+    return results
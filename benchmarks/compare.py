@@ -0,0 +1,64 @@
+"""
+Compare two benchmark reports written by benchmarks.run.
+
+Usage:
+    python -m benchmarks.compare OLD.json NEW.json [--threshold 0.10]
+
+Prints the median time of every benchmark in both reports and flags
+changes larger than the threshold. Exits with status 1 if any benchmark
+regressed, so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _medians(report: dict) -> dict[str, float]:
+    return {
+        f"{suite}.{name}": stats["median_ms"]
+        for suite, benchmarks in report["results"].items()
+        for name, stats in benchmarks.items()
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 0.10) -> list[tuple[str, float, float, float, str]]:
+    """
+    Returns:
+        (benchmark, old median ms, new median ms, relative change, flag) for
+        every benchmark present in both reports. The flag is "slower" or
+        "faster" when the change exceeds the threshold, else "".
+    """
+    old_medians, new_medians = _medians(old), _medians(new)
+    rows = []
+    for name in sorted(old_medians.keys() & new_medians.keys()):
+        before, after = old_medians[name], new_medians[name]
+        change = (after - before) / before if before else 0.0
+        flag = "slower" if change > threshold else "faster" if change < -threshold else ""
+        rows.append((name, before, after, change, flag))
+    return rows
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change to flag (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    regressed = False
+    print(f"{'benchmark':<55} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    for name, before, after, change, flag in compare(old, new, args.threshold):
+        regressed = regressed or flag == "slower"
+        label = {"slower": "  SLOWER", "faster": "  faster"}.get(flag, "")
+        print(f"{name:<55} {before:>10.3f} {after:>10.3f} {change:>+7.1%}{label}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
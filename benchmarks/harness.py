@@ -0,0 +1,46 @@
+"""
+Minimal timing harness shared by the benchmark modules.
+
+Each benchmark is a zero-argument callable timed `repeat` times, `number`
+calls per repeat; results are reported per call.
+"""
+
+import statistics
+import time
+from typing import Callable
+
+
+def measure(fn: Callable[[], object], number: int = 1, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Time a callable.
+
+    Args:
+        fn: Code under test.
+        number: Calls per timed repeat (use > 1 for sub-millisecond code).
+        repeat: Number of timed repeats.
+        warmup: Untimed calls made first (imports, caches).
+
+    Returns:
+        Per-call timings in milliseconds: min, median, mean, max, plus
+        calls per second based on the median.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+
+    median = statistics.median(samples)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "ops_per_sec": round(1000 / median, 2) if median else None,
+    }
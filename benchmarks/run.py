@@ -0,0 +1,85 @@
+"""
+Run the offline benchmark suite and write the results as JSON.
+
+Usage:
+    python -m benchmarks.run                      # all suites
+    python -m benchmarks.run --suite json graph   # selected suites
+    python -m benchmarks.run --quick              # fewer iterations (CI smoke run)
+
+Results go to benchmarks/results/<commit>.json by default, so runs of
+different commits can be compared:
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import bench_graph, bench_json, bench_loader, bench_startup, bench_tester
+
+
+SUITES = {
+    "json": bench_json,
+    "tester": bench_tester,
+    "loader": bench_loader,
+    "graph": bench_graph,
+    "startup": bench_startup,
+}
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suites(names: list[str], quick: bool = False) -> dict:
+    """Run benchmark suites; returns the JSON-serializable report."""
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": {},
+    }
+    for name in names:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        report["results"][name] = SUITES[name].run(quick=quick)
+    return report
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations")
+    parser.add_argument("--output", help="JSON output file (default: benchmarks/results/<commit>.json, '-' for stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_suites(args.suite, quick=args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+        return 0
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"Wrote {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,348 @@
+"""
+Experiment runner.
+
+Runs APPS tasks through the graph for one or more architectures and streams
+one JSONL record per task (schema in docs/evaluation.md) to a results file.
+
+Examples:
+    # 5 tasks per difficulty, architectures B and C, 4 tasks in parallel
+    python main.py run --architecture B C --per-level 5 --concurrency 4
+
+    # Resume an interrupted sweep (skips recorded tasks, resumes checkpoints)
+    python main.py run --architecture C --per-level 50 --resume
+
+    # Same command on every node of a cluster, coordinated by a shared queue
+    python main.py run --architecture C --per-level 300 --queue /shared/queue.sqlite \\
+        --output results/run.$(hostname).jsonl
+
+    # Merge per-shard / per-node results
+    python main.py merge results/run.jsonl results/run.*.jsonl
+
+    # Evaluation tables (docs/evaluation.md) of everything in results/
+    python main.py metrics results/
+
+    # Train the learned router on past C runs (use with ROUTER_MODEL=results/router.json)
+    python main.py train-router results/ --model results/router.json
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from src.utils.env import load_env
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def main():
-    # TODO
-    pass 
+DEFAULT_OUTPUT = os.path.join("results", "results.jsonl")
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run APPS sweeps over the A/B/C architectures."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run tasks through the graph")
+    run.add_argument("--architecture", nargs="+", default=["C"], choices=["A", "B", "C"],
+                     help="Architectures to run every task with (default: C)")
+    run.add_argument("--split", default="test", help="APPS split (default: test)")
+
+    selection = run.add_argument_group("task selection")
+    selection.add_argument("--task-ids", nargs="+", type=int, metavar="PROBLEM_ID",
+                           help="Run these APPS problem ids")
+    selection.add_argument("--difficulty", choices=["introductory", "interview", "competition"],
+                           help="Run tasks of one difficulty (with --limit)")
+    selection.add_argument("--limit", type=int, default=5,
+                           help="Number of tasks for --difficulty (default: 5)")
+    selection.add_argument("--per-level", type=int, default=5,
+                           help="Tasks per difficulty for a balanced set (default: 5)")
+    selection.add_argument("--seed", type=int, help="Sample tasks reproducibly instead of in dataset order")
+    selection.add_argument("--shard", metavar="I/N", help="Only run shard I of N (e.g. 0/4)")
+
+    execution = run.add_argument_group("execution")
+    execution.add_argument("--concurrency", type=int, default=None,
+                           help="Number of task threads (default: 1, or enough to fill both stages "
+                                "with --staged)")
+    execution.add_argument("--staged", action="store_true",
+                           help="Run LLM calls and test executions in separate bounded stages "
+                                "(LLM_CONCURRENCY, TEST_WORKERS) and admit tasks at their pace")
+    execution.add_argument("--output", default=DEFAULT_OUTPUT,
+                           help=f"JSONL results file, appended to (default: {DEFAULT_OUTPUT})")
+    execution.add_argument("--resume", action="store_true",
+                           help="Skip tasks already in --output and resume checkpointed runs")
+    execution.add_argument("--checkpoint-db", help="SQLite checkpoint file (enables checkpointing)")
+    execution.add_argument("--queue", help="SQLite work queue shared by several workers/nodes")
+    execution.add_argument("--worker-id", help="Worker id recorded on queue leases (default: host-pid)")
+    execution.add_argument("--trace", help="Write a Chrome/Perfetto trace to this file")
+    execution.add_argument("--artifacts",
+                           help="Record every attempt (code, feedback, test results) in this SQLite store")
+    execution.add_argument("--run-id",
+                           help="Run id of the attempts in --artifacts; reuse it to resume a sweep "
+                                "(default: ARTIFACT_RUN_ID or a new id)")
+    execution.add_argument("--log-file", help="Also write logs to this file")
+
+    merge = commands.add_parser("merge", help="Merge per-shard JSONL results")
+    merge.add_argument("output", help="Merged JSONL file")
+    merge.add_argument("inputs", nargs="+", help="Shard result files (later files win)")
+
+    metrics = commands.add_parser("metrics", help="Print the evaluation tables of a results directory")
+    metrics.add_argument("sources", nargs="*", default=["results"], help="Result files or directories (default: results)")
+    metrics.add_argument("--quality", action="store_true",
+                         help="Also compute code quality metrics (radon/pylint/flake8, cached)")
+
+    commands.add_parser("build-cache", help="Build the local Arrow cache of APPS tasks")
+
+    router = commands.add_parser("train-router", help="Train the learned router on result records")
+    router.add_argument("sources", nargs="*", default=["results"], help="Result files or directories (default: results)")
+    router.add_argument("--model", default=os.path.join("results", "router.json"),
+                        help="Where to save the model (default: results/router.json)")
+    router.add_argument("--architecture", default="C", choices=["B", "C"],
+                        help="Architecture whose runs are learned from (default: C)")
+    router.add_argument("--confidence", type=float, default=None,
+                        help="Threshold for the accuracy report (default: ROUTER_CONFIDENCE or 0.8)")
+
+    return parser.parse_args(argv)
+
+
+def select_tasks(loader, args: argparse.Namespace) -> list:
+    """Resolve the task selection arguments into a list of Task objects."""
+    from src.data.work_queue import shard_tasks
+
+    if args.task_ids:
+        tasks = [task for task in map(loader.get_task, args.task_ids) if task is not None]
+    elif args.difficulty:
+        tasks = loader.load_by_difficulty(args.difficulty, limit=args.limit, seed=args.seed)
+    else:
+        tasks = loader.load_balanced(per_level=args.per_level, seed=args.seed)
+
+    if args.shard:
+        index, count = (int(part) for part in args.shard.split("/"))
+        tasks = shard_tasks(tasks, index, count)
+    return tasks
+
+
+def run_sweep(args: argparse.Namespace) -> int:
+    """Run the selected tasks; returns the number of failed (crashed) runs."""
+    from src.agents.llm import Architecture
+    from src.data.task_loader import APPSTaskLoader
+    from src.evaluation.results import ResultsWriter, build_record, recorded_keys
+    from src.graph.graph import run_graph
+    from src.utils.scheduler import enable_scheduler, get_scheduler
+
+    if args.log_file:
+        setup_logger(__name__, log_file=args.log_file)
+    if args.trace:
+        from src.utils.tracing import enable_tracing
+        enable_tracing(args.trace)
+    if args.artifacts:
+        from src.evaluation.artifacts import enable_artifact_store
+        store = enable_artifact_store(args.artifacts, run_id=args.run_id)
+        logger.info("Recording attempts in %s under run id %s", args.artifacts, store.run_id)
+
+    if args.staged:
+        enable_scheduler()
+    scheduler = get_scheduler()
+    if args.concurrency is None:
+        args.concurrency = scheduler.max_in_flight if scheduler is not None else 1
+    if scheduler is not None:
+        logger.info(
+            "Staged scheduler: %d LLM slots, %d test workers, up to %d tasks in flight, %d task threads",
+            scheduler.stages["llm"].capacity, scheduler.stages["cpu"].capacity,
+            scheduler.max_in_flight, args.concurrency,
+        )
+    admit = scheduler.admit if scheduler is not None else nullcontext
+
+    checkpointer = None
+    if args.checkpoint_db or args.resume:
+        from src.graph.checkpoint import get_checkpointer
+        checkpointer = get_checkpointer(args.checkpoint_db)
+
+    loader = APPSTaskLoader(split=args.split)
+    tasks = select_tasks(loader, args)
+    architectures = [Architecture(value) for value in args.architecture]
+
+    done = recorded_keys(args.output) if args.resume else set()
+    errors = 0
+    errors_lock = threading.Lock()
+
+    def run_task(task, architecture) -> bool:
+        nonlocal errors
+        logger.info("Running %s (%s) with architecture %s", task.task_id, task.difficulty, architecture.value)
+        start = time.time()
+        try:
+            state = run_graph(
+                task_id=task.task_id,
+                task_description=task.question,
+                test_inputs=task.inputs,
+                test_outputs=task.outputs,
+                architecture=architecture,
+                checkpointer=checkpointer,
+                resume=args.resume,
+                difficulty=task.difficulty,
+            )
+        except Exception as e:
+            logger.exception("Task %s (%s) crashed", task.task_id, architecture.value)
+            writer.write(build_record(task, architecture.value, None, time.time() - start, error=str(e)))
+            with errors_lock:
+                errors += 1
+            return False
+
+        record = build_record(task, architecture.value, state, time.time() - start)
+        writer.write(record)
+        logger.info(
+            "Finished %s (%s) | status=%s tier=%s escalations=%s elapsed=%.1fs",
+            task.task_id, architecture.value, record["status"],
+            record["developer_tier_final"], record["escalations"], record["execution_time_seconds"],
+        )
+        return True
+
+    with ResultsWriter(args.output) as writer:
+        if args.queue:
+            run_from_queue(args, loader, tasks, architectures, done, run_task, admit)
+        else:
+            jobs = [
+                (task, architecture)
+                for task in tasks
+                for architecture in architectures
+                if (task.task_id, architecture.value) not in done
+            ]
+            logger.info("%d runs to do (%d already recorded)", len(jobs), len(tasks) * len(architectures) - len(jobs))
+            with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="task") as pool:
+                if scheduler is None:
+                    list(pool.map(lambda job: run_task(*job), jobs))
+                else:
+                    # Blocks once max_in_flight tasks are submitted (backpressure)
+                    for job in jobs:
+                        scheduler.submit(pool, run_task, *job)
+
+    if scheduler is not None:
+        for name, stats in scheduler.stats().items():
+            logger.info("Stage %s: %s", name, ", ".join(f"{key}={value}" for key, value in stats.items()))
+    logger.info("Results written to %s", args.output)
+    return errors
+
+
+def run_from_queue(args, loader, tasks, architectures, done, run_task, admit) -> None:
+    """
+    Enqueue the selection (idempotent) and process leased items until the
+    queue is drained. Every node can run the exact same command.
+    """
+    from src.agents.llm import Architecture
+    from src.data.work_queue import WorkQueue
+
+    queue = WorkQueue(args.queue)
+    added = queue.enqueue(tasks, [a.value for a in architectures])
+    logger.info("Queue %s: %d new items, status %s", args.queue, added, queue.counts())
+
+    worker_prefix = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    def worker(slot: int) -> None:
+        worker_id = f"{worker_prefix}-{slot}"
+        while True:
+            # Lease only once admitted, so a waiting worker holds no lease
+            with admit():
+                item = queue.lease(worker_id)
+                if item is None:
+                    return
+                task = loader.get_task(item.problem_id)
+                if task is None:
+                    updated = queue.fail(item, "task not found")
+                elif (item.task_id, item.architecture) in done:
+                    updated = queue.complete(item)
+                elif run_task(task, Architecture(item.architecture)):
+                    updated = queue.complete(item)
+                else:
+                    updated = queue.fail(item, "run crashed, see worker log")
+            if not updated:
+                logger.warning("Lease of %s (%s) expired before it finished; "
+                               "the item belongs to another worker now", item.task_id, item.architecture)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="worker") as pool:
+        list(pool.map(worker, range(args.concurrency)))
+
+    logger.info("Queue drained: %s", queue.counts())
+    queue.close()
+
+
+def train_router(args: argparse.Namespace) -> int:
+    """Evaluate the learned router against the Planner, then train and save it."""
+    from src.evaluation.metrics import ResultsAggregator
+    from src.evaluation.results import read_results
+    from src.graph.config import get_router_confidence
+    from src.graph.learned_router import LearnedRouter, evaluate, training_examples
+
+    records = {}
+    for path in ResultsAggregator(args.sources).files:
+        for record in read_results(path):
+            records[(record["task_id"], record["architecture"])] = record
+    features, labels, planner_tiers = training_examples(records.values(), architecture=args.architecture)
+    if len(labels) < 10:
+        logger.error("Only %d usable %s records (need task_features): not training", len(labels), args.architecture)
+        return 1
+
+    confidence = args.confidence if args.confidence is not None else get_router_confidence()
+    report = evaluate(features, labels, planner_tiers, confidence=confidence)
+    print("\n".join(f"{key}: {value}" for key, value in report.items()))
+
+    start = time.perf_counter()
+    LearnedRouter.fit(features, labels).save(args.model)
+    logger.info("Trained on %d tasks in %.1f ms, saved to %s",
+                len(labels), (time.perf_counter() - start) * 1000, args.model)
+    return 0
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    load_env()
+
+    if args.command == "merge":
+        from src.evaluation.results import merge_results
+        count = merge_results(args.inputs, args.output)
+        logger.info("Merged %d records into %s", count, args.output)
+        return 0
+
+    if args.command == "metrics":
+        from src.evaluation.metrics import ResultsAggregator
+        aggregator = ResultsAggregator(args.sources)
+        for title, table in [
+            ("Summary", aggregator.summary()),
+            ("Pass rate by difficulty", aggregator.pass_rate_by_difficulty()),
+            ("Initial tier distribution", aggregator.tier_distribution()),
+            ("Escalation patterns", aggregator.escalation_patterns()),
+            ("Routing", aggregator.routing_summary()),
+            ("Story points by difficulty", aggregator.story_point_accuracy()),
+            ("Retries", aggregator.retry_distribution()),
+        ]:
+            print(f"\n=== {title} ===\n{table.to_string()}")
+
+        if args.quality:
+            from src.evaluation.code_quality import QualityCache, quality_table
+            from src.evaluation.results import read_results
+            records = {}
+            for path in aggregator.files:
+                for record in read_results(path):
+                    records[(record["task_id"], record["architecture"])] = record
+            table = quality_table(records.values(), cache=QualityCache())
+            summary = table.groupby(["architecture", "solution"]).mean(numeric_only=True)
+            print(f"\n=== Code quality ===\n{summary.to_string()}")
+        return 0
+
+    if args.command == "train-router":
+        return train_router(args)
+
+    if args.command == "build-cache":
+        from src.data.task_loader import APPSTaskLoader
+        APPSTaskLoader().build_local_cache()
+        return 0
+
+    return 1 if run_sweep(args) else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
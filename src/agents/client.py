@@ -1,10 +1,9 @@
 import json
 import os
 import re
+from functools import partial
 from typing import TypeVar
-from dotenv import load_dotenv
 from pydantic import BaseModel
-from huggingface_hub import InferenceClient
 from src.models.llm_responses import PlannerResponse, DeveloperResponse, ReviewerResponse
 from src.models.prompts import (
     PLANNER_SYSTEM_PROMPT,
@@ -16,8 +15,13 @@ from src.models.prompts import (
     REVIEWER_USER_PROMPT,
 )
 from src.agents.llm import Architecture, get_architecture, get_models
-
-load_dotenv()
+from src.agents.hedging import get_hedger
+from src.agents.local_backend import get_local_model
+from src.agents.token_budget import DEFAULT_MAX_TOKENS, get_token_budgets
+from src.agents.usage import allowance_exhausted, record_llm_call
+from src.utils.env import load_env
+from src.utils.scheduler import stage_slot
+from src.utils.tracing import span
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -30,20 +34,96 @@ class LLMClient:
     """
     
     def __init__(self, architecture: Architecture = None):
+        # huggingface_hub is slow to import; only pay for it when a client is built
+        from huggingface_hub import InferenceClient
+
+        load_env()
         self.hf_token = os.getenv("HF_TOKEN")
         self.architecture = architecture or get_architecture()
         self.models = get_models(self.architecture)
         self._client = InferenceClient(token=self.hf_token)
     
-    def _invoke_chat(self, model_name: str, messages: list[dict], temperature: float = 0.0) -> str:
-        """Invoke model using chat completion API which handles routing correctly."""
-        response = self._client.chat_completion(
+    def _complete(
+        self,
+        model_name: str,
+        messages: list[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> tuple[str, str, int]:
+        """One chat completion: (text, finish_reason, completion_tokens)."""
+        local_model = get_local_model(model_name)
+        if local_model is not None:
+            with stage_slot("llm"), span("llm.local_generate", category="llm", model=model_name, max_tokens=max_tokens):
+                completion = local_model.chat(messages, max_tokens=max_tokens, temperature=temperature)
+            record_llm_call(
+                prompt_tokens=completion.prompt_tokens,
+                completion_tokens=completion.completion_tokens,
+            )
+            return completion.text, completion.finish_reason, completion.completion_tokens
+
+        request = partial(
+            self._client.chat_completion,
             model=model_name,
             messages=messages,
-            max_tokens=2048,
+            max_tokens=max_tokens,
             temperature=temperature if temperature > 0 else 0.01,  # Avoid exact 0
         )
-        return response.choices[0].message.content
+        hedger = get_hedger()
+        if hedger:
+            # Each request of a hedged call, the duplicate too, takes its own LLM stage slot
+            with span("llm.chat_completion", category="llm", model=model_name, max_tokens=max_tokens):
+                response = hedger.call(
+                    model_name, request,
+                    charge_duplicate=self._record_usage,
+                    slot=partial(stage_slot, "llm"),
+                )
+        else:
+            with stage_slot("llm"), span("llm.chat_completion", category="llm", model=model_name, max_tokens=max_tokens):
+                response = request()
+        self._record_usage(response)
+        usage = response.usage
+        choice = response.choices[0]
+        return choice.message.content, choice.finish_reason, usage.completion_tokens if usage else 0
+
+    @staticmethod
+    def _record_usage(response) -> None:
+        """Charge the tokens of a chat completion response to the current task."""
+        usage = response.usage
+        record_llm_call(
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    def _invoke_chat(
+        self,
+        model_name: str,
+        messages: list[dict],
+        temperature: float = 0.0,
+        role: str = "default"
+    ) -> str:
+        """
+        Invoke model using chat completion API which handles routing correctly.
+
+        max_tokens comes from the adaptive budget of the role on this model
+        (src/agents/token_budget.py). A completion cut off by the budget in
+        the middle of its JSON object is retried once with a larger budget,
+        unless the task budget is already spent.
+        """
+        budgets = get_token_budgets()
+        max_tokens = budgets.budget(role, model_name) if budgets else DEFAULT_MAX_TOKENS
+        text, finish_reason, completion_tokens = self._complete(model_name, messages, temperature, max_tokens)
+        if finish_reason != "length":
+            if budgets:
+                budgets.record(role, model_name, completion_tokens)
+            return text
+
+        retry_tokens = budgets.retry_budget(max_tokens) if budgets else None
+        if retry_tokens is None or allowance_exhausted() or not self._is_truncated_json(text):
+            return text
+        text, finish_reason, completion_tokens = self._complete(model_name, messages, temperature, retry_tokens)
+        if finish_reason != "length":
+            budgets.record(role, model_name, completion_tokens)
+        return text
 
     @staticmethod
     def _messages_to_prompt(messages: list[dict]) -> str:
@@ -70,9 +150,15 @@ class LLMClient:
             return f"USER:\n{user_block}\n\nASSISTANT:\n"
         return f"SYSTEM:\n{system_block}\n\nASSISTANT:\n"
 
-    def _invoke_text(self, model_name: str, messages: list[dict], temperature: float = 0.0) -> str:
+    def _invoke_text(
+        self,
+        model_name: str,
+        messages: list[dict],
+        temperature: float = 0.0,
+        role: str = "default"
+    ) -> str:
         """Invoke model - now uses chat completion API for better compatibility."""
-        return self._invoke_chat(model_name, messages, temperature)
+        return self._invoke_chat(model_name, messages, temperature, role=role)
 
     @staticmethod
     def _extract_first_json_object(text: str) -> dict:
@@ -133,6 +219,15 @@ class LLMClient:
                 data["story_points"] = int(sp)
 
         return data
+
+    @classmethod
+    def _is_truncated_json(cls, text: str) -> bool:
+        """True if the response does not contain a complete JSON object."""
+        try:
+            cls._extract_first_json_object(text)
+        except ValueError:  # includes json.JSONDecodeError
+            return True
+        return False
     
     # NOTE:
     # LangChain's `with_structured_output()` typically relies on provider-specific
@@ -163,7 +258,7 @@ class LLMClient:
             {"role": "user", "content": user_prompt},
         ]
 
-        text = self._invoke_text(self.models["planner"], messages, temperature=0.0)
+        text = self._invoke_text(self.models["planner"], messages, temperature=0.0, role="planner")
         data = self._extract_first_json_object(text)
         return PlannerResponse.model_validate(data)
     
@@ -208,7 +303,7 @@ class LLMClient:
             {"role": "user", "content": prompt},
         ]
 
-        text = self._invoke_text(self.models["developer_" + developer_tier.lower()], messages, temperature=0.0)
+        text = self._invoke_text(self.models["developer_" + developer_tier.lower()], messages, temperature=0.0, role="developer")
         try:
             data = self._extract_first_json_object(text)
             return DeveloperResponse.model_validate(data)
@@ -237,7 +332,7 @@ class LLMClient:
             {"role": "user", "content": prompt},
         ]
 
-        text = self._invoke_text(self.models["baseline"], messages, temperature=0.0)
+        text = self._invoke_text(self.models["baseline"], messages, temperature=0.0, role="single_agent")
         try:
             data = self._extract_first_json_object(text)
             return DeveloperResponse.model_validate(data)
@@ -269,7 +364,7 @@ class LLMClient:
             {"role": "user", "content": user_prompt},
         ]
 
-        text = self._invoke_text(self.models["reviewer"], messages, temperature=0.0)
+        text = self._invoke_text(self.models["reviewer"], messages, temperature=0.0, role="reviewer")
         try:
             data = self._extract_first_json_object(text)
             return ReviewerResponse.model_validate(data)
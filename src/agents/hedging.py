@@ -0,0 +1,244 @@
+"""
+Hedged LLM requests.
+
+A few chat_completion calls to the shared endpoints take many times the
+median latency. With hedging enabled, a call that is still running after
+the per-model latency percentile (e.g. p95 of recent calls) gets a
+duplicate request; whichever returns first wins and the other is
+cancelled if it has not started yet, or abandoned (its response is
+ignored) if it is already in flight. An abandoned request is still paid
+for: the caller's charge_duplicate hook is called for it.
+
+Latencies, and the hedge delay, are measured from the moment a request
+starts running, so time spent waiting for a free worker thread does not
+count as model latency.
+
+Each request, the duplicate included, runs inside the caller's `slot`
+(the staged scheduler's "llm" stage), so hedging never exceeds the API
+concurrency limit. A duplicate still waiting for a slot when the other
+request succeeds is not sent at all, and not charged.
+
+Extra requests are capped: a call is only hedged while hedged calls stay
+below max_extra_rate of all calls, so a slow endpoint cannot double the
+load on itself. Until a model has min_samples latencies no call is hedged.
+
+Opt-in with LLM_HEDGING=1; tuned with LLM_HEDGE_PERCENTILE (95),
+LLM_HEDGE_MAX_EXTRA_RATE (0.1) and LLM_HEDGE_MIN_SAMPLES (20).
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Optional, TypeVar
+
+from src.utils.tracing import span
+
+
+R = TypeVar("R")
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MAX_EXTRA_RATE = 0.1
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 200
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies per model."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies[model].append(seconds)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        """q-th percentile of the recent latencies, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._latencies[model])
+        if len(samples) < self.min_samples:
+            return None
+        rank = (len(samples) - 1) * q / 100
+        low = int(rank)
+        high = min(low + 1, len(samples) - 1)
+        return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+class _Settlement:
+    """Shared by the requests of one call: none starts once one has succeeded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._settled = False
+
+    def begin(self, started: threading.Event) -> bool:
+        """Set `started` and return True, unless the call is already settled."""
+        with self._lock:
+            if self._settled:
+                return False
+            started.set()
+            return True
+
+    def settle(self) -> None:
+        with self._lock:
+            self._settled = True
+
+
+class Hedger:
+    """
+    Runs calls with a hedged duplicate after a latency percentile.
+
+    Args:
+        percentile: Latency percentile after which a call is hedged.
+        max_extra_rate: Upper bound of hedged calls / all calls.
+        tracker: Latency history (a new one by default).
+        max_workers: Threads running requests (primary and hedged).
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        max_extra_rate: float = DEFAULT_MAX_EXTRA_RATE,
+        tracker: LatencyTracker = None,
+        max_workers: int = 64
+    ):
+        self.percentile = percentile
+        self.max_extra_rate = max_extra_rate
+        self.tracker = tracker or LatencyTracker()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def _submit(
+        self,
+        model: str,
+        request: Callable[[], R],
+        slot: Callable[[], ContextManager],
+        settlement: _Settlement
+    ) -> Future:
+        """
+        Run request() on the pool inside slot().
+
+        The future's `started` event is set when the request begins. It
+        raises CancelledError instead if the call was settled while it
+        waited for its slot.
+        """
+        started = threading.Event()
+
+        def run() -> R:
+            with slot():
+                if not settlement.begin(started):
+                    raise CancelledError()
+                start = time.monotonic()
+                result = request()
+                settlement.settle()
+                self.tracker.record(model, time.monotonic() - start)
+            return result
+
+        future = self._executor.submit(run)
+        future.started = started
+        return future
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_extra_rate * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def call(
+        self,
+        model: str,
+        request: Callable[[], R],
+        charge_duplicate: Callable[[R], None] = None,
+        slot: Callable[[], ContextManager] = nullcontext
+    ) -> R:
+        """
+        Run request(), hedging it if it exceeds the model's latency percentile.
+
+        Args:
+            model: Model id (latencies are tracked per model).
+            request: Zero-argument function performing the call.
+            charge_duplicate: Called when the losing request had already
+                started: with its result if it is done, otherwise with the
+                winner's result as the estimate of what it costs.
+            slot: Context manager factory held by each request while it
+                runs, e.g. a stage slot bounding concurrent API requests.
+
+        Returns:
+            Result of the first attempt that succeeds.
+        """
+        with self._lock:
+            self.calls += 1
+        delay = self.tracker.percentile(model, self.percentile)
+        settlement = _Settlement()
+        primary = self._submit(model, request, slot, settlement)
+        if delay is None:
+            return primary.result()
+
+        primary.started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge():
+            return primary.result()
+
+        with span("llm.hedge", category="llm", model=model, after_seconds=round(delay, 3)):
+            hedge = self._submit(model, request, slot, settlement)
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = future.exception()
+                        continue
+                    result = future.result()
+                    for loser in pending:
+                        self._abandon(loser, result, charge_duplicate)
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return result
+            raise error
+
+    @staticmethod
+    def _abandon(loser: Future, winner_result: R, charge_duplicate: Optional[Callable[[R], None]]) -> None:
+        """Cancel a losing request, or charge it if it already started."""
+        # A loser that has not started by now never will: the call is settled
+        if loser.cancel() or not loser.started.is_set() or charge_duplicate is None:
+            return
+        if loser.done() and loser.exception() is None:
+            charge_duplicate(loser.result())
+        elif not loser.done():
+            charge_duplicate(winner_result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Process-wide Hedger if LLM_HEDGING is enabled, otherwise None."""
+    global _hedger
+    if os.getenv("LLM_HEDGING", "0").lower() not in ("1", "true", "yes"):
+        return None
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger(
+                percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", DEFAULT_PERCENTILE)),
+                max_extra_rate=float(os.getenv("LLM_HEDGE_MAX_EXTRA_RATE", DEFAULT_MAX_EXTRA_RATE)),
+                tracker=LatencyTracker(
+                    min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", DEFAULT_MIN_SAMPLES))
+                ),
+            )
+        return _hedger
@@ -2,6 +2,8 @@ import os
 from enum import Enum
 from typing import Literal
 
+from src.utils.env import load_env
+
 
 class Architecture(Enum):
     """Experimental architecture configurations."""
@@ -36,6 +38,7 @@ ARCHITECTURE_MODELS: dict[Architecture, dict[str, str]] = {
 
 def get_architecture() -> Architecture:
     """Get architecture from environment variable."""
+    load_env()
     arch_str = os.getenv("ARCHITECTURE", "C")
     return Architecture(arch_str)
 
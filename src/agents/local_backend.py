@@ -0,0 +1,272 @@
+"""
+Local inference backend for small models.
+
+Models listed in the LOCAL_MODELS env var (comma-separated Hugging Face
+ids, e.g. "Qwen/Qwen2.5-Coder-1.5B-Instruct") are run in-process with
+transformers instead of through the remote InferenceClient.
+
+Two optimizations make CPU inference practical for concurrent sweeps:
+- Batching: concurrent requests for the same model are queued and served
+  by one worker thread with a single padded generate() call, collecting
+  up to LOCAL_MAX_BATCH_SIZE requests for at most LOCAL_BATCH_WAIT_MS.
+- Prefix KV cache: every role sends the same system prompt(s), so the
+  key/value cache of the system-prompt prefix is computed once per model
+  and reused by every request sharing it; only the user prompt is encoded.
+
+Requires torch (not installed by requirements.txt); it is imported only
+when a local model is first used.
+"""
+
+import copy
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_BATCH_WAIT_MS = 20
+
+# Below this temperature generation is greedy (the client sends 0.01 for "0")
+_GREEDY_BELOW = 0.05
+
+
+def get_local_models() -> set[str]:
+    """Model ids served locally, from the LOCAL_MODELS env var."""
+    return {name.strip() for name in os.getenv("LOCAL_MODELS", "").split(",") if name.strip()}
+
+
+@dataclass
+class LocalCompletion:
+    """Result of a local chat completion."""
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    finish_reason: str = "stop"  # "length" when max_new_tokens was reached
+
+
+@dataclass(eq=False)
+class GenerationRequest:
+    """A queued chat request."""
+    messages: list[dict]
+    max_new_tokens: int
+    temperature: float
+    future: Future = field(default_factory=Future)
+
+    @property
+    def batch_key(self) -> tuple:
+        """Requests can share a generate() call only with identical settings and prefix."""
+        system = tuple(m["content"] for m in self.messages if m["role"] == "system")
+        sampling = self.temperature >= _GREEDY_BELOW
+        return (system, self.max_new_tokens, sampling, self.temperature if sampling else 0.0)
+
+
+class RequestBatcher:
+    """
+    Collects concurrent requests and serves them in batches from one thread.
+
+    Args:
+        generate_batch: Function generating completions for a list of
+                        requests with the same batch_key, in order.
+        max_batch_size: Largest batch passed to generate_batch.
+        batch_wait_ms: How long the first request of a batch waits for
+                       others to arrive.
+    """
+
+    def __init__(
+        self,
+        generate_batch: Callable[[list[GenerationRequest]], list[LocalCompletion]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        batch_wait_ms: float = DEFAULT_BATCH_WAIT_MS,
+        name: str = "local-llm"
+    ):
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.batch_wait_seconds = batch_wait_ms / 1000
+        self.batch_sizes: list[int] = []
+        self._queue: queue.Queue[GenerationRequest] = queue.Queue()
+        self._pending: list[GenerationRequest] = []
+        self._thread = threading.Thread(target=self._serve, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, request: GenerationRequest) -> LocalCompletion:
+        """Queue a request and block until its completion is ready."""
+        self._queue.put(request)
+        return request.future.result()
+
+    def _next_batch(self) -> list[GenerationRequest]:
+        if not self._pending:
+            self._pending.append(self._queue.get())
+        deadline = time.monotonic() + self.batch_wait_seconds
+        while len(self._pending) < self.max_batch_size * 2:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Serve the oldest request together with compatible ones
+        key = self._pending[0].batch_key
+        batch = [r for r in self._pending if r.batch_key == key][:self.max_batch_size]
+        self._pending = [r for r in self._pending if all(r is not b for b in batch)]
+        return batch
+
+    def _serve(self) -> None:
+        while True:
+            batch = self._next_batch()
+            self.batch_sizes.append(len(batch))
+            try:
+                completions = self.generate_batch(batch)
+            except BaseException as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, completion in zip(batch, completions):
+                request.future.set_result(completion)
+
+
+class TransformersGenerator:
+    """
+    Batched generation with a transformers causal LM on CPU.
+
+    Each batch is laid out as [system prefix][padding][user suffix]: the
+    prefix KV cache is computed once and repeated across the batch, the
+    padding is masked out, and position ids follow the attention mask, so
+    every row sees one contiguous prompt.
+    """
+
+    def __init__(self, model_name: str):
+        try:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                f"Local model {model_name} requires torch and transformers "
+                "(pip install torch transformers)"
+            ) from e
+
+        self.torch = torch
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if self.tokenizer.pad_token_id is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+        self.model.eval()
+        self._prefix_cache: dict[tuple, tuple[list[int], object]] = {}
+
+    def _split_prompt(self, messages: list[dict]) -> tuple[str, str]:
+        """Render the chat prompt and split it after the system messages."""
+        full = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        system = [m for m in messages if m["role"] == "system"]
+        if not system:
+            return "", full
+        prefix = self.tokenizer.apply_chat_template(system, tokenize=False)
+        if not full.startswith(prefix):
+            return "", full
+        return prefix, full[len(prefix):]
+
+    def _prefix(self, key: tuple, prefix_text: str) -> tuple[list[int], Optional[object]]:
+        """Token ids and KV cache of a system-prompt prefix (computed once)."""
+        if not prefix_text:
+            return [], None
+        if key not in self._prefix_cache:
+            ids = self.tokenizer(prefix_text, add_special_tokens=False)["input_ids"]
+            with self.torch.no_grad():
+                output = self.model(self.torch.tensor([ids]), use_cache=True)
+            self._prefix_cache[key] = (ids, output.past_key_values)
+        return self._prefix_cache[key]
+
+    def generate_batch(self, batch: list[GenerationRequest]) -> list[LocalCompletion]:
+        torch = self.torch
+        first = batch[0]
+        prefix_text, _ = self._split_prompt(first.messages)
+        prefix_ids, prefix_cache = self._prefix(first.batch_key[0], prefix_text)
+
+        suffixes = [
+            self.tokenizer(self._split_prompt(r.messages)[1], add_special_tokens=False)["input_ids"]
+            for r in batch
+        ]
+        width = max(len(s) for s in suffixes)
+        pad = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([prefix_ids + [pad] * (width - len(s)) + s for s in suffixes])
+        attention_mask = torch.tensor(
+            [[1] * len(prefix_ids) + [0] * (width - len(s)) + [1] * len(s) for s in suffixes]
+        )
+
+        kwargs = {}
+        if prefix_cache is not None:
+            # generate() extends the cache in place: give it a private copy
+            cache = copy.deepcopy(prefix_cache)
+            if len(batch) > 1:
+                cache.batch_repeat_interleave(len(batch))
+            kwargs["past_key_values"] = cache
+
+        sampling = first.temperature >= _GREEDY_BELOW
+        if sampling:
+            kwargs.update(do_sample=True, temperature=first.temperature)
+        else:
+            kwargs.update(do_sample=False)
+
+        with torch.no_grad():
+            output = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=first.max_new_tokens,
+                pad_token_id=pad,
+                **kwargs,
+            )
+
+        completions = []
+        new_tokens = output[:, input_ids.shape[1]:]
+        for row, suffix in zip(new_tokens.tolist(), suffixes):
+            finish_reason = "length"
+            if self.tokenizer.eos_token_id in row:
+                row = row[:row.index(self.tokenizer.eos_token_id)]
+                finish_reason = "stop"
+            completions.append(LocalCompletion(
+                text=self.tokenizer.decode(row, skip_special_tokens=True),
+                prompt_tokens=len(prefix_ids) + len(suffix),
+                completion_tokens=len(row),
+                finish_reason=finish_reason,
+            ))
+        return completions
+
+
+class LocalModel:
+    """A locally served model: a generator behind a request batcher."""
+
+    def __init__(self, model_name: str, generator=None):
+        self.model_name = model_name
+        self.generator = generator or TransformersGenerator(model_name)
+        self.batcher = RequestBatcher(
+            self.generator.generate_batch,
+            max_batch_size=int(os.getenv("LOCAL_MAX_BATCH_SIZE", DEFAULT_MAX_BATCH_SIZE)),
+            batch_wait_ms=float(os.getenv("LOCAL_BATCH_WAIT_MS", DEFAULT_BATCH_WAIT_MS)),
+            name=f"local-llm:{model_name}",
+        )
+
+    def chat(self, messages: list[dict], max_tokens: int, temperature: float) -> LocalCompletion:
+        """Generate a chat completion (blocks until the batch containing it is done)."""
+        return self.batcher.submit(GenerationRequest(messages, max_tokens, temperature))
+
+
+_models: dict[str, LocalModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_local_model(model_name: str) -> Optional[LocalModel]:
+    """
+    Process-wide local model for a model id, or None if the model is
+    not listed in LOCAL_MODELS. Models are loaded on first use.
+    """
+    if model_name not in get_local_models():
+        return None
+    with _models_lock:
+        if model_name not in _models:
+            _models[model_name] = LocalModel(model_name)
+        return _models[model_name]
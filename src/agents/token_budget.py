@@ -0,0 +1,124 @@
+"""
+Adaptive generation budgets (max_tokens) per role and model.
+
+A fixed max_tokens=2048 makes every call reserve the budget of the longest
+role, and lets a degenerate generation (repeating the same line) run to
+the limit. Instead, the completion lengths of recent calls are recorded per
+(role, model) and the next call gets a budget of a high percentile of
+those lengths times a safety margin, between LLM_MIN_TOKENS and
+LLM_MAX_TOKENS_CEILING.
+
+Until a (role, model) pair has min_samples completions, the role default
+applies (the Planner only returns a short JSON object, so it starts
+lower). A completion that hits the budget (finish_reason "length") with an
+unterminated JSON object is retried once by the client at twice the
+budget, capped at the old fixed DEFAULT_MAX_TOKENS, and only while the
+task budget is not spent. A degenerate generation therefore costs at most
+budget + DEFAULT_MAX_TOKENS completion tokens.
+
+Enabled by default; LLM_ADAPTIVE_MAX_TOKENS=0 restores the fixed budget of
+DEFAULT_MAX_TOKENS. Tuned with LLM_MAX_TOKENS_PERCENTILE (99),
+LLM_MAX_TOKENS_MARGIN (1.25), LLM_MAX_TOKENS_MIN_SAMPLES (20),
+LLM_MIN_TOKENS (128) and LLM_MAX_TOKENS_CEILING (4096).
+"""
+
+import math
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Optional
+
+
+DEFAULT_MAX_TOKENS = 2048
+
+# Budget of a role before enough completions are recorded
+ROLE_DEFAULT_MAX_TOKENS = {
+    "planner": 512,
+}
+
+DEFAULT_PERCENTILE = 99.0
+DEFAULT_MARGIN = 1.25
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MIN_TOKENS = 128
+DEFAULT_CEILING = 4096
+DEFAULT_WINDOW = 200
+
+
+class TokenBudgets:
+    """
+    Sliding window of completion lengths per (role, model) and the
+    max_tokens budget derived from it.
+
+    Args:
+        percentile: Percentile of recent completion lengths to cover.
+        margin: Factor applied on top of the percentile.
+        min_samples: Completions needed before the budget is learned.
+        min_tokens: Lowest budget ever given.
+        ceiling: Highest budget ever given (also caps retries).
+                 Retries are further capped at DEFAULT_MAX_TOKENS.
+        window: Number of recent completions kept per (role, model).
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        margin: float = DEFAULT_MARGIN,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        min_tokens: int = DEFAULT_MIN_TOKENS,
+        ceiling: int = DEFAULT_CEILING,
+        window: int = DEFAULT_WINDOW
+    ):
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.min_tokens = min_tokens
+        self.ceiling = ceiling
+        self._lengths: dict[tuple[str, str], deque[int]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, role: str, model: str, completion_tokens: int) -> None:
+        """Record the length of a completion that ended on its own."""
+        if completion_tokens:
+            with self._lock:
+                self._lengths[(role, model)].append(completion_tokens)
+
+    def budget(self, role: str, model: str) -> int:
+        """max_tokens for the next call of a role on a model."""
+        with self._lock:
+            samples = sorted(self._lengths[(role, model)])
+        if len(samples) < self.min_samples:
+            return min(ROLE_DEFAULT_MAX_TOKENS.get(role, DEFAULT_MAX_TOKENS), self.ceiling)
+
+        rank = (len(samples) - 1) * self.percentile / 100
+        low = int(rank)
+        high = min(low + 1, len(samples) - 1)
+        length = samples[low] + (samples[high] - samples[low]) * (rank - low)
+        return max(self.min_tokens, min(self.ceiling, math.ceil(length * self.margin)))
+
+    def retry_budget(self, budget: int) -> Optional[int]:
+        """Budget of the single retry of a truncated completion, or None if it would not be larger."""
+        cap = min(self.ceiling, DEFAULT_MAX_TOKENS)
+        if budget >= cap:
+            return None
+        return min(cap, budget * 2)
+
+
+_budgets: Optional[TokenBudgets] = None
+_budgets_lock = threading.Lock()
+
+
+def get_token_budgets() -> Optional[TokenBudgets]:
+    """Process-wide TokenBudgets, or None if LLM_ADAPTIVE_MAX_TOKENS is disabled."""
+    global _budgets
+    if os.getenv("LLM_ADAPTIVE_MAX_TOKENS", "1").lower() in ("0", "false", "no"):
+        return None
+    with _budgets_lock:
+        if _budgets is None:
+            _budgets = TokenBudgets(
+                percentile=float(os.getenv("LLM_MAX_TOKENS_PERCENTILE", DEFAULT_PERCENTILE)),
+                margin=float(os.getenv("LLM_MAX_TOKENS_MARGIN", DEFAULT_MARGIN)),
+                min_samples=int(os.getenv("LLM_MAX_TOKENS_MIN_SAMPLES", DEFAULT_MIN_SAMPLES)),
+                min_tokens=int(os.getenv("LLM_MIN_TOKENS", DEFAULT_MIN_TOKENS)),
+                ceiling=int(os.getenv("LLM_MAX_TOKENS_CEILING", DEFAULT_CEILING)),
+            )
+        return _budgets
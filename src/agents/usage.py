@@ -0,0 +1,70 @@
+"""
+Token and call accounting for LLM invocations.
+
+LLMClient reports every completed chat call with record_llm_call(). Graph
+nodes wrap their LLM work in track_usage() to learn what that work cost,
+without threading counters through every client method. A node can also
+pass what is left of the task budget, so the client can check
+allowance_exhausted() before spending more on an optional extra call.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass
+class UsageCounter:
+    """LLM usage accumulated inside a track_usage() block."""
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    max_tokens: Optional[int] = None     # tokens the block may spend (None: unlimited)
+    max_llm_calls: Optional[int] = None  # calls the block may make (None: unlimited)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def exhausted(self) -> bool:
+        """True once the block has spent its token or call allowance."""
+        if self.max_tokens is not None and self.total_tokens >= self.max_tokens:
+            return True
+        return self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls
+
+
+_active_counter: ContextVar[Optional[UsageCounter]] = ContextVar("active_usage_counter", default=None)
+
+
+def record_llm_call(prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+    """Charge one LLM call to the enclosing track_usage() block, if any."""
+    counter = _active_counter.get()
+    if counter is None:
+        return
+    counter.llm_calls += 1
+    counter.prompt_tokens += prompt_tokens or 0
+    counter.completion_tokens += completion_tokens or 0
+
+
+def allowance_exhausted() -> bool:
+    """True if the enclosing track_usage() block has spent its allowance."""
+    counter = _active_counter.get()
+    return counter is not None and counter.exhausted()
+
+
+@contextmanager
+def track_usage(max_tokens: Optional[int] = None, max_llm_calls: Optional[int] = None) -> Iterator[UsageCounter]:
+    """
+    Collect the usage of all LLM calls made inside the block.
+
+    Args:
+        max_tokens: Tokens the block may spend, reported by allowance_exhausted().
+        max_llm_calls: LLM calls the block may make.
+    """
+    counter = UsageCounter(max_tokens=max_tokens, max_llm_calls=max_llm_calls)
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
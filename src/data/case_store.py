@@ -0,0 +1,119 @@
+"""
+Shared read-only store for task test cases.
+
+APPS tasks can carry megabytes of stdin/stdout data. Instead of copying the
+lists into every GraphState snapshot, the runner registers them here once
+and the state only carries a handle. The Tester resolves the handle when
+it actually executes the code.
+
+Whoever runs the graph owns the entry: run_graph registers the cases for
+the duration of the run, and direct `graph.invoke` callers use
+registered_cases():
+
+    with registered_cases(task_id, inputs, outputs, architecture) as test_ref:
+        graph.invoke(create_initial_state(task_id, description, test_ref=test_ref))
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+
+class CaseStore:
+    """
+    Process-wide registry of test inputs/outputs keyed by task and architecture.
+
+    Entries are reference counted so that the same task can be run
+    concurrently under the same architecture (e.g. by several sweeps in one
+    process) and is dropped only when the last run releases it.
+    """
+
+    def __init__(self):
+        self._cases: dict[str, tuple[Sequence[str], Sequence[str]]] = {}
+        self._refs: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        task_id: str,
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+        architecture: Optional[str] = None
+    ) -> str:
+        """
+        Register the test cases of a task.
+
+        Args:
+            task_id: Task identifier.
+            inputs: stdin inputs for each test case.
+            outputs: Expected stdout for each test case.
+            architecture: Architecture of the run ("A", "B", "C"), part of the handle.
+
+        Returns:
+            Handle to store in GraphState["test_ref"].
+        """
+        handle = case_handle(task_id, architecture)
+        with self._lock:
+            self._cases[handle] = (inputs, outputs)
+            self._refs[handle] = self._refs.get(handle, 0) + 1
+        return handle
+
+    def get(self, handle: str) -> tuple[Sequence[str], Sequence[str]]:
+        """Resolve a handle into (inputs, outputs)."""
+        try:
+            return self._cases[handle]
+        except KeyError:
+            raise KeyError(
+                f"No test cases registered for '{handle}'. "
+                f"Register them with get_case_store().put() before running the graph."
+            ) from None
+
+    def release(self, handle: str) -> None:
+        """Drop one reference to a handle, freeing the data on the last one."""
+        with self._lock:
+            remaining = self._refs.get(handle, 0) - 1
+            if remaining > 0:
+                self._refs[handle] = remaining
+                return
+            self._refs.pop(handle, None)
+            self._cases.pop(handle, None)
+
+    def __contains__(self, handle: str) -> bool:
+        return handle in self._cases
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+
+def case_handle(task_id: str, architecture: Optional[str] = None) -> str:
+    """Handle of a task's test cases: "<architecture>/<task_id>", or the task id alone."""
+    return f"{architecture}/{task_id}" if architecture else task_id
+
+
+_case_store = CaseStore()
+
+
+def get_case_store() -> CaseStore:
+    """Return the process-wide CaseStore."""
+    return _case_store
+
+
+@contextmanager
+def registered_cases(
+    task_id: str,
+    inputs: Optional[Sequence[str]],
+    outputs: Optional[Sequence[str]],
+    architecture: Optional[str] = None
+) -> Iterator[Optional[str]]:
+    """
+    Register test cases for the duration of the block and yield their handle
+    (None, and nothing registered, without test cases).
+    """
+    if not (inputs and outputs):
+        yield None
+        return
+    handle = _case_store.put(task_id, inputs, outputs, architecture)
+    try:
+        yield handle
+    finally:
+        _case_store.release(handle)
@@ -0,0 +1,191 @@
+"""
+Lazily decoded test cases.
+
+APPS stores each task's tests as one `input_output` JSON blob, which can be
+megabytes for competition problems. LazyTestCases wraps that blob (or a
+column of the local Arrow cache) as a read-only sequence:
+- nothing is decoded until the cases are used
+- iterating streams one case at a time, without decoding the whole blob
+- len() / indexing decode the blob once and keep the result
+- bool() only decodes the first case, so empty-test checks are cheap
+- RawTestData.validate() checks the whole blob in one pass, keeping nothing
+"""
+
+import json
+import re
+from collections.abc import Sequence
+from typing import Iterator, Optional
+
+import pyarrow as pa
+
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+def _skip_ws(raw: str, pos: int) -> int:
+    return _WHITESPACE.match(raw, pos).end()
+
+
+def _expect(raw: str, pos: int, char: str) -> int:
+    if raw[pos:pos + 1] != char:
+        raise json.JSONDecodeError(f"Expected '{char}'", raw, pos)
+    return _skip_ws(raw, pos + 1)
+
+
+def _scan_array(raw: str, pos: int, emit: bool):
+    """
+    Walk the JSON array starting at raw[pos] == '[', one item at a time.
+
+    Yields the items if `emit` is set and returns the position after ']'.
+    """
+    pos = _expect(raw, pos, "[")
+    if raw[pos:pos + 1] == "]":
+        return pos + 1
+    while True:
+        value, pos = _decoder.raw_decode(raw, pos)
+        if emit:
+            yield value
+        pos = _skip_ws(raw, pos)
+        if raw[pos:pos + 1] == "]":
+            return pos + 1
+        pos = _expect(raw, pos, ",")
+
+
+def _walk_object(raw: str, key: Optional[str], stop: bool):
+    """
+    Walk the top-level JSON object of `raw`, one value at a time.
+
+    Yields the items of the array field `key` and returns the position
+    after the closing '}', or right after that array if `stop` is set.
+    """
+    pos = _expect(raw, _skip_ws(raw, 0), "{")
+    if raw[pos:pos + 1] == "}":
+        return pos + 1
+    while True:
+        name, pos = _decoder.raw_decode(raw, pos)
+        if not isinstance(name, str):
+            raise json.JSONDecodeError("Expected a property name", raw, pos)
+        pos = _expect(raw, _skip_ws(raw, pos), ":")
+        if raw[pos:pos + 1] == "[":
+            pos = yield from _scan_array(raw, pos, emit=name == key)
+            if name == key and stop:
+                return pos
+        else:
+            _, pos = _decoder.raw_decode(raw, pos)
+        pos = _skip_ws(raw, pos)
+        if raw[pos:pos + 1] == "}":
+            return pos + 1
+        pos = _expect(raw, pos, ",")
+
+
+def iter_json_array_field(raw: str, key: str) -> Iterator:
+    """
+    Stream the items of a top-level array field of a JSON object.
+
+    Other array fields are skipped item by item, so at no point is a whole
+    array materialized.
+    """
+    yield from _walk_object(raw, key, stop=True)
+
+
+def validate_json_object(raw: str) -> None:
+    """
+    Check that `raw` is a single well-formed JSON object.
+
+    The object is scanned value by value without keeping any of them, so
+    this costs one pass over the text but no decoded copy of the cases.
+
+    Raises:
+        json.JSONDecodeError: If the text is not a well-formed JSON object.
+    """
+    walk = _walk_object(raw, None, stop=False)
+    while True:
+        try:
+            next(walk)
+        except StopIteration as done:
+            end = done.value
+            break
+    if _skip_ws(raw, end) != len(raw):
+        raise json.JSONDecodeError("Extra data", raw, end)
+
+
+class RawTestData:
+    """A task's input_output JSON, fully decoded at most once."""
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self._decoded: Optional[dict] = None
+
+    def validate(self) -> None:
+        """Raise json.JSONDecodeError if the blob is malformed (see validate_json_object)."""
+        if self._decoded is None:
+            validate_json_object(self.raw)
+
+    def decoded(self) -> dict:
+        if self._decoded is None:
+            self._decoded = json.loads(self.raw)
+        return self._decoded
+
+    def iter_field(self, key: str) -> Iterator:
+        if self._decoded is not None:
+            return iter(self._decoded.get(key, []))
+        return iter_json_array_field(self.raw, key)
+
+
+class LazyTestCases(Sequence):
+    """Read-only sequence of test cases decoded on demand."""
+
+    def __init__(self, source, key: str = None):
+        """
+        Args:
+            source: RawTestData (JSON blob) or a pyarrow array of strings.
+            key: Field of the JSON blob ("inputs" / "outputs"); unused for arrays.
+        """
+        self._source = source
+        self._key = key
+        self._items: Optional[list] = None
+
+    def _materialize(self) -> list:
+        if self._items is None:
+            if isinstance(self._source, RawTestData):
+                self._items = self._source.decoded().get(self._key, [])
+            else:
+                self._items = self._source.to_pylist()
+        return self._items
+
+    def __iter__(self) -> Iterator:
+        if self._items is not None:
+            return iter(self._items)
+        if isinstance(self._source, RawTestData):
+            return self._source.iter_field(self._key)
+        return (value.as_py() for value in self._source)
+
+    def __bool__(self) -> bool:
+        if self._items is not None:
+            return bool(self._items)
+        if isinstance(self._source, pa.Array):
+            return len(self._source) > 0
+        return next(iter(self), _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        if self._items is None and isinstance(self._source, pa.Array):
+            return len(self._source)
+        return len(self._materialize())
+
+    def __getitem__(self, index):
+        if self._items is None and isinstance(self._source, pa.Array) and isinstance(index, int):
+            return self._source[index].as_py()
+        return self._materialize()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, LazyTestCases)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        state = f"{len(self._items)} cases" if self._items is not None else "not decoded"
+        return f"LazyTestCases({state})"
+
+
+_MISSING = object()
@@ -6,23 +6,68 @@ Each task contains:
 - question: Natural language description of the problem
 - input_output: JSON with test inputs (stdin) and expected outputs (stdout)
 - difficulty: "introductory", "interview", or "competition"
+
+Lookups go through a small index (problem_id -> row, difficulty -> rows)
+built once from the problem_id/difficulty columns and saved next to the
+dataset cache, so fetching a task never scans the dataset.
+
+build_local_cache() converts the dataset once into a local Arrow file with
+the test cases already parsed. When that file exists the loader memory-maps
+it instead of calling load_dataset(), so startup needs no network and no
+JSON decoding.
+
+Task.inputs / Task.outputs are LazyTestCases: test data is only decoded
+when it is used, and can be streamed case by case.
 """
 
 import json
+import os
+import random
 from dataclasses import dataclass
-from typing import Optional
-from datasets import load_dataset
+from typing import Iterable, Optional, Sequence
+
+import pyarrow as pa
+
+from src.data.lazy_io import LazyTestCases, RawTestData
+
+
+DEFAULT_CACHE_DIR = "data"
+
+
+def load_dataset(*args, **kwargs):
+    """datasets.load_dataset, imported on first use: `datasets` takes ~1s to import."""
+    from datasets import load_dataset as hf_load_dataset
+    return hf_load_dataset(*args, **kwargs)
+
+LOCAL_CACHE_SCHEMA = pa.schema([
+    ("problem_id", pa.int64()),
+    ("question", pa.string()),
+    ("difficulty", pa.string()),
+    ("inputs", pa.list_(pa.string())),
+    ("outputs", pa.list_(pa.string())),
+    ("starter_code", pa.string()),
+])
+
+
+def _as_text(value) -> str:
+    """Test cases are strings for stdin tasks; keep other values as JSON."""
+    return value if isinstance(value, str) else json.dumps(value)
 
 
 @dataclass
 class Task:
-    """Represents a single coding task from the APPS dataset."""
+    """
+    Represents a single coding task from the APPS dataset.
+    
+    inputs/outputs may be plain lists or LazyTestCases; both behave as
+    read-only sequences of strings.
+    """
     
     problem_id: int
     question: str
     difficulty: str
-    inputs: list[str]
-    outputs: list[str]
+    inputs: Sequence[str]
+    outputs: Sequence[str]
     starter_code: str = ""
     
     @property
@@ -57,20 +102,41 @@ class APPSTaskLoader:
         
         # Load single task
         task = loader.get_task(problem_id=0)
+        
+        # Random (but reproducible) balanced sample
+        tasks = loader.load_balanced(per_level=5, seed=42)
     """
     
     VALID_DIFFICULTIES = {"introductory", "interview", "competition"}
     
-    def __init__(self, split: str = "test"):
+    def __init__(self, split: str = "test", cache_dir: str = None):
         """
         Initialize the task loader.
         
         Args:
             split: Dataset split to use ("train" or "test"). Default is "test".
                    Both splits contain 5000 samples each.
+            cache_dir: Directory of the local Arrow cache. Defaults to the
+                       APPS_CACHE_DIR env var or "data".
         """
         self.split = split
+        self.cache_dir = cache_dir or os.getenv("APPS_CACHE_DIR", DEFAULT_CACHE_DIR)
         self._dataset = None
+        self._table = None
+        self._index = None
+    
+    @property
+    def local_cache_path(self) -> str:
+        """Path of the local Arrow cache for this split."""
+        return os.path.join(self.cache_dir, f"apps_{self.split}.arrow")
+    
+    @property
+    def local_table(self) -> Optional[pa.Table]:
+        """Memory-mapped local cache, or None if it has not been built."""
+        if self._table is None and os.path.exists(self.local_cache_path):
+            source = pa.memory_map(self.local_cache_path, "r")
+            self._table = pa.ipc.open_file(source).read_all()
+        return self._table
     
     @property
     def dataset(self):
@@ -85,10 +151,98 @@ class APPSTaskLoader:
             print(f"Loaded {len(self._dataset)} tasks.")
         return self._dataset
     
+    @property
+    def index(self) -> dict:
+        """
+        Row index of the dataset, loaded from disk or built on first access.
+        
+        Returns:
+            {"by_id": {problem_id: row}, "by_difficulty": {difficulty: [rows]}}
+        """
+        if self._index is None:
+            table = self.local_table
+            if table is not None:
+                # Reading two mmapped columns takes milliseconds: no need to persist
+                self._index = self._build_index(
+                    table.column("problem_id").to_pylist(),
+                    table.column("difficulty").to_pylist(),
+                )
+                return self._index
+            
+            self._index = self._load_index()
+            if self._index is None:
+                self._index = self._build_index(
+                    self.dataset["problem_id"],
+                    self.dataset["difficulty"],
+                )
+                self._save_index(self._index)
+        return self._index
+    
+    def _index_path(self) -> Optional[str]:
+        """Index file next to the dataset's Arrow cache (None if in-memory)."""
+        cache_files = self.dataset.cache_files
+        if not cache_files:
+            return None
+        cache_dir = os.path.dirname(cache_files[0]["filename"])
+        return os.path.join(cache_dir, f"apps_{self.split}_index.json")
+    
+    @staticmethod
+    def _build_index(problem_ids: list[int], difficulties: list[str]) -> dict:
+        """
+        Build the index from the problem_id and difficulty columns only.
+        
+        Column access reads the Arrow buffers directly, so the (large)
+        input_output column is never decoded.
+        """
+        by_difficulty: dict[str, list[int]] = {}
+        for row, difficulty in enumerate(difficulties):
+            by_difficulty.setdefault(difficulty.lower(), []).append(row)
+        
+        return {
+            "by_id": {problem_id: row for row, problem_id in enumerate(problem_ids)},
+            "by_difficulty": by_difficulty,
+        }
+    
+    def _load_index(self) -> Optional[dict]:
+        """Load a persisted index if it matches the current dataset."""
+        path = self._index_path()
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        
+        if data.get("fingerprint") != self.dataset._fingerprint:
+            return None
+        
+        # JSON object keys are strings: restore integer problem ids
+        return {
+            "by_id": {int(problem_id): row for problem_id, row in data["by_id"].items()},
+            "by_difficulty": data["by_difficulty"],
+        }
+    
+    def _save_index(self, index: dict) -> None:
+        """Persist the index next to the dataset cache (best effort)."""
+        path = self._index_path()
+        if path is None:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.dataset._fingerprint, **index}, f)
+        except OSError:
+            pass
+    
     def _parse_task(self, item: dict) -> Optional[Task]:
         """
         Parse a dataset item into a Task object.
         
+        The input_output JSON is not decoded here: inputs/outputs wrap it
+        lazily, and only the first case is parsed to detect empty tests.
+        The blob is scanned once without keeping its values, so a malformed
+        one drops the task here instead of failing later in the Tester.
+        
         Args:
             item: Raw dataset item with fields from APPS.
             
@@ -96,11 +250,11 @@ class APPSTaskLoader:
             Task object, or None if parsing fails.
         """
         try:
-            # Parse the input_output JSON string
-            io_data = json.loads(item["input_output"])
+            io_data = RawTestData(item["input_output"])
+            io_data.validate()
             
-            inputs = io_data.get("inputs", [])
-            outputs = io_data.get("outputs", [])
+            inputs = LazyTestCases(io_data, "inputs")
+            outputs = LazyTestCases(io_data, "outputs")
             
             # Skip tasks with no test cases
             if not inputs or not outputs:
@@ -114,9 +268,79 @@ class APPSTaskLoader:
                 outputs=outputs,
                 starter_code=item.get("starter_code", "") or ""
             )
-        except (json.JSONDecodeError, KeyError, TypeError):
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
             return None
     
+    def _task_at(self, row: int) -> Optional[Task]:
+        """Load the task stored at a row, preferring the local cache."""
+        table = self.local_table
+        if table is None:
+            return self._parse_task(self.dataset[row])
+        
+        # List cells are zero-copy views on the memory-mapped file
+        inputs = LazyTestCases(table.column("inputs")[row].values)
+        outputs = LazyTestCases(table.column("outputs")[row].values)
+        if not inputs or not outputs:
+            return None
+        
+        return Task(
+            problem_id=table.column("problem_id")[row].as_py(),
+            question=table.column("question")[row].as_py(),
+            difficulty=table.column("difficulty")[row].as_py(),
+            inputs=inputs,
+            outputs=outputs,
+            starter_code=table.column("starter_code")[row].as_py(),
+        )
+    
+    def build_local_cache(self, batch_size: int = 500) -> str:
+        """
+        Convert the HuggingFace dataset into the local Arrow cache.
+        
+        Parses every task's input_output once and writes question, difficulty,
+        inputs, outputs and starter_code to an uncompressed Arrow IPC file that
+        later loads can memory-map. Non-string test values (call-based tasks)
+        are stored JSON-encoded.
+        
+        Args:
+            batch_size: Number of rows converted per record batch.
+            
+        Returns:
+            Path of the written cache file.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.local_cache_path + ".tmp"
+        
+        columns = ["problem_id", "question", "difficulty", "input_output", "starter_code"]
+        rows = self.dataset.select_columns(columns)
+        
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, LOCAL_CACHE_SCHEMA) as writer:
+                for batch in rows.iter(batch_size=batch_size):
+                    records = []
+                    for i, problem_id in enumerate(batch["problem_id"]):
+                        try:
+                            io_data = json.loads(batch["input_output"][i])
+                        except (json.JSONDecodeError, TypeError):
+                            io_data = {}
+                        records.append({
+                            "problem_id": problem_id,
+                            "question": batch["question"][i],
+                            "difficulty": batch["difficulty"][i].lower(),
+                            "inputs": [_as_text(x) for x in io_data.get("inputs", [])],
+                            "outputs": [_as_text(x) for x in io_data.get("outputs", [])],
+                            "starter_code": batch["starter_code"][i] or "",
+                        })
+                    writer.write_batch(
+                        pa.RecordBatch.from_pylist(records, schema=LOCAL_CACHE_SCHEMA)
+                    )
+        
+        # Atomic swap: concurrent workers never see a half-written cache
+        os.replace(tmp_path, self.local_cache_path)
+        self._table = None
+        self._index = None
+        print(f"Wrote local cache for {len(rows)} tasks to {self.local_cache_path}")
+        return self.local_cache_path
+    
     def get_task(self, problem_id: int) -> Optional[Task]:
         """
         Load a specific task by problem ID.
@@ -127,24 +351,35 @@ class APPSTaskLoader:
         Returns:
             Task object, or None if not found or parsing fails.
         """
-        for item in self.dataset:
-            if item["problem_id"] == problem_id:
-                return self._parse_task(item)
-        return None
+        row = self.index["by_id"].get(problem_id)
+        if row is None:
+            return None
+        return self._task_at(row)
     
     def load_by_difficulty(
         self, 
         difficulty: str, 
         limit: int = 5,
-        skip_empty_tests: bool = True
+        skip_empty_tests: bool = True,
+        seed: Optional[int] = None,
+        streaming: bool = False
     ) -> list[Task]:
         """
         Load tasks filtered by difficulty level.
         
+        Only the rows of the requested difficulty are read, through the index.
+        In streaming mode (and without a local cache) the dataset is streamed
+        from the Hub instead, stopping as soon as `limit` tasks are found;
+        nothing is downloaded or indexed up front.
+        
         Args:
             difficulty: One of "introductory", "interview", "competition".
             limit: Maximum number of tasks to load.
             skip_empty_tests: Skip tasks that have no test cases.
+            seed: If set, sample tasks in a random order reproducible from the
+                  seed instead of taking the first ones in dataset order.
+                  Not supported in streaming mode.
+            streaming: Stream rows instead of loading the whole dataset.
             
         Returns:
             List of Task objects.
@@ -155,12 +390,18 @@ class APPSTaskLoader:
                 f"Must be one of {self.VALID_DIFFICULTIES}"
             )
         
+        if streaming and self.local_table is None:
+            if seed is not None:
+                raise ValueError("seed is not supported with streaming=True")
+            candidates = self._stream_difficulty(difficulty.lower())
+        else:
+            rows = self.index["by_difficulty"].get(difficulty.lower(), [])
+            if seed is not None:
+                rows = random.Random(seed).sample(rows, len(rows))
+            candidates = (self._task_at(row) for row in rows)
+        
         tasks = []
-        for item in self.dataset:
-            if item["difficulty"].lower() != difficulty.lower():
-                continue
-            
-            task = self._parse_task(item)
+        for task in candidates:
             if task is None and skip_empty_tests:
                 continue
             
@@ -172,12 +413,32 @@ class APPSTaskLoader:
         
         return tasks
     
-    def load_balanced(self, per_level: int = 5) -> list[Task]:
+    def _stream_difficulty(self, difficulty: str) -> Iterable[Optional[Task]]:
+        """Stream tasks of one difficulty from the Hub, parsing them lazily."""
+        stream = load_dataset(
+            "codeparrot/apps",
+            split=self.split,
+            streaming=True,
+            trust_remote_code=True
+        ).select_columns(["problem_id", "question", "difficulty", "input_output", "starter_code"])
+        
+        for item in stream:
+            if item["difficulty"].lower() == difficulty:
+                yield self._parse_task(item)
+    
+    def load_balanced(
+        self,
+        per_level: int = 5,
+        seed: Optional[int] = None,
+        streaming: bool = False
+    ) -> list[Task]:
         """
         Load a balanced set of tasks across all difficulty levels.
         
         Args:
             per_level: Number of tasks per difficulty level.
+            seed: Optional seed for a reproducible random sample per level.
+            streaming: Stream rows instead of loading the whole dataset.
             
         Returns:
             List of Task objects (total = per_level * 3).
@@ -185,7 +446,9 @@ class APPSTaskLoader:
         tasks = []
         
         for difficulty in ["introductory", "interview", "competition"]:
-            level_tasks = self.load_by_difficulty(difficulty, limit=per_level)
+            level_tasks = self.load_by_difficulty(
+                difficulty, limit=per_level, seed=seed, streaming=streaming
+            )
             tasks.extend(level_tasks)
             print(f"  Loaded {len(level_tasks)} {difficulty} tasks")
         
@@ -193,4 +456,6 @@ class APPSTaskLoader:
     
     def __len__(self) -> int:
         """Return total number of tasks in the dataset."""
+        if self.local_table is not None:
+            return self.local_table.num_rows
         return len(self.dataset)
@@ -0,0 +1,239 @@
+"""
+Deterministic sharding and a local work queue for distributed sweeps.
+
+Two ways to split a sweep across processes or machines, neither needing
+an external service:
+
+1. Static sharding: shard_of() maps a task id to a shard with a stable
+   hash, so `--shard i/n` on every node processes disjoint task sets
+   with no coordination at all.
+
+2. WorkQueue: a SQLite file holding one item per (task, architecture).
+   Workers lease items; a lease that is not completed before it expires
+   (crashed or killed worker) goes back to the queue. Only the current
+   holder of a lease can complete, fail or renew the item. The file must live
+   on a filesystem with working POSIX locks when shared between nodes.
+
+Workers resolve leased items with APPSTaskLoader.get_task(problem_id).
+Per-shard result files are merged with src.evaluation.results.merge_results.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from src.data.task_loader import Task
+
+
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def shard_of(task_id: str, num_shards: int) -> int:
+    """Stable shard index of a task, identical on every machine and run."""
+    digest = hashlib.sha1(task_id.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % num_shards
+
+
+def shard_tasks(tasks: Iterable[Task], shard_index: int, num_shards: int) -> list[Task]:
+    """Keep only the tasks that belong to one shard."""
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Invalid shard {shard_index}/{num_shards}")
+    return [task for task in tasks if shard_of(task.task_id, num_shards) == shard_index]
+
+
+@dataclass
+class WorkItem:
+    """A leased unit of work: one task under one architecture."""
+    task_id: str
+    problem_id: int
+    architecture: str
+    shard: int
+    attempts: int  # also identifies the lease: it grows with every lease of the item
+    worker: str
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of (task, architecture) work items.
+
+    Item lifecycle: pending -> leased -> done, or back to pending when a
+    lease expires or a run fails, until max_attempts is reached (failed).
+
+    Usage:
+        queue = WorkQueue("results/queue.sqlite")
+        queue.enqueue(tasks, architectures=["B", "C"])
+
+        while (item := queue.lease(worker_id="node1-0")) is not None:
+            ...run the task...
+            queue.complete(item)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        # The lock serializes the worker threads sharing this connection.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS work_items (
+                task_id TEXT NOT NULL,
+                architecture TEXT NOT NULL,
+                problem_id INTEGER NOT NULL,
+                shard INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL,
+                PRIMARY KEY (task_id, architecture)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items (status, shard)"
+        )
+
+    def enqueue(self, tasks: Iterable[Task], architectures: Iterable[str], num_shards: int = 1) -> int:
+        """
+        Add work items; items already in the queue are left untouched.
+
+        Args:
+            tasks: Tasks to run.
+            architectures: Architecture values ("A", "B", "C") to run each task with.
+            num_shards: Number of shards recorded for shard-restricted leasing.
+
+        Returns:
+            Number of newly added items.
+        """
+        rows = [
+            (task.task_id, architecture, task.problem_id, shard_of(task.task_id, num_shards), time.time())
+            for task in tasks
+            for architecture in architectures
+        ]
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO work_items (task_id, architecture, problem_id, shard, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def lease(self, worker_id: str, shard: Optional[int] = None) -> Optional[WorkItem]:
+        """
+        Atomically take the next available item.
+
+        Pending items and items whose lease has expired are available.
+
+        Args:
+            worker_id: Identifier recorded on the lease (e.g. host-pid).
+            shard: Only lease items of this shard, if given.
+
+        Returns:
+            The leased WorkItem, or None when nothing is available.
+        """
+        now = time.time()
+        query = (
+            "SELECT task_id, architecture, problem_id, shard, attempts FROM work_items "
+            "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+            "AND attempts < ?"
+        )
+        params: list = [now, self.max_attempts]
+        if shard is not None:
+            query += " AND shard = ?"
+            params.append(shard)
+        query += " ORDER BY attempts, task_id LIMIT 1"
+
+        with self._transaction():
+            # Items whose last allowed attempt crashed will never be leased again
+            self._conn.execute(
+                "UPDATE work_items SET status = 'failed', error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            task_id, architecture, problem_id, item_shard, attempts = row
+            self._conn.execute(
+                "UPDATE work_items SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE task_id = ? AND architecture = ?",
+                (worker_id, now + self.lease_seconds, now, task_id, architecture),
+            )
+        return WorkItem(task_id, problem_id, architecture, item_shard, attempts + 1, worker_id)
+
+    def renew(self, item: WorkItem) -> bool:
+        """Extend the lease of a long-running item; False if the lease was lost."""
+        return self._set(item, "lease_expires = ?", time.time() + self.lease_seconds)
+
+    def complete(self, item: WorkItem) -> bool:
+        """Mark an item as done; False if the lease was lost."""
+        return self._set(item, "status = 'done', lease_expires = NULL")
+
+    def fail(self, item: WorkItem, error: str) -> bool:
+        """
+        Record a failed run; the item is retried until max_attempts.
+
+        Returns:
+            False if the lease was lost (the item is left untouched).
+        """
+        status = "failed" if item.attempts >= self.max_attempts else "pending"
+        return self._set(item, "status = ?, lease_expires = NULL, error = ?", status, error[:2000])
+
+    def counts(self) -> dict[str, int]:
+        """Number of items per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM work_items GROUP BY status")
+            return dict(rows.fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _set(self, item: WorkItem, assignments: str, *params) -> bool:
+        """
+        Update an item the caller still holds the lease of.
+
+        A worker whose lease expired and was re-leased (possibly to itself)
+        must not overwrite the new holder's state, hence the guard on the
+        worker and on the attempt number of the lease.
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                f"UPDATE work_items SET {assignments}, updated_at = ? "
+                "WHERE task_id = ? AND architecture = ? AND status = 'leased' "
+                "AND worker = ? AND attempts = ?",
+                (*params, time.time(), item.task_id, item.architecture, item.worker, item.attempts),
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE takes the write lock up front, so leases never race."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
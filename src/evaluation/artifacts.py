@@ -0,0 +1,306 @@
+"""
+Content-addressed store of every attempt of every task.
+
+The graph state only keeps the latest generated/reviewed code, and the
+result records only the final one. With an artifact store enabled (the
+ARTIFACT_DB env var or `main.py run --artifacts PATH`), the Tester records
+each test run as one row of the `attempts` table: run, task, architecture,
+attempt number, tier, model, outcome and failure kind. The code, Reviewer
+feedback and error messages of the attempt are stored separately.
+
+Attempts are keyed by run id, so sweeps of the same tasks with other
+models or settings add rows instead of replacing earlier ones. The run id
+defaults to a new one per store (timestamp and process id). Set it with
+`--run-id` or ARTIFACT_RUN_ID: resuming an interrupted sweep with its run
+id replaces the attempts it recorded, and the workers of a distributed
+sweep can share one.
+
+Texts are stored once in the `blobs` table, keyed by their SHA-256 and
+zlib-compressed. Identical programs (common across retries, architectures
+and tasks) therefore cost one row. Attempts are indexed by task, outcome,
+model and tier, and iter_attempts() streams them from a cursor, so sweeps
+of 100k attempts can be analyzed without loading them in memory.
+
+Usage:
+    store = ArtifactStore("results/artifacts.sqlite")
+    for attempt in store.iter_attempts(passed=False, model="Qwen/Qwen2.5-Coder-1.5B-Instruct"):
+        code = store.get_text(attempt["reviewed_hash"])
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterator, Optional, TypedDict
+
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS attempts (
+        run_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        architecture TEXT NOT NULL,
+        attempt INTEGER NOT NULL,
+        tier TEXT,
+        model TEXT,
+        story_points INTEGER,
+        passed INTEGER NOT NULL,
+        verdict_reused INTEGER NOT NULL DEFAULT 0,
+        failure_kind TEXT,
+        tests_total INTEGER,
+        tests_passed INTEGER,
+        generated_hash TEXT,
+        reviewed_hash TEXT,
+        feedback_hash TEXT,
+        errors_hash TEXT,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (task_id, architecture, run_id, attempt)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_attempts_outcome ON attempts (passed, architecture)",
+    "CREATE INDEX IF NOT EXISTS idx_attempts_model ON attempts (model, passed)",
+    "CREATE INDEX IF NOT EXISTS idx_attempts_tier ON attempts (tier, passed)",
+]
+
+_ATTEMPT_COLUMNS = [
+    "run_id", "task_id", "architecture", "attempt", "tier", "model", "story_points", "passed",
+    "verdict_reused", "failure_kind", "tests_total", "tests_passed",
+    "generated_hash", "reviewed_hash", "feedback_hash", "errors_hash", "created_at",
+]
+
+
+class Attempt(TypedDict):
+    """One test run of a task; texts are referenced by blob hash (None if empty)."""
+    run_id: str  # sweep that made the attempt
+    task_id: str
+    architecture: str
+    attempt: int  # 1-based test run of the task
+    tier: Optional[str]
+    model: Optional[str]
+    story_points: Optional[int]
+    passed: bool
+    verdict_reused: bool  # the program was identical to an already tested one
+    failure_kind: Optional[str]
+    tests_total: int
+    tests_passed: int
+    generated_hash: Optional[str]
+    reviewed_hash: Optional[str]
+    feedback_hash: Optional[str]
+    errors_hash: Optional[str]  # JSON list of the Tester error messages
+    created_at: float
+
+
+def text_hash(text: str) -> str:
+    """Address of a text in the blob table."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def new_run_id() -> str:
+    """Run id of a sweep that did not set one: start time and process id."""
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+class ArtifactStore:
+    """
+    SQLite store of attempts and deduplicated, compressed text blobs.
+
+    Safe to share between the worker threads of a sweep; several processes
+    may write to the same file (WAL mode, busy timeout).
+
+    Args:
+        path: SQLite database file.
+        run_id: Run the attempts are recorded under (default: new_run_id()).
+    """
+
+    def __init__(self, path: str, run_id: str = None):
+        self.path = path
+        self.run_id = run_id or new_run_id()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def record_attempt(
+        self,
+        task_id: str,
+        architecture: str,
+        attempt: int,
+        passed: bool,
+        tier: str = None,
+        model: str = None,
+        story_points: int = None,
+        failure_kind: str = None,
+        tests_total: int = 0,
+        tests_passed: int = 0,
+        generated_code: str = None,
+        reviewed_code: str = None,
+        feedback: str = None,
+        errors: list[str] = None,
+        verdict_reused: bool = False
+    ) -> Attempt:
+        """
+        Store one attempt and its texts in a single transaction.
+
+        Recording the same (task_id, architecture, attempt) again in the
+        same run, e.g. when a checkpointed run is resumed, replaces the row.
+
+        Returns:
+            The stored Attempt.
+        """
+        blobs = {}
+
+        def address(text: Optional[str]) -> Optional[str]:
+            if not text:
+                return None
+            key = text_hash(text)
+            blobs[key] = text
+            return key
+
+        row = Attempt(
+            run_id=self.run_id,
+            task_id=task_id,
+            architecture=architecture,
+            attempt=attempt,
+            tier=tier,
+            model=model,
+            story_points=story_points,
+            passed=passed,
+            verdict_reused=verdict_reused,
+            failure_kind=failure_kind,
+            tests_total=tests_total,
+            tests_passed=tests_passed,
+            generated_hash=address(generated_code),
+            reviewed_hash=address(reviewed_code),
+            feedback_hash=address(feedback),
+            errors_hash=address(json.dumps(errors) if errors else None),
+            created_at=time.time(),
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (hash, size, data) VALUES (?, ?, ?)",
+                [
+                    (key, len(text), zlib.compress(text.encode("utf-8")))
+                    for key, text in blobs.items()
+                ],
+            )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO attempts ({', '.join(_ATTEMPT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_ATTEMPT_COLUMNS))})",
+                [row[column] for column in _ATTEMPT_COLUMNS],
+            )
+        return row
+
+    def get_text(self, key: Optional[str]) -> Optional[str]:
+        """Text stored under a blob hash (None for None)."""
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def get_errors(self, attempt: Attempt) -> list[str]:
+        """Tester error messages of an attempt."""
+        return json.loads(self.get_text(attempt["errors_hash"]) or "[]")
+
+    def iter_attempts(
+        self,
+        run_id: str = None,
+        task_id: str = None,
+        architecture: str = None,
+        passed: bool = None,
+        model: str = None,
+        tier: str = None
+    ) -> Iterator[Attempt]:
+        """
+        Stream the attempts matching all given filters, ordered by task and attempt.
+
+        Rows are fetched from the cursor as they are consumed, on a
+        separate read connection, so recording can go on meanwhile.
+        """
+        filters = {
+            "run_id": run_id,
+            "task_id": task_id,
+            "architecture": architecture,
+            "passed": None if passed is None else int(passed),
+            "model": model,
+            "tier": tier,
+        }
+        conditions = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        query = f"SELECT {', '.join(_ATTEMPT_COLUMNS)} FROM attempts"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY task_id, architecture, run_id, attempt"
+
+        reader = sqlite3.connect(self.path, timeout=60)
+        try:
+            cursor = reader.execute(query, [value for value in filters.values() if value is not None])
+            for values in cursor:
+                row = dict(zip(_ATTEMPT_COLUMNS, values))
+                row["passed"] = bool(row["passed"])
+                row["verdict_reused"] = bool(row["verdict_reused"])
+                yield Attempt(**row)
+        finally:
+            reader.close()
+
+    def stats(self) -> dict:
+        """Attempt and blob counts, and the raw vs stored size of the blobs."""
+        with self._lock:
+            attempts = self._conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+        return {"attempts": attempts, "blobs": blobs, "raw_bytes": raw, "stored_bytes": stored}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def enable_artifact_store(path: str, run_id: str = None) -> ArtifactStore:
+    """Record the attempts of every following run in `path`, under `run_id` (default: ARTIFACT_RUN_ID)."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = ArtifactStore(path, run_id or os.getenv("ARTIFACT_RUN_ID"))
+        return _store
+
+
+def disable_artifact_store() -> None:
+    """Stop recording attempts."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Return the active store, enabling it from ARTIFACT_DB on first use."""
+    global _store
+    if _store is None and os.getenv("ARTIFACT_DB"):
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore(os.environ["ARTIFACT_DB"], os.getenv("ARTIFACT_RUN_ID"))
+    return _store
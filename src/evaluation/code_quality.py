@@ -0,0 +1,278 @@
+"""
+Code quality metrics of generated solutions (optional metrics of
+docs/evaluation.md).
+
+For every solution:
+- radon: cyclomatic complexity (mean / max over blocks), maintainability
+  index and raw line counts
+- pylint: score out of 10 and number of messages
+- flake8: number of style violations
+
+Solutions are analyzed in a process pool. Each worker lints a whole batch
+with a single pylint run and a single flake8 run (start-up cost dominates
+per-file runs) and splits the results by file. Results are cached in
+SQLite by the SHA-256 of the code, so identical solutions - common across
+architectures, retries and unchanged reviews - are only analyzed once, ever.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, TypedDict
+
+import pandas as pd
+
+
+DEFAULT_QUALITY_CACHE = os.path.join("results", "code_quality.sqlite")
+
+# Largest number of solutions linted by one pylint / flake8 run
+MAX_BATCH_SIZE = 50
+
+# Messages that only concern the solution file being a script, not its quality
+_PYLINT_DISABLED = "missing-module-docstring,invalid-name"
+
+
+class QualityMetrics(TypedDict):
+    """Quality metrics of one solution. None when the tool could not run (e.g. syntax error)."""
+    loc: int
+    sloc: Optional[int]
+    comments: Optional[int]
+    cyclomatic_complexity: Optional[float]
+    max_cyclomatic_complexity: Optional[int]
+    maintainability_index: Optional[float]
+    pylint_score: Optional[float]
+    pylint_messages: Optional[int]
+    flake8_violations: Optional[int]
+
+
+def code_hash(code: str) -> str:
+    """Cache key of a solution."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def _radon_metrics(code: str) -> dict:
+    from radon.complexity import cc_visit
+    from radon.metrics import mi_visit
+    from radon.raw import analyze
+
+    try:
+        raw = analyze(code)
+        complexities = [block.complexity for block in cc_visit(code)] or [1]
+    except SyntaxError:
+        return {
+            "loc": len(code.splitlines()),
+            "sloc": None,
+            "comments": None,
+            "cyclomatic_complexity": None,
+            "max_cyclomatic_complexity": None,
+            "maintainability_index": None,
+        }
+    return {
+        "loc": raw.loc,
+        "sloc": raw.sloc,
+        "comments": raw.comments,
+        "cyclomatic_complexity": sum(complexities) / len(complexities),
+        "max_cyclomatic_complexity": max(complexities),
+        "maintainability_index": mi_visit(code, multi=True),
+    }
+
+
+def _pylint_metrics(paths: list[str]) -> list[dict]:
+    """Lint all files in one pylint run; score each module with pylint's formula."""
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    run = Run(
+        ["--persistent=n", "--score=y", f"--disable={_PYLINT_DISABLED}", *paths],
+        reporter=CollectingReporter(),
+        exit=False,
+    )
+    by_module = run.linter.stats.by_module
+    results = []
+    for path in paths:
+        stats = by_module.get(os.path.splitext(os.path.basename(path))[0])
+        if not stats or not stats["statement"] or stats["fatal"]:
+            results.append({"pylint_score": None, "pylint_messages": None})
+            continue
+        weighted = 5 * stats["error"] + stats["warning"] + stats["refactor"] + stats["convention"]
+        results.append({
+            "pylint_score": round(max(0.0, 10.0 - weighted / stats["statement"] * 10), 2),
+            "pylint_messages": sum(stats[key] for key in ("error", "warning", "refactor", "convention")),
+        })
+    return results
+
+
+def _flake8_violations(paths: list[str]) -> list[int]:
+    """Check all files in one flake8 run; count the reported violations per file."""
+    from flake8.api import legacy
+    from flake8.formatting.base import BaseFormatter
+    from flake8.main.options import JobsArgument
+
+    counts = Counter()
+
+    class CountingFormatter(BaseFormatter):
+        def handle(self, error):
+            counts[os.path.normpath(error.filename)] += 1
+
+    # One job: batches already run in parallel across the process pool
+    style_guide = legacy.get_style_guide(quiet=2, jobs=JobsArgument("1"))
+    style_guide.init_report(CountingFormatter)
+    style_guide.check_files(paths)
+    return [counts[os.path.normpath(path)] for path in paths]
+
+
+def analyze_batch(codes: list[str]) -> list[QualityMetrics]:
+    """
+    Compute the metrics of several solutions (runs in a worker process).
+
+    Args:
+        codes: Solution source codes.
+
+    Returns:
+        One QualityMetrics per solution, in order.
+    """
+    with tempfile.TemporaryDirectory(prefix="quality_") as directory:
+        paths = []
+        for index, code in enumerate(codes):
+            path = os.path.join(directory, f"solution_{index}.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(code)
+            paths.append(path)
+
+        pylint_results = _pylint_metrics(paths)
+        flake8_results = _flake8_violations(paths)
+        results = []
+        for code, pylint_result, violations in zip(codes, pylint_results, flake8_results):
+            metrics = _radon_metrics(code)
+            metrics.update(pylint_result)
+            metrics["flake8_violations"] = (
+                violations if metrics["maintainability_index"] is not None else None
+            )
+            results.append(QualityMetrics(**metrics))
+    return results
+
+
+class QualityCache:
+    """SQLite cache of QualityMetrics keyed by code hash."""
+
+    def __init__(self, path: str = DEFAULT_QUALITY_CACHE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS code_quality (code_hash TEXT PRIMARY KEY, metrics TEXT NOT NULL)"
+        )
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, QualityMetrics]:
+        hashes = list(hashes)
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT code_hash, metrics FROM code_quality "
+                    f"WHERE code_hash IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                found.update((key, json.loads(metrics)) for key, metrics in rows)
+        return found
+
+    def put_many(self, items: dict[str, QualityMetrics]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO code_quality (code_hash, metrics) VALUES (?, ?)",
+                [(key, json.dumps(metrics)) for key, metrics in items.items()],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def analyze_solutions(
+    codes: Iterable[Optional[str]],
+    cache: Optional[QualityCache] = None,
+    workers: int = None
+) -> list[Optional[QualityMetrics]]:
+    """
+    Compute quality metrics for many solutions.
+
+    Identical solutions are analyzed once; cached solutions are not
+    analyzed at all. The rest is split into batches for a process pool.
+
+    Args:
+        codes: Solution source codes (None / empty for missing code).
+        cache: Cache to read from and fill (None disables caching).
+        workers: Number of worker processes (default: CPU count).
+
+    Returns:
+        QualityMetrics per input, None for missing code.
+    """
+    codes = list(codes)
+    unique = {code_hash(code): code for code in codes if code}
+    known = cache.get_many(unique) if cache is not None else {}
+    missing = [(key, code) for key, code in unique.items() if key not in known]
+
+    if missing:
+        workers = workers or os.cpu_count() or 1
+        batch_size = max(1, min(MAX_BATCH_SIZE, -(-len(missing) // workers)))
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+
+        computed = {}
+        if len(batches) == 1:
+            results = [analyze_batch([code for _, code in batches[0]])]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+                results = pool.map(analyze_batch, [[code for _, code in batch] for batch in batches])
+        for batch, batch_results in zip(batches, results):
+            computed.update((key, metrics) for (key, _), metrics in zip(batch, batch_results))
+
+        if cache is not None:
+            cache.put_many(computed)
+        known.update(computed)
+
+    return [known[code_hash(code)] if code else None for code in codes]
+
+
+def quality_table(
+    records: Iterable[dict],
+    fields: tuple[str, ...] = ("generated_code", "reviewed_code"),
+    cache: Optional[QualityCache] = None,
+    workers: int = None
+) -> pd.DataFrame:
+    """
+    Quality metrics of the solutions in result records.
+
+    Every field is analyzed separately, so generated and reviewed code can
+    be compared; a reviewed solution identical to the generated one is
+    only analyzed once. Records without code in a field get no row for it.
+
+    Args:
+        records: Result records (e.g. from src.evaluation.results.read_results).
+        fields: Code fields to analyze.
+        cache: Quality cache (None disables caching).
+        workers: Number of worker processes.
+
+    Returns:
+        DataFrame with task_id, architecture, solution (the field) and the
+        QualityMetrics columns, one row per record and field.
+    """
+    keys, codes = [], []
+    for record in records:
+        for field in fields:
+            if record.get(field):
+                keys.append((record["task_id"], record["architecture"], field))
+                codes.append(record[field])
+
+    metrics = analyze_solutions(codes, cache=cache, workers=workers)
+    table = pd.DataFrame.from_records(metrics, columns=list(QualityMetrics.__annotations__))
+    for position, column in enumerate(("task_id", "architecture", "solution")):
+        table.insert(position, column, [key[position] for key in keys])
+    return table
@@ -0,0 +1,265 @@
+"""
+Metrics over JSONL result files.
+
+ResultsAggregator loads the numeric/categorical fields of the result
+records (schema in docs/evaluation.md) into one pandas DataFrame and
+computes the RQ1-RQ3 tables of the analysis plan with grouped, vectorized
+operations. Each line is parsed on its own and only the metric columns are
+kept, so large text fields (code, rationale, feedback) never accumulate in
+memory or reach the frame.
+
+Updates are incremental: the aggregator remembers how many bytes of each
+file it has consumed, so refresh() only parses records appended since the
+previous call. A half-written last line is left for the next refresh.
+
+Usage:
+    aggregator = ResultsAggregator("results/")
+    print(aggregator.summary())
+
+    ...more tasks finish...
+    aggregator.refresh()
+    print(aggregator.pass_rate_by_difficulty())
+"""
+
+import glob
+import json
+import os
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Fields loaded from each record; everything else is skipped
+METRIC_COLUMNS = [
+    "task_id",
+    "architecture",
+    "difficulty_ground_truth",
+    "story_points_initial",
+    "story_points_final",
+    "routed_by",
+    "developer_tier_initial",
+    "developer_tier_final",
+    "escalations",
+    "retry_count",
+    "status",
+    "test_passed",
+    "tests_total",
+    "tests_passed",
+    "total_tokens",
+    "api_calls",
+    "execution_time_seconds",
+]
+
+KEY_COLUMNS = ["task_id", "architecture"]
+
+DIFFICULTY_ORDER = ["introductory", "interview", "competition"]
+
+# z-score of the two-sided 95% confidence interval
+_Z_95 = 1.959964
+
+
+def wilson_interval(successes, totals, z: float = _Z_95) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score confidence interval of a proportion, element-wise.
+
+    Args:
+        successes: Number of successes per group (array-like).
+        totals: Number of trials per group (array-like).
+        z: z-score of the confidence level.
+
+    Returns:
+        (low, high) arrays of the interval bounds.
+    """
+    successes = np.asarray(successes, dtype=float)
+    totals = np.asarray(totals, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z**2 / totals
+        center = (p + z**2 / (2 * totals)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / totals + z**2 / (4 * totals**2)) / denominator
+    return center - margin, center + margin
+
+
+class ResultsAggregator:
+    """
+    Incrementally loaded table of result records.
+
+    Args:
+        sources: A results directory (every *.jsonl inside is read), a
+                 single JSONL file, or a list of files. Directories are
+                 re-scanned on refresh(), so new shard files are picked up.
+    """
+
+    def __init__(self, sources: Union[str, Iterable[str]]):
+        self.sources = [sources] if isinstance(sources, str) else list(sources)
+        self._offsets: dict[str, int] = {}
+        self._chunks: dict[str, list[pd.DataFrame]] = {}
+        self._frame: pd.DataFrame = None
+        self.refresh()
+
+    @property
+    def files(self) -> list[str]:
+        """Result files currently matched by the sources."""
+        files = []
+        for source in self.sources:
+            if os.path.isdir(source):
+                files.extend(sorted(glob.glob(os.path.join(source, "*.jsonl"))))
+            elif os.path.exists(source):
+                files.append(source)
+        return files
+
+    def refresh(self) -> int:
+        """
+        Read the records appended since the last refresh.
+
+        A file that shrank (rewritten, e.g. by merge_results) is re-read
+        from the start.
+
+        Returns:
+            Number of new records.
+        """
+        added = 0
+        for path in self.files:
+            offset = self._offsets.get(path, 0)
+            if os.path.getsize(path) < offset:
+                offset = 0
+                self._chunks[path] = []
+                self._frame = None
+
+            rows = []
+            consumed = 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # only consume complete lines
+                    consumed += len(line)
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # line truncated by a killed writer
+                    # Project right away; the text fields are dropped with `record`
+                    rows.append([record.get(column) for column in METRIC_COLUMNS])
+            self._offsets[path] = offset + consumed
+            if not rows:
+                continue
+            self._chunks.setdefault(path, []).append(pd.DataFrame(rows, columns=METRIC_COLUMNS))
+            self._frame = None
+            added += len(rows)
+        return added
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        One row per (task_id, architecture); the record read last wins,
+        matching merge_results().
+        """
+        if self._frame is None:
+            chunks = [chunk for path in sorted(self._chunks) for chunk in self._chunks[path]]
+            if chunks:
+                frame = pd.concat(chunks, ignore_index=True)
+            else:
+                frame = pd.DataFrame(columns=METRIC_COLUMNS)
+            frame = frame.drop_duplicates(subset=KEY_COLUMNS, keep="last").reset_index(drop=True)
+            self._frame = _normalize(frame)
+        return self._frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # --- Primary and cost metrics (RQ1, RQ2) ---
+
+    def summary(self, by: Union[str, list[str]] = "architecture") -> pd.DataFrame:
+        """
+        Pass rate (with 95% Wilson CI), pass@1 and mean cost per group.
+
+        Pass@1 counts tasks solved without any retry: the single call of
+        architecture A, or the first Developer attempt of B/C.
+        """
+        frame = self.frame
+        grouped = frame.assign(
+            first_pass=frame["test_passed"] & (frame["retry_count"].fillna(0) == 0),
+            crashed=frame["status"] == "error",
+        ).groupby(by, observed=True)
+
+        table = grouped.agg(
+            tasks=("task_id", "size"),
+            passed=("test_passed", "sum"),
+            pass_at_1=("first_pass", "mean"),
+            pass_rate=("test_passed", "mean"),
+            errors=("crashed", "sum"),
+            avg_tokens=("total_tokens", "mean"),
+            avg_api_calls=("api_calls", "mean"),
+            avg_time_seconds=("execution_time_seconds", "mean"),
+            avg_retries=("retry_count", "mean"),
+            avg_escalations=("escalations", "mean"),
+        )
+        table["ci_low"], table["ci_high"] = wilson_interval(table["passed"], table["tasks"])
+        return table
+
+    def pass_rate_by_difficulty(self) -> pd.DataFrame:
+        """Pass rate per dataset difficulty (rows) and architecture (columns)."""
+        return self.frame.pivot_table(
+            index="difficulty_ground_truth",
+            columns="architecture",
+            values="test_passed",
+            aggfunc="mean",
+            observed=True,
+        )
+
+    # --- Adaptive metrics (RQ3) ---
+
+    def tier_distribution(self, tier: str = "developer_tier_initial") -> pd.DataFrame:
+        """Share of tasks routed to each tier, per architecture."""
+        frame = self.frame.dropna(subset=[tier])
+        return pd.crosstab(frame["architecture"], frame[tier], normalize="index")
+
+    def escalation_patterns(self) -> pd.DataFrame:
+        """Count and pass rate of every initial -> final tier pattern."""
+        frame = self.frame.dropna(subset=["developer_tier_initial", "developer_tier_final"])
+        pattern = frame["developer_tier_initial"].astype(str).str.cat(
+            frame["developer_tier_final"].astype(str), sep=" -> "
+        )
+        return frame.assign(pattern=pattern).groupby(["architecture", "pattern"], observed=True).agg(
+            tasks=("task_id", "size"),
+            pass_rate=("test_passed", "mean"),
+            avg_escalations=("escalations", "mean"),
+        )
+
+    def routing_summary(self) -> pd.DataFrame:
+        """Tasks, pass rate and cost per router (Planner or learned router), per architecture."""
+        frame = self.frame.dropna(subset=["routed_by"])
+        return frame.groupby(["architecture", "routed_by"], observed=True).agg(
+            tasks=("task_id", "size"),
+            pass_rate=("test_passed", "mean"),
+            avg_api_calls=("api_calls", "mean"),
+            avg_tokens=("total_tokens", "mean"),
+            avg_escalations=("escalations", "mean"),
+        )
+
+    def story_point_accuracy(self) -> pd.DataFrame:
+        """Planner story points per dataset difficulty."""
+        frame = self.frame.dropna(subset=["story_points_initial"])
+        return frame.groupby("difficulty_ground_truth", observed=True)["story_points_initial"].describe()
+
+    def retry_distribution(self) -> pd.DataFrame:
+        """Number of tasks per retry count (columns: architectures)."""
+        frame = self.frame
+        retries = frame["retry_count"].fillna(0).astype(int)
+        return pd.crosstab(retries.rename("retries"), frame["architecture"])
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    """Give the loaded columns compact, analysis-friendly dtypes."""
+    frame["test_passed"] = frame["test_passed"].fillna(False).astype(bool)
+    for column in ("architecture", "status", "routed_by", "developer_tier_initial", "developer_tier_final"):
+        frame[column] = frame[column].astype("category")
+    frame["difficulty_ground_truth"] = pd.Categorical(
+        frame["difficulty_ground_truth"], categories=DIFFICULTY_ORDER
+    )
+    for column in ("story_points_initial", "story_points_final", "escalations", "retry_count",
+                   "tests_total", "tests_passed", "total_tokens", "api_calls",
+                   "execution_time_seconds"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
@@ -0,0 +1,185 @@
+"""
+JSONL result files.
+
+Each line is one task execution record (schema in docs/evaluation.md).
+ResultsWriter appends records as soon as a task finishes, one line-buffered
+write per record, so a file is always readable and can be appended to
+across runs. Sharded sweeps write one file per shard; merge_results()
+combines them into a single file with one record per (task_id, architecture).
+"""
+
+import json
+import os
+import threading
+from typing import Iterable, Iterator, Optional
+
+from src.data.task_loader import Task
+from src.graph.config import get_developer_tier
+from src.graph.learned_router import task_features
+from src.graph.state import GraphState
+
+
+def build_record(
+    task: Task,
+    architecture: str,
+    state: Optional[GraphState],
+    elapsed_seconds: float,
+    error: str = None
+) -> dict:
+    """
+    Build the result record of one task execution.
+
+    Args:
+        task: The APPS task that was run.
+        architecture: Architecture value ("A", "B" or "C").
+        state: Final graph state, or None if the run crashed.
+        elapsed_seconds: Wall-clock duration of the run.
+        error: Exception message if the run crashed.
+
+    Returns:
+        Record following the schema in docs/evaluation.md.
+    """
+    record = {
+        "task_id": task.task_id,
+        "architecture": architecture,
+        "difficulty_ground_truth": task.difficulty,
+        "execution_time_seconds": round(elapsed_seconds, 3),
+    }
+    if state is None:
+        record.update(status="error", test_passed=False, error=error)
+        return record
+
+    plan = state["plan"]
+    story_points_initial = state["story_points_initial"]
+    record.update({
+        # Planner output
+        "story_points_initial": story_points_initial,
+        "story_points_final": state["story_points_current"],
+        "planner_rationale": plan["rationale"] if plan else None,
+
+        # Routing
+        "routed_by": state["routed_by"],
+        "router_confidence": state["router_confidence"],
+        "speculation": state["speculation"],
+        "task_features": task_features(task.question, task.difficulty),
+        "developer_tier_initial": get_developer_tier(story_points_initial) if story_points_initial else None,
+        "developer_tier_final": state["developer_tier"],
+        "escalations": state["escalations"],
+        "retry_count": state["retries"],
+
+        # Result
+        "status": state["status"],
+        "test_passed": state["test_passed"],
+        "tests_total": state["tests_total"],
+        "tests_passed": state["tests_passed"],
+        "test_report": state["test_report"],
+
+        # Cost
+        "total_tokens": state["total_tokens"],
+        "api_calls": state["llm_calls"],
+
+        # Code
+        "generated_code": state["generated_code"],
+        "reviewed_code": state["reviewed_code"],
+        "reviewer_feedback": state["reviewer_feedback"],
+        "failure_history": state["failure_history"],
+    })
+    return record
+
+
+class ResultsWriter:
+    """
+    Thread-safe, append-only JSONL writer.
+
+    The file is opened in append mode with line buffering: every record
+    reaches the OS as soon as it is written, and existing results are kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+
+        # Terminate a line left truncated by a killed writer
+        if self._file.tell() > 0:
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def recorded_keys(path: str) -> set[tuple[str, str]]:
+    """(task_id, architecture) pairs with a successful record in a results file."""
+    if not os.path.exists(path):
+        return set()
+    return {
+        (record["task_id"], record["architecture"])
+        for record in read_results(path)
+        if record.get("status") != "error"
+    }
+
+
+def read_results(path: str) -> Iterator[dict]:
+    """
+    Iterate over the records of a JSONL results file.
+
+    A truncated last line (writer killed mid-write) is skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def merge_results(paths: Iterable[str], output_path: str) -> int:
+    """
+    Merge per-shard JSONL files into one.
+
+    When the same (task_id, architecture) appears more than once (e.g. a
+    task retried after a worker crash), the record read last wins.
+
+    Args:
+        paths: Shard result files, in order of precedence (lowest first).
+        output_path: Merged JSONL file to write.
+
+    Returns:
+        Number of records written.
+    """
+    merged: dict[tuple[str, str], dict] = {}
+    for path in paths:
+        for record in read_results(path):
+            merged[(record["task_id"], record["architecture"])] = record
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in merged.values():
+            f.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, output_path)
+    return len(merged)
@@ -0,0 +1,112 @@
+"""
+Per-task resource budgets.
+
+A TaskBudget caps what a single task may consume: total LLM tokens, number
+of LLM calls and wall-clock seconds. Each limit is optional. LLM nodes
+check the budget before calling a model, the Tester checks the wall-clock
+limit between test cases, and the edge after the Tester ends the task as
+soon as the budget is exhausted. Code generated before the budget ran out
+is still tested, so a budget-limited task can still pass.
+
+Defaults come from the BUDGET_MAX_TOKENS, BUDGET_MAX_LLM_CALLS and
+BUDGET_MAX_WALL_SECONDS env vars (unset = unlimited).
+
+Wall time is counted per session: a task resumed from a checkpoint keeps
+the time its earlier sessions spent up to their last checkpoint, but not
+the downtime in between.
+"""
+
+import os
+import time
+from typing import Optional, TypedDict
+
+
+BUDGET_EXHAUSTED = "budget_exhausted"
+
+
+class TaskBudget(TypedDict):
+    """Resource limits for one task. None means unlimited."""
+    max_tokens: Optional[int]
+    max_llm_calls: Optional[int]
+    max_wall_seconds: Optional[float]
+
+
+def _env_number(name: str, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+def get_default_budget() -> TaskBudget:
+    """Build the default budget from environment variables."""
+    return TaskBudget(
+        max_tokens=_env_number("BUDGET_MAX_TOKENS", int),
+        max_llm_calls=_env_number("BUDGET_MAX_LLM_CALLS", int),
+        max_wall_seconds=_env_number("BUDGET_MAX_WALL_SECONDS", float),
+    )
+
+
+def elapsed_seconds(state) -> float:
+    """Wall-clock seconds spent on the task, over all of its sessions."""
+    return state.get("elapsed_before_resume", 0.0) + time.time() - state["started_at"]
+
+
+def resume_clock(state, checkpointed_at: float) -> dict:
+    """
+    State updates that restart the wall clock of a resumed task.
+
+    Args:
+        state: State of the latest checkpoint.
+        checkpointed_at: Unix time at which that checkpoint was written.
+
+    Returns:
+        New elapsed_before_resume (earlier sessions up to the checkpoint) and started_at (now).
+    """
+    session = max(checkpointed_at - state["started_at"], 0.0)
+    return {
+        "elapsed_before_resume": state.get("elapsed_before_resume", 0.0) + session,
+        "started_at": time.time(),
+    }
+
+
+def remaining_wall_seconds(state) -> Optional[float]:
+    """Seconds left before the wall-clock limit, or None if unlimited."""
+    budget = state["budget"]
+    if not budget or budget["max_wall_seconds"] is None:
+        return None
+    return budget["max_wall_seconds"] - elapsed_seconds(state)
+
+
+def budget_exhausted(state, wall_only: bool = False) -> Optional[str]:
+    """
+    Check whether a task has used up its budget.
+
+    Args:
+        state: Current GraphState.
+        wall_only: Only check the wall-clock limit (used by the Tester,
+                   which does not consume tokens).
+
+    Returns:
+        Human-readable reason if a limit is reached, otherwise None.
+    """
+    budget = state["budget"]
+    if not budget:
+        return None
+
+    remaining = remaining_wall_seconds(state)
+    if remaining is not None and remaining <= 0:
+        return f"wall time {elapsed_seconds(state):.1f}s >= {budget['max_wall_seconds']}s"
+    if wall_only:
+        return None
+
+    if budget["max_tokens"] is not None and state["total_tokens"] >= budget["max_tokens"]:
+        return f"tokens {state['total_tokens']} >= {budget['max_tokens']}"
+    if budget["max_llm_calls"] is not None and state["llm_calls"] >= budget["max_llm_calls"]:
+        return f"LLM calls {state['llm_calls']} >= {budget['max_llm_calls']}"
+    return None
+
+
+def mark_budget_exhausted(state, reason: str) -> None:
+    """End the task with the budget_exhausted status."""
+    state["status"] = BUDGET_EXHAUSTED
+    state["test_passed"] = False
+    state["failure_history"].append(f"Budget exhausted: {reason}")
@@ -0,0 +1,80 @@
+"""
+Durable checkpointing for graph runs.
+
+Every node transition is persisted to a local SQLite database through the
+LangGraph SqliteSaver. Each task gets its own thread, keyed by architecture
+and task id, so an interrupted sweep can be resumed:
+- completed tasks are skipped and their final state is returned as-is
+- in-progress tasks restart from their last completed node
+- tasks with no checkpoint start from scratch
+"""
+
+import os
+import sqlite3
+from typing import TYPE_CHECKING, Literal
+
+from src.agents.llm import Architecture, get_architecture
+
+if TYPE_CHECKING:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+DEFAULT_CHECKPOINT_PATH = os.path.join("results", "checkpoints.sqlite")
+
+TaskStatus = Literal["pending", "in_progress", "completed"]
+
+
+def get_checkpointer(path: str = None) -> "SqliteSaver":
+    """
+    Open (or create) a SQLite-backed checkpointer.
+
+    Args:
+        path: Database file. Defaults to CHECKPOINT_DB env var or
+              results/checkpoints.sqlite.
+
+    Returns:
+        SqliteSaver that can be passed to build_graph / run_graph.
+    """
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    path = path or os.getenv("CHECKPOINT_DB", DEFAULT_CHECKPOINT_PATH)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # The saver serializes access with its own lock, so one connection
+    # can be shared by the worker threads of a sweep.
+    conn = sqlite3.connect(path, check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def thread_id_for(task_id: str, architecture: Architecture = None) -> str:
+    """Checkpoint thread id for a task run under a given architecture."""
+    if architecture is None:
+        architecture = get_architecture()
+    return f"{architecture.value}:{task_id}"
+
+
+def thread_config(task_id: str, architecture: Architecture = None) -> dict:
+    """LangGraph run config selecting the checkpoint thread of a task."""
+    return {"configurable": {"thread_id": thread_id_for(task_id, architecture)}}
+
+
+def get_task_status(graph, config: dict) -> TaskStatus:
+    """
+    Inspect the latest checkpoint of a task thread.
+
+    Args:
+        graph: Graph compiled with a checkpointer.
+        config: Config returned by thread_config().
+
+    Returns:
+        "pending" if nothing was recorded, "completed" if the run reached END,
+        "in_progress" if there are nodes left to execute.
+    """
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        return "pending"
+    if snapshot.next:
+        return "in_progress"
+    return "completed"
@@ -0,0 +1,186 @@
+"""
+Output comparison for the Tester.
+
+A program's output matches the expected output when, line by line and
+token by token, they are the same up to:
+- whitespace: trailing spaces, runs of spaces/tabs, \\r\\n line endings and
+  blank lines are ignored
+- numeric tolerance: two numeric tokens, at least one of them with a
+  decimal point or an exponent, match when they are within the float
+  tolerance (relative or absolute), so 0.5 matches 0.50000. Integer tokens
+  must be equal: 123456789 never matches 123456790
+- APPS list-style outputs: an expected output stored as a JSON list of
+  lines (["1", "2"]) matches the same lines printed one per line
+
+Normalization only uses str.split/str.join per line, and normalized
+outputs are compared as lists of lines; the token-by-token numeric pass
+only runs on lines that differ after normalization. A 10 MB output is
+compared in a fraction of a second.
+
+The tolerance comes from OUTPUT_FLOAT_TOLERANCE (0 disables numeric
+matching) and OUTPUT_COMPARISON=exact restores the plain stripped string
+comparison.
+"""
+
+import json
+import math
+import os
+import re
+from typing import Literal
+
+
+ComparisonMode = Literal["tokens", "exact"]
+
+DEFAULT_FLOAT_TOLERANCE = 1e-6
+
+# Longest excerpt of an output quoted in a failure message
+MAX_PREVIEW_CHARS = 200
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_INTEGER = re.compile(r"[-+]?\d+")
+
+
+def get_comparison_mode() -> ComparisonMode:
+    """Comparison mode from the OUTPUT_COMPARISON env var."""
+    mode = os.getenv("OUTPUT_COMPARISON", "tokens")
+    if mode not in ("tokens", "exact"):
+        raise ValueError(f"Invalid OUTPUT_COMPARISON: {mode}. Must be 'tokens' or 'exact'")
+    return mode
+
+
+def get_float_tolerance() -> float:
+    """Numeric tolerance from the OUTPUT_FLOAT_TOLERANCE env var."""
+    return float(os.getenv("OUTPUT_FLOAT_TOLERANCE", DEFAULT_FLOAT_TOLERANCE))
+
+
+def normalized_lines(text: str) -> list[str]:
+    """Non-blank lines of an output, with whitespace runs collapsed to one space."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def normalize_output(text: str) -> str:
+    """Canonical form of an output: single spaces, no blank lines, no \\r."""
+    return "\n".join(normalized_lines(text))
+
+
+def expected_as_text(expected) -> str:
+    """
+    Render an expected output as program output.
+
+    APPS stores most outputs as strings, but some as lists of lines or
+    other JSON values; lists become one element per line.
+    """
+    if isinstance(expected, str):
+        return expected
+    if isinstance(expected, list):
+        return "\n".join(
+            " ".join(map(expected_as_text, item)) if isinstance(item, list) else expected_as_text(item)
+            for item in expected
+        )
+    if expected is None:
+        return ""
+    return str(expected)  # numbers and booleans print like Python values
+
+
+def _canonical_integer(token: str) -> str:
+    """Integer token without "+" and leading zeros; a string, so any length compares exactly."""
+    digits = token.lstrip("+-").lstrip("0") or "0"
+    return "-" + digits if token.startswith("-") and digits != "0" else digits
+
+
+def _tokens_match(actual: str, expected: str, tolerance: float) -> bool:
+    if actual == expected:
+        return True
+    if tolerance <= 0 or not (_NUMBER.fullmatch(actual) and _NUMBER.fullmatch(expected)):
+        return False
+    if _INTEGER.fullmatch(actual) and _INTEGER.fullmatch(expected):
+        return _canonical_integer(actual) == _canonical_integer(expected)
+    return math.isclose(float(actual), float(expected), rel_tol=tolerance, abs_tol=tolerance)
+
+
+def _lines_match(actual: list[str], expected: list[str], tolerance: float) -> bool:
+    if actual == expected:
+        return True
+    if tolerance <= 0 or len(actual) != len(expected):
+        return False
+    for actual_line, expected_line in zip(actual, expected):
+        if actual_line == expected_line:
+            continue
+        actual_tokens = actual_line.split(" ")
+        expected_tokens = expected_line.split(" ")
+        if len(actual_tokens) != len(expected_tokens):
+            return False
+        if not all(_tokens_match(a, e, tolerance) for a, e in zip(actual_tokens, expected_tokens)):
+            return False
+    return True
+
+
+def outputs_match(
+    actual: str,
+    expected,
+    tolerance: float = None,
+    mode: ComparisonMode = None
+) -> bool:
+    """
+    Check a program output against the expected output.
+
+    Args:
+        actual: Program stdout.
+        expected: Expected output (string, or an APPS list-style value).
+        tolerance: Numeric tolerance (defaults to OUTPUT_FLOAT_TOLERANCE).
+        mode: "tokens" or "exact" (defaults to OUTPUT_COMPARISON).
+
+    Returns:
+        True if the output is accepted.
+    """
+    mode = mode or get_comparison_mode()
+    tolerance = get_float_tolerance() if tolerance is None else tolerance
+    expected_text = expected_as_text(expected)
+
+    # Fast path, also the whole check in exact mode
+    if actual.strip() == expected_text.strip():
+        return True
+    if mode == "exact":
+        return False
+
+    actual_lines = normalized_lines(actual)
+    if _lines_match(actual_lines, normalized_lines(expected_text), tolerance):
+        return True
+
+    # A list of lines serialized as JSON text (local cache / fixtures)
+    if expected_text.lstrip().startswith("["):
+        try:
+            decoded = json.loads(expected_text)
+        except json.JSONDecodeError:
+            return False
+        if isinstance(decoded, list):
+            return _lines_match(actual_lines, normalized_lines(expected_as_text(decoded)), tolerance)
+    return False
+
+
+def _preview(text: str) -> str:
+    if len(text) <= MAX_PREVIEW_CHARS:
+        return text
+    return f"{text[:MAX_PREVIEW_CHARS]}... ({len(text)} chars)"
+
+
+def describe_mismatch(actual: str, expected) -> str:
+    """
+    Short failure description: both outputs, truncated, plus the first
+    differing line for multi-line outputs.
+    """
+    actual_lines = normalized_lines(actual)
+    expected_lines = normalized_lines(expected_as_text(expected))
+    expected_text = _preview("\n".join(expected_lines))
+    actual_text = _preview("\n".join(actual_lines))
+    message = f"Expected '{expected_text}', got '{actual_text}'"
+
+    if len(actual_lines) > 1 or len(expected_lines) > 1:
+        for number, (actual_line, expected_line) in enumerate(zip(actual_lines, expected_lines), 1):
+            if actual_line != expected_line:
+                message += f" (first difference at line {number})"
+                break
+        else:
+            message += f" ({len(expected_lines)} lines expected, {len(actual_lines)} printed)"
+    return message
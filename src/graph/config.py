@@ -1,4 +1,5 @@
-from typing import Literal
+import os
+from typing import Literal, Optional
 
 DIFFICULTY_CATEGORIES: dict[Literal[1, 2, 3, 5, 8], Literal["S", "M", "L"]] = {
     1: "S",  
@@ -12,9 +13,63 @@ def get_developer_tier(story_points: Literal[1, 2, 3, 5, 8]) -> Literal["S", "M"
     return DIFFICULTY_CATEGORIES[story_points]
 
 class NodeNames:
+    LEARNED_ROUTER = "learned_router"
     PLANNER = "planner"
     ROUTER = "router"
     DEVELOPER = "developer"
     REVIEWER = "reviewer"
     TESTER = "tester"
     SINGLE_AGENT = "single_agent"
+
+
+TesterMode = Literal["full", "staged"]
+
+# Number of test cases in the smoke stage of the staged Tester
+DEFAULT_SMOKE_TEST_CASES = 3
+
+
+def get_tester_mode() -> TesterMode:
+    """
+    Tester mode from the TESTER_MODE env var.
+    
+    "full" runs every test case; "staged" first runs a small smoke subset
+    and only runs the full suite if the smoke stage passes.
+    """
+    mode = os.getenv("TESTER_MODE", "full")
+    if mode not in ("full", "staged"):
+        raise ValueError(f"Invalid TESTER_MODE: {mode}. Must be 'full' or 'staged'")
+    return mode
+
+
+def get_smoke_test_cases() -> int:
+    """Size of the smoke stage from the SMOKE_TEST_CASES env var."""
+    return int(os.getenv("SMOKE_TEST_CASES", DEFAULT_SMOKE_TEST_CASES))
+
+
+def get_speculative_tier() -> Optional[Literal["S", "M", "L"]]:
+    """
+    Tier of the speculative Developer from the SPECULATIVE_DEVELOPER_TIER
+    env var. When set, a Developer of this tier starts together with the
+    Planner; None (unset) disables speculation.
+    """
+    tier = os.getenv("SPECULATIVE_DEVELOPER_TIER") or None
+    if tier is not None and tier not in ("S", "M", "L"):
+        raise ValueError(f"Invalid SPECULATIVE_DEVELOPER_TIER: {tier}. Must be 'S', 'M' or 'L'")
+    return tier
+
+
+# Probability above which the learned router skips the Planner
+DEFAULT_ROUTER_CONFIDENCE = 0.8
+
+
+def get_router_model_path() -> Optional[str]:
+    """
+    Learned router model from the ROUTER_MODEL env var (see
+    src/graph/learned_router.py). None disables the learned router.
+    """
+    return os.getenv("ROUTER_MODEL") or None
+
+
+def get_router_confidence() -> float:
+    """Confidence threshold of the learned router from the ROUTER_CONFIDENCE env var."""
+    return float(os.getenv("ROUTER_CONFIDENCE", DEFAULT_ROUTER_CONFIDENCE))
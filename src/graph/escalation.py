@@ -0,0 +1,166 @@
+"""
+Escalation policies for the Router.
+
+After a failed test run the graph asks an EscalationPolicy what to do next:
+- escalate one tier (S -> M -> L)
+- jump directly to the L tier
+- retry the same tier with the failure feedback
+- stop
+
+Failures are classified from the Tester error messages so a policy can
+react differently to syntax errors, timeouts, runtime errors and wrong
+answers. The policy is selected with the ESCALATION_POLICY env var or
+passed explicitly to build_graph().
+"""
+
+import hashlib
+import os
+import re
+from enum import Enum
+
+from src.graph.state import GraphState
+
+
+class FailureKind(str, Enum):
+    """Category of a failed test run."""
+    NO_CODE = "no_code"
+    SYNTAX_ERROR = "syntax_error"
+    RUNTIME_ERROR = "runtime_error"
+    TIMEOUT = "timeout"
+    WRONG_ANSWER = "wrong_answer"
+
+
+class EscalationAction(str, Enum):
+    """Decision taken by the Router after a failed test run."""
+    ESCALATE = "escalate"      # Next tier up (S -> M -> L)
+    JUMP_TO_L = "jump_to_l"    # Straight to the strongest developer
+    RETRY_SAME = "retry_same"  # Same tier again, with failure feedback
+    STOP = "stop"              # Give up on the task
+
+
+NEXT_TIER: dict[str, str] = {"S": "M", "M": "L"}
+
+# Story points assigned when the Router (or the learned router) moves a task to a tier
+TIER_STORY_POINTS: dict[str, int] = {"S": 2, "M": 3, "L": 8}
+
+_SYNTAX_MARKERS = ("SyntaxError", "IndentationError", "TabError")
+
+# Most severe first: the kind reported for an attempt is the first match
+_SEVERITY = [
+    FailureKind.NO_CODE,
+    FailureKind.SYNTAX_ERROR,
+    FailureKind.RUNTIME_ERROR,
+    FailureKind.TIMEOUT,
+    FailureKind.WRONG_ANSWER,
+]
+
+
+def classify_error(message: str) -> FailureKind:
+    """Classify a single Tester error message."""
+    if message.startswith("No code"):
+        return FailureKind.NO_CODE
+    if "Timeout after" in message:
+        return FailureKind.TIMEOUT
+    if "Execution error" in message:
+        if any(marker in message for marker in _SYNTAX_MARKERS):
+            return FailureKind.SYNTAX_ERROR
+        return FailureKind.RUNTIME_ERROR
+    return FailureKind.WRONG_ANSWER
+
+
+def classify_failure(errors: list[str]) -> FailureKind:
+    """Classify a whole test run from its error messages."""
+    kinds = {classify_error(message) for message in errors}
+    for kind in _SEVERITY:
+        if kind in kinds:
+            return kind
+    return FailureKind.WRONG_ANSWER
+
+
+def failure_signature(errors: list[str]) -> str:
+    """
+    Fingerprint of a test run's failures.
+
+    Temporary file paths in tracebacks are masked so that two runs failing
+    in the same way produce the same signature.
+    """
+    normalized = [re.sub(r'File "[^"]+"', 'File "<solution>"', message) for message in errors]
+    return hashlib.sha1("\n".join(normalized).encode("utf-8")).hexdigest()
+
+
+class EscalationPolicy:
+    """
+    Default policy: step one tier up on every failure.
+
+    Reproduces the original behaviour: at most two escalations
+    (S -> M -> L) and no retry once the L tier has failed.
+    """
+
+    name = "linear"
+
+    def __init__(self, max_escalations: int = 2):
+        self.max_escalations = max_escalations
+
+    def decide(self, state: GraphState) -> EscalationAction:
+        """Choose the next action for a state whose tests just failed."""
+        if state["escalations"] >= self.max_escalations:
+            return EscalationAction.STOP
+        if state["developer_tier"] == "L":
+            return EscalationAction.STOP
+        return EscalationAction.ESCALATE
+
+
+class FailureAwareEscalationPolicy(EscalationPolicy):
+    """
+    Policy that reacts to the kind of failure.
+
+    - identical failures on consecutive attempts: stop, retrying is hopeless
+    - syntax error / no code: retry the same tier once with the feedback
+    - timeout: jump straight to L, a smarter algorithm is needed
+    - wrong answer / runtime error: escalate one tier
+    The total number of retries is capped by max_retries.
+    """
+
+    name = "failure_aware"
+
+    def __init__(self, max_retries: int = 2, max_tier_retries: int = 1):
+        super().__init__()
+        self.max_retries = max_retries
+        self.max_tier_retries = max_tier_retries
+
+    def decide(self, state: GraphState) -> EscalationAction:
+        if state["retries"] >= self.max_retries:
+            return EscalationAction.STOP
+
+        signatures = state["failure_signatures"]
+        if len(signatures) >= 2 and signatures[-1] == signatures[-2]:
+            return EscalationAction.STOP
+
+        tier = state["developer_tier"]
+        kind = classify_failure(state["last_errors"])
+        can_retry_tier = state["tier_retries"] < self.max_tier_retries
+
+        if kind in (FailureKind.SYNTAX_ERROR, FailureKind.NO_CODE) and can_retry_tier:
+            return EscalationAction.RETRY_SAME
+        if tier == "L":
+            return EscalationAction.RETRY_SAME if can_retry_tier else EscalationAction.STOP
+        if kind == FailureKind.TIMEOUT:
+            return EscalationAction.JUMP_TO_L
+        return EscalationAction.ESCALATE
+
+
+ESCALATION_POLICIES: dict[str, type[EscalationPolicy]] = {
+    EscalationPolicy.name: EscalationPolicy,
+    FailureAwareEscalationPolicy.name: FailureAwareEscalationPolicy,
+}
+
+
+def get_escalation_policy(name: str = None) -> EscalationPolicy:
+    """Instantiate a policy by name (defaults to ESCALATION_POLICY env var)."""
+    name = name or os.getenv("ESCALATION_POLICY", EscalationPolicy.name)
+    if name not in ESCALATION_POLICIES:
+        raise ValueError(
+            f"Invalid escalation policy: {name}. "
+            f"Must be one of {set(ESCALATION_POLICIES)}"
+        )
+    return ESCALATION_POLICIES[name]()
@@ -0,0 +1,42 @@
+"""
+Program fingerprints.
+
+Two candidate programs get the same fingerprint when their ASTs are equal
+once comments, formatting and docstrings are ignored, i.e. when they are
+certain to behave identically. The Tester keys its verdicts by
+fingerprint, so a program that was already tested for this task (the
+Reviewer returned it unchanged, or a retry reproduced it) is not run
+again.
+"""
+
+import ast
+import hashlib
+
+
+def _strip_docstrings(tree: ast.AST) -> ast.AST:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = node.body
+            if (
+                body
+                and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)
+            ):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def code_fingerprint(code: str) -> str:
+    """
+    AST-normalized fingerprint of a program.
+
+    Code that does not parse is fingerprinted by its whitespace-normalized
+    text, so identical broken programs still match.
+    """
+    try:
+        tree = _strip_docstrings(ast.parse(code))
+        normalized = "ast:" + ast.dump(tree, annotate_fields=False, include_attributes=False)
+    except (SyntaxError, ValueError):
+        normalized = "text:" + " ".join(code.split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
@@ -1,60 +1,136 @@
-from langgraph.graph import StateGraph, START, END
+import os
+import threading
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Optional
 
 from src.graph.state import GraphState, create_initial_state
-from src.graph.config import NodeNames
+from src.graph.config import NodeNames, get_router_confidence, get_router_model_path
+from src.graph.escalation import EscalationAction, EscalationPolicy, get_escalation_policy
+from src.graph.budget import BUDGET_EXHAUSTED, TaskBudget, resume_clock
+from src.graph.checkpoint import thread_config, get_task_status
+from src.data.case_store import registered_cases
 from src.graph.nodes import (
+    learned_router_node,
     planner_node,
     router_node,
     developer_node,
     reviewer_node,
     tester_node,
     single_agent_node,
+    speculation_scope,
 )
 from src.agents.llm import Architecture, get_architecture
+from src.utils.env import load_env
+from src.utils.tracing import traced_node
 
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+    from src.graph.learned_router import LearnedRouter
 
-def should_continue_after_tester(state: GraphState) -> str:
+
+def should_run_planner(state: GraphState) -> str:
+    """
+    Decide whether the Planner is needed after the learned router.
+    
+    Returns:
+        "router" if the learned router already planned the task
+        "planner" otherwise
+    """
+    return "router" if state["routed_by"] == "learned_router" else "planner"
+
+
+# Learned routers by model path, with the file's mtime when loaded
+_routers: dict[str, tuple[float, "LearnedRouter"]] = {}
+_routers_lock = threading.Lock()
+
+
+def get_learned_router() -> Optional["LearnedRouter"]:
+    """
+    Learned router loaded from ROUTER_MODEL, or None if it is not configured.
+    
+    build_graph runs for every task, so the model is loaded once per path
+    and only read again when the file changes (e.g. after retraining).
+    """
+    path = get_router_model_path()
+    if path is None:
+        return None
+    modified = os.path.getmtime(path)
+    with _routers_lock:
+        cached = _routers.get(path)
+        if cached is None or cached[0] != modified:
+            from src.graph.learned_router import LearnedRouter
+            cached = _routers[path] = (modified, LearnedRouter.load(path))
+        return cached[1]
+
+
+def should_continue_after_tester(state: GraphState, policy: EscalationPolicy = None) -> str:
     """
     Decide whether to end or retry after testing.
     
+    The escalation policy decides whether a failed task is worth another
+    round (see src/graph/escalation.py). The default policy stops after
+    two escalations or once the L tier has failed.
+    
     Returns:
-        "end" if tests passed or max escalations reached
-        "retry" if should try with escalated developer tier
+        "end" if tests passed, the budget is exhausted or the policy decided to stop
+        "retry" if the Router should send the task to a developer again
     """
     if state["test_passed"]:
         return "end"
     
-    # Already escalated S -> M -> L (2 escalations)
-    if state["escalations"] >= 2:
+    # Budget used up: the Tester already marked the task as budget_exhausted
+    if state["status"] == BUDGET_EXHAUSTED:
         return "end"
     
-    # Already at max tier
-    if state["developer_tier"] == "L":
+    policy = policy or get_escalation_policy()
+    if policy.decide(state) == EscalationAction.STOP:
         return "end"
     
     return "retry"
 
 
-def build_graph(architecture: Architecture = None) -> StateGraph:
+def build_graph(
+    architecture: Architecture = None,
+    checkpointer=None,
+    escalation_policy: EscalationPolicy = None,
+    learned_router: "LearnedRouter" = None
+) -> "CompiledStateGraph":
     """
     Build the LangGraph workflow based on the selected architecture.
     
+    Every node is wrapped with traced_node, which records a span per
+    execution when tracing is enabled (TRACE_FILE) and is a no-op otherwise.
+    
     Args:
         architecture: Architecture enum (A, B, or C). If None, reads from env.
+        checkpointer: Optional LangGraph checkpointer (see get_checkpointer).
+                      When set, state is persisted after every node.
+        escalation_policy: Policy used by the Router and the retry edge.
+                           If None, selected by the ESCALATION_POLICY env var.
+        learned_router: Tier classifier that can skip the Planner (B/C).
+                        If None, loaded from the ROUTER_MODEL env var if set.
         
     Returns:
         Compiled StateGraph for the specified architecture.
     """
+    from langgraph.graph import StateGraph, START, END
+    
+    load_env()
     if architecture is None:
         architecture = get_architecture()
+    policy = escalation_policy or get_escalation_policy()
     
     graph = StateGraph(GraphState)
     
+    def add_node(name: str, node) -> None:
+        graph.add_node(name, traced_node(name, node, architecture))
+    
     if architecture == Architecture.A:
         # Architecture A: Single-agent baseline
         # Task -> Single Agent -> Tester -> END
-        graph.add_node(NodeNames.SINGLE_AGENT, single_agent_node)
-        graph.add_node(NodeNames.TESTER, tester_node)
+        add_node(NodeNames.SINGLE_AGENT, single_agent_node)
+        add_node(NodeNames.TESTER, tester_node)
         
         graph.add_edge(START, NodeNames.SINGLE_AGENT)
         graph.add_edge(NodeNames.SINGLE_AGENT, NodeNames.TESTER)
@@ -64,14 +140,32 @@ def build_graph(architecture: Architecture = None) -> StateGraph:
         # Task -> Planner -> Router -> Developer -> Reviewer -> Tester -> [conditional]
         #                      ^                                             |
         #                      └──────────── (on FAIL) ──────────────────────┘
-        graph.add_node(NodeNames.PLANNER, planner_node)
-        graph.add_node(NodeNames.ROUTER, router_node)
-        graph.add_node(NodeNames.DEVELOPER, developer_node)
-        graph.add_node(NodeNames.REVIEWER, reviewer_node)
-        graph.add_node(NodeNames.TESTER, tester_node)
+        add_node(NodeNames.PLANNER, planner_node)
+        add_node(NodeNames.ROUTER, partial(router_node, policy=policy))
+        add_node(NodeNames.DEVELOPER, developer_node)
+        add_node(NodeNames.REVIEWER, reviewer_node)
+        add_node(NodeNames.TESTER, tester_node)
+        
+        # With a learned router, confidently routed tasks skip the Planner:
+        # Task -> Learned Router -> [Planner] -> Router -> ...
+        learned_router = learned_router or get_learned_router()
+        if learned_router is not None:
+            add_node(NodeNames.LEARNED_ROUTER, partial(
+                learned_router_node, router=learned_router, confidence=get_router_confidence()
+            ))
+            graph.add_edge(START, NodeNames.LEARNED_ROUTER)
+            graph.add_conditional_edges(
+                NodeNames.LEARNED_ROUTER,
+                should_run_planner,
+                {
+                    "planner": NodeNames.PLANNER,
+                    "router": NodeNames.ROUTER
+                }
+            )
+        else:
+            graph.add_edge(START, NodeNames.PLANNER)
         
         # Linear flow until tester
-        graph.add_edge(START, NodeNames.PLANNER)
         graph.add_edge(NodeNames.PLANNER, NodeNames.ROUTER)
         graph.add_edge(NodeNames.ROUTER, NodeNames.DEVELOPER)
         graph.add_edge(NodeNames.DEVELOPER, NodeNames.REVIEWER)
@@ -80,14 +174,14 @@ def build_graph(architecture: Architecture = None) -> StateGraph:
         # Conditional edge from tester
         graph.add_conditional_edges(
             NodeNames.TESTER,
-            should_continue_after_tester,
+            partial(should_continue_after_tester, policy=policy),
             {
                 "end": END,
                 "retry": NodeNames.ROUTER
             }
         )
     
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
 
 
 def run_graph(
@@ -95,26 +189,67 @@ def run_graph(
     task_description: str,
     test_inputs: list[str] = None,
     test_outputs: list[str] = None,
-    architecture: Architecture = None
+    architecture: Architecture = None,
+    checkpointer=None,
+    resume: bool = False,
+    budget: TaskBudget = None,
+    difficulty: str = None
 ):
     """
     Run the graph workflow for a given task.
     
+    With a checkpointer, the run is recorded under a thread keyed by
+    architecture and task id. In resume mode a completed task returns its
+    stored final state without any LLM call, and an interrupted task
+    continues from its last completed node.
+    
     Args:
         task_id: Unique identifier for the task
         task_description: Description of the coding task
         test_inputs: List of stdin inputs for test cases
         test_outputs: List of expected stdout outputs for test cases
         architecture: Architecture enum (A, B, or C). If None, reads from env.
+        checkpointer: Optional checkpointer used to persist the run.
+        resume: Reuse existing checkpoints of this task instead of restarting.
+        budget: Per-task resource limits. Defaults to get_default_budget().
+        difficulty: APPS difficulty of the task (used by the learned router).
         
     Returns:
         Final graph state after execution.
     """
-    graph = build_graph(architecture)
-    initial_state = create_initial_state(
-        task_id=task_id,
-        task_description=task_description,
-        test_inputs=test_inputs,
-        test_outputs=test_outputs
-    )
-    return graph.invoke(initial_state)
+    load_env()
+    if architecture is None:
+        architecture = get_architecture()
+    
+    graph = build_graph(architecture, checkpointer=checkpointer)
+    # The test cases are registered for this run only, keyed by task and
+    # architecture so concurrent architectures do not share an entry. A
+    # speculative Developer call the run leaves behind is dropped with them.
+    with registered_cases(task_id, test_inputs, test_outputs, architecture.value) as test_ref, \
+            speculation_scope(task_id, architecture.value):
+        initial_state = create_initial_state(
+            task_id=task_id,
+            task_description=task_description,
+            test_ref=test_ref,
+            budget=budget,
+            architecture=architecture,
+            difficulty=difficulty
+        )
+        if checkpointer is None:
+            return graph.invoke(initial_state)
+        
+        config = thread_config(task_id, architecture)
+        if resume:
+            status = get_task_status(graph, config)
+            if status == "completed":
+                return graph.get_state(config).values
+            if status == "in_progress":
+                # Passing no input continues from the last saved checkpoint;
+                # the test cases were registered again under the same handle.
+                # The wall clock restarts so the downtime is not charged.
+                snapshot = graph.get_state(config)
+                checkpointed_at = datetime.fromisoformat(snapshot.created_at).timestamp()
+                graph.update_state(config, resume_clock(snapshot.values, checkpointed_at))
+                return graph.invoke(None, config)
+        
+        return graph.invoke(initial_state, config)
@@ -0,0 +1,282 @@
+"""
+Learned router: predicts the developer tier without calling the Planner.
+
+The Planner's story points only serve to pick a tier (S/M/L). The results
+we already log bound the tier a task needed: the final tier of a solved
+task, and L for a task that was never solved. This label is an upper bound,
+not the cheapest tier that passes: a task solved at M after escalating
+from S needed at most M, and a task the Planner sent straight to L may have
+been solvable at S. Only Planner-routed runs are used for training, so the
+router never learns from the outcomes of its own routing, and runs cut
+short by their budget are left out, as they say nothing about the tier the
+task needed. A multinomial
+logistic regression over a few cheap features of the task statement
+(length, number of examples, largest constraint, algorithmic keywords) and
+the APPS difficulty predicts that tier. When its probability reaches the
+confidence threshold the graph routes the task directly and skips the
+Planner call; otherwise the Planner runs as usual.
+
+Training and prediction are plain NumPy and take milliseconds:
+    python main.py train-router results/ --model results/router.json
+
+evaluate() reports cross-validated accuracy of the router next to the
+accuracy of the Planner's initial tier on the same tasks. Enable the
+router in runs with ROUTER_MODEL=results/router.json (threshold:
+ROUTER_CONFIDENCE, default 0.8).
+"""
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.graph.budget import BUDGET_EXHAUSTED
+
+
+TIERS = ["S", "M", "L"]
+
+DIFFICULTIES = ["introductory", "interview", "competition"]
+
+_KEYWORDS = {
+    "kw_graph": re.compile(r"\b(?:graph|tree|vertex|vertices|edges?|nodes?|path)\b", re.IGNORECASE),
+    "kw_optimize": re.compile(r"\b(?:maximum|minimum|maximize|minimize|optimal|number of ways)\b", re.IGNORECASE),
+    "kw_modulo": re.compile(r"\bmodulo\b|10\^9\s*\+\s*7|1000000007", re.IGNORECASE),
+    "kw_query": re.compile(r"\bquer(?:y|ies)\b", re.IGNORECASE),
+    "kw_string": re.compile(r"\b(?:string|substring|palindrome|characters?)\b", re.IGNORECASE),
+    "kw_geometry": re.compile(r"\b(?:points?|coordinates?|polygon|circle|segment)\b", re.IGNORECASE),
+}
+
+_EXAMPLE = re.compile(r"-{2,}\s*Examples?\s*-{2,}|^\s*Example\s*\d*\s*:?\s*$|^\s*Sample Input", re.IGNORECASE | re.MULTILINE)
+_CONSTRAINT = re.compile(r"≤|<=|\\le\b|\\leq\b")
+_POWER = re.compile(r"10\s*(?:\^|\*\*)\s*\{?(\d+)")
+_NUMBER = re.compile(r"\b\d[\d,]*\b")
+
+FEATURE_NAMES = [
+    "log_chars",
+    "log_lines",
+    "examples",
+    "constraints",
+    "max_bound_log10",
+    *_KEYWORDS,
+    *(f"difficulty_{level}" for level in DIFFICULTIES),
+]
+
+
+def task_features(description: str, difficulty: Optional[str] = None) -> dict[str, float]:
+    """
+    Features of a task statement (and its APPS difficulty, if known).
+
+    Args:
+        description: Task statement.
+        difficulty: "introductory", "interview", "competition" or None.
+
+    Returns:
+        Feature values keyed by FEATURE_NAMES.
+    """
+    bounds = [int(power) for power in _POWER.findall(description)]
+    for number in _NUMBER.findall(description):
+        digits = number.replace(",", "")
+        if len(digits) <= 19:
+            bounds.append(math.log10(int(digits)) if int(digits) > 0 else 0)
+
+    features = {
+        "log_chars": math.log1p(len(description)),
+        "log_lines": math.log1p(description.count("\n")),
+        "examples": float(len(_EXAMPLE.findall(description))),
+        "constraints": math.log1p(len(_CONSTRAINT.findall(description))),
+        "max_bound_log10": float(min(max(bounds, default=0), 19)),
+    }
+    for name, pattern in _KEYWORDS.items():
+        features[name] = math.log1p(len(pattern.findall(description)))
+    for level in DIFFICULTIES:
+        features[f"difficulty_{level}"] = 1.0 if difficulty == level else 0.0
+    return features
+
+
+def needed_tier(record: dict) -> str:
+    """
+    Upper bound of the tier a task needs: the final tier if it passed, else L.
+
+    A run never tries tiers below the one it started at, so a cheaper tier
+    might have passed as well.
+    """
+    if record.get("test_passed") and record.get("developer_tier_final") in TIERS:
+        return record["developer_tier_final"]
+    return "L"
+
+
+@dataclass
+class RoutePrediction:
+    """Tier predicted by the router and its probability."""
+    tier: str
+    confidence: float
+
+
+class LearnedRouter:
+    """
+    Softmax regression from task features to the tier a task needs.
+
+    Args:
+        weights: (features, tiers) weight matrix.
+        bias: (tiers,) intercepts.
+        mean: Feature means used for standardization.
+        scale: Feature standard deviations used for standardization.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def fit(
+        cls,
+        features: np.ndarray,
+        labels: Iterable[str],
+        l2: float = 1e-2,
+        learning_rate: float = 0.5,
+        iterations: int = 300
+    ) -> "LearnedRouter":
+        """
+        Train on a feature matrix (rows ordered like FEATURE_NAMES) and tier labels.
+        """
+        labels = np.array([TIERS.index(label) for label in labels])
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        x = (features - mean) / scale
+        targets = np.eye(len(TIERS))[labels]
+
+        weights = np.zeros((x.shape[1], len(TIERS)))
+        bias = np.log((targets.sum(axis=0) + 1) / (len(labels) + len(TIERS)))
+        for _ in range(iterations):
+            error = _softmax(x @ weights + bias) - targets
+            weights -= learning_rate * (x.T @ error / len(x) + l2 * weights)
+            bias -= learning_rate * error.mean(axis=0)
+        return cls(weights, bias, mean, scale)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Tier probabilities (columns ordered like TIERS) per feature row."""
+        return _softmax((np.atleast_2d(features) - self.mean) / self.scale @ self.weights + self.bias)
+
+    def predict(self, description: str, difficulty: Optional[str] = None) -> RoutePrediction:
+        """Predict the tier of one task."""
+        features = task_features(description, difficulty)
+        probabilities = self.predict_proba(np.array([features[name] for name in FEATURE_NAMES]))[0]
+        best = int(probabilities.argmax())
+        return RoutePrediction(tier=TIERS[best], confidence=float(probabilities[best]))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "features": FEATURE_NAMES,
+                "tiers": TIERS,
+                "weights": self.weights.tolist(),
+                "bias": self.bias.tolist(),
+                "mean": self.mean.tolist(),
+                "scale": self.scale.tolist(),
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "LearnedRouter":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["features"] != FEATURE_NAMES or data["tiers"] != TIERS:
+            raise ValueError(f"Router model {path} was trained on other features; retrain it")
+        return cls(*(np.array(data[key]) for key in ("weights", "bias", "mean", "scale")))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def training_examples(
+    records: Iterable[dict],
+    architecture: str = "C"
+) -> tuple[np.ndarray, list[str], list[Optional[str]]]:
+    """
+    Training data from result records of one architecture.
+
+    Records without task_features (crashed runs, older result files) are
+    skipped, and so are tasks routed by the learned router: their final tier
+    depends on the router's own choice, and training on it would reinforce
+    that choice whether or not a cheaper tier would have passed. Runs that
+    ran out of budget are skipped too: labelling them L, like unsolved
+    tasks, would bias the router towards the most expensive tier.
+
+    Returns:
+        (feature matrix, needed tier per row, Planner's initial tier per row)
+    """
+    rows, labels, planner_tiers = [], [], []
+    for record in records:
+        features = record.get("task_features")
+        if record.get("architecture") != architecture or not features:
+            continue
+        if record.get("status") in ("error", BUDGET_EXHAUSTED):
+            continue
+        if record.get("routed_by", "planner") != "planner":
+            continue
+        rows.append([features.get(name, 0.0) for name in FEATURE_NAMES])
+        labels.append(needed_tier(record))
+        planner_tiers.append(record.get("developer_tier_initial"))
+    return np.array(rows, dtype=float).reshape(len(rows), len(FEATURE_NAMES)), labels, planner_tiers
+
+
+def evaluate(
+    features: np.ndarray,
+    labels: list[str],
+    planner_tiers: list[Optional[str]],
+    confidence: float = 0.8,
+    folds: int = 5,
+    seed: int = 0
+) -> dict:
+    """
+    Cross-validated accuracy of the router, compared with the Planner's
+    initial tier on the same tasks.
+
+    Returns:
+        tasks, router_accuracy, planner_accuracy, coverage (share of tasks
+        above the confidence threshold, i.e. Planner calls saved) and the
+        router / Planner accuracy on those confident tasks.
+    """
+    labels = np.array(labels)
+    planner = np.array([tier or "" for tier in planner_tiers])
+    order = np.random.default_rng(seed).permutation(len(labels))
+    predicted = np.empty(len(labels), dtype=object)
+    confidences = np.zeros(len(labels))
+
+    for fold in range(min(folds, len(labels))):
+        test = order[fold::folds]
+        train = np.setdiff1d(order, test)
+        if len(set(labels[train])) < 2:
+            predicted[test] = labels[train][0] if len(train) else "L"
+            confidences[test] = 1.0
+            continue
+        router = LearnedRouter.fit(features[train], labels[train])
+        probabilities = router.predict_proba(features[test])
+        predicted[test] = [TIERS[index] for index in probabilities.argmax(axis=1)]
+        confidences[test] = probabilities.max(axis=1)
+
+    confident = confidences >= confidence
+    has_planner = planner != ""
+    return {
+        "tasks": int(len(labels)),
+        "router_accuracy": _accuracy(predicted == labels),
+        "planner_accuracy": _accuracy((planner == labels)[has_planner]),
+        "coverage": _accuracy(confident),
+        "router_accuracy_confident": _accuracy((predicted == labels)[confident]),
+        "planner_accuracy_confident": _accuracy((planner == labels)[confident & has_planner]),
+    }
+
+
+def _accuracy(hits: np.ndarray) -> Optional[float]:
+    return round(float(hits.mean()), 4) if len(hits) else None
@@ -1,5 +1,25 @@
+import time
 from typing import TypedDict, Optional, Literal
 
+from src.agents.llm import Architecture
+from src.graph.budget import TaskBudget, get_default_budget
+
+
+class StageResult(TypedDict):
+    """Outcome of one Tester stage (smoke or full)."""
+    total: int
+    passed: int
+
+
+class TestVerdict(TypedDict):
+    """Result of testing one program, reused when the same program comes back."""
+    passed: bool
+    errors: list[str]
+    tests_total: int
+    tests_passed: int
+    test_report: dict[str, Optional[StageResult]]
+    attempt: int  # 1-based test run that produced the verdict
+
 
 class PlanOutput(TypedDict):
     """Output from the Planner node."""
@@ -18,12 +38,18 @@ class GraphState(TypedDict):
     - Planning output (story points, rationale)
     - Developer routing (tier, escalations)
     - Generated code
-    - Test execution data (inputs, outputs, results)
+    - Test execution data (handle to the test cases, results)
+    
+    Test inputs/outputs are not stored in the state itself: they live in
+    the shared CaseStore and `test_ref` points to them, so checkpoints and
+    state copies stay small regardless of the size of the test data.
     """
     
     # Task metadata
     task_id: str
     task_description: str
+    architecture: Optional[str]  # "A", "B" or "C"; selects the models per role
+    difficulty: Optional[str]    # APPS difficulty, a feature of the learned router
     
     # Planner output
     plan: Optional[PlanOutput]
@@ -33,7 +59,12 @@ class GraphState(TypedDict):
     story_points_current: Optional[Literal[1, 2, 3, 5, 8]]
     
     # Developer routing
-    escalations: int
+    routed_by: Optional[Literal["planner", "learned_router"]]
+    speculation: Optional[Literal["hit", "miss"]]  # Speculative Developer outcome, if one ran
+    router_confidence: Optional[float]  # Learned router probability of its tier
+    escalations: int             # Tier changes (S -> M, M -> L, S -> L)
+    retries: int                 # Developer loops after a failed test run
+    tier_retries: int            # Retries without changing tier
     developer_tier: Optional[Literal["S", "M", "L"]]
     
     # Generated code
@@ -42,26 +73,49 @@ class GraphState(TypedDict):
     reviewer_feedback: Optional[str]  # Feedback from Reviewer
     
     # Test execution (for Tester node)
-    test_inputs: list[str]       # stdin inputs for each test case
-    test_outputs: list[str]      # expected stdout for each test case
+    test_ref: Optional[str]      # CaseStore handle for inputs/expected outputs
     test_passed: bool            # Whether all tests passed
+    tests_total: int             # Test cases run in the latest test run
+    tests_passed: int            # Test cases passed in the latest test run
+    test_report: dict[str, Optional[StageResult]]  # "smoke" / "full" stages
     failure_history: list[str]   # Error messages from failed tests
+    last_errors: list[str]       # Error messages of the latest test run only
+    failure_signatures: list[str]  # One fingerprint per failed test run
+    verdicts: dict[str, TestVerdict]  # Test verdicts by program fingerprint
+    test_runs: int               # Test runs so far (reused verdicts included)
+    
+    # Resource usage and limits
+    budget: Optional[TaskBudget]
+    llm_calls: int               # LLM calls made so far
+    total_tokens: int            # Prompt + completion tokens so far
+    started_at: float            # Unix time when the current session of the task started
+    elapsed_before_resume: float  # Wall seconds of earlier sessions (checkpoint resume)
+    status: Optional[str]        # "passed", "failed" or "budget_exhausted"
 
 
 def create_initial_state(
     task_id: str,
     task_description: str,
-    test_inputs: list[str] = None,
-    test_outputs: list[str] = None
+    test_ref: str = None,
+    budget: TaskBudget = None,
+    architecture: Architecture = None,
+    difficulty: str = None
 ) -> GraphState:
     """
     Create the initial state for a graph execution.
     
+    The state only keeps a handle to the test cases. Registering them in
+    the shared CaseStore, and releasing them after the run, is up to the
+    caller (run_graph does both; see registered_cases()).
+    
     Args:
         task_id: Unique identifier for the task
         task_description: Natural language description of the coding problem
-        test_inputs: List of stdin inputs for test cases
-        test_outputs: List of expected stdout outputs for test cases
+        test_ref: CaseStore handle of the test cases, if the task has any
+        budget: Resource limits for the task. Defaults to get_default_budget().
+        architecture: Architecture whose models the nodes use. If None, the
+                      nodes fall back to the ARCHITECTURE env var.
+        difficulty: APPS difficulty of the task, if known.
         
     Returns:
         Initialized GraphState ready for workflow execution.
@@ -69,16 +123,35 @@ def create_initial_state(
     return GraphState(
         task_id=task_id,
         task_description=task_description,
+        architecture=architecture.value if architecture is not None else None,
+        difficulty=difficulty,
         plan=None,
         story_points_initial=None,
         story_points_current=None,
+        routed_by=None,
+        speculation=None,
+        router_confidence=None,
         escalations=0,
+        retries=0,
+        tier_retries=0,
         developer_tier=None,
         generated_code=None,
         reviewed_code=None,
         reviewer_feedback=None,
-        test_inputs=test_inputs or [],
-        test_outputs=test_outputs or [],
+        test_ref=test_ref,
         test_passed=True,
+        tests_total=0,
+        tests_passed=0,
+        test_report={},
         failure_history=[],
+        last_errors=[],
+        failure_signatures=[],
+        verdicts={},
+        test_runs=0,
+        budget=budget if budget is not None else get_default_budget(),
+        llm_calls=0,
+        total_tokens=0,
+        started_at=time.time(),
+        elapsed_before_resume=0.0,
+        status=None,
     )
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Loading of the .env file.
+
+The .env file is loaded on first use rather than at import time, so
+importing modules stays cheap and side-effect free. Entry points
+(build_graph, run_graph, get_architecture, LLMClient, main.py) call
+load_env() before reading configuration.
+"""
+
+import threading
+
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load .env into os.environ once per process (existing variables win)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
@@ -0,0 +1,40 @@
+"""Logging setup shared by the CLI and sweep workers."""
+
+import logging
+import os
+import sys
+
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(threadName)s | %(message)s"
+
+
+def setup_logger(name: str, log_file: str = None, level: int = logging.INFO) -> logging.Logger:
+    """
+    Create a logger writing to stderr and, optionally, to a file.
+    
+    Args:
+        name: Logger name (usually __name__).
+        log_file: Optional path of a log file (appended to).
+        level: Logging level.
+        
+    Returns:
+        Configured logger. Calling again with the same name reconfigures it.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.propagate = False
+    
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    
+    return logger
@@ -0,0 +1,234 @@
+"""
+Staged scheduler for concurrent sweeps.
+
+A sweep runs many graphs at once, one thread per task. Their work is of two
+kinds: LLM calls, which only wait on the API, and test executions, which
+each keep a core busy in a `python` subprocess. Bounding the number of
+tasks alone cannot saturate both. Too few tasks leave API slots idle while
+tests run, and too many oversubscribe the cores with test processes.
+
+The staged scheduler gives each kind of work its own stage:
+- "llm": at most LLM_CONCURRENCY requests in flight (the API limit),
+  hedged duplicates included, since they only block on I/O
+- "cpu": at most TEST_WORKERS test subprocesses (default: all cores)
+
+Work waits in a stage's queue until a slot is free. Tasks are admitted to
+the sweep only while fewer than `max_in_flight` are running. That is
+enough tasks to fill both stages plus STAGE_QUEUE_SIZE waiting ones. The
+run command feeds tasks to its thread pool through submit(), which blocks
+the submitting loop at that limit. The executor's queue therefore stays
+bounded and the sweep is paced by the stages (backpressure), whatever the
+size of the pool.
+
+Each stage integrates its busy slots and queue length over time.
+stats() reports utilization (busy slot-seconds / capacity-seconds),
+average and peak queue length, and mean wait per item. The run
+command logs these numbers after a staged sweep.
+
+Enabled with `main.py run --staged` or STAGED_SCHEDULER=1; when disabled,
+stage slots are no-ops.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, Optional
+
+from src.utils.tracing import span
+
+
+DEFAULT_LLM_CONCURRENCY = 8
+
+
+class Stage:
+    """
+    A pool of `capacity` slots with a FIFO wait queue and usage metrics.
+
+    Args:
+        name: Stage name used in metrics and trace spans.
+        capacity: Number of items processed at the same time.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Stage {name} needs a capacity of at least 1, got {capacity}")
+        self.name = name
+        self.capacity = capacity
+        self._condition = threading.Condition()
+        self._busy = 0
+        self._waiting = 0
+        self._next_ticket = 0
+        self._serving = 0  # lowest ticket allowed to take a slot (FIFO order)
+        self._started = self._last_change = time.monotonic()
+        self._busy_seconds = 0.0
+        self._queue_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_waiting = 0
+        self._completed = 0
+
+    def _advance_clock(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_change
+        self._busy_seconds += self._busy * elapsed
+        self._queue_seconds += self._waiting * elapsed
+        self._last_change = now
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one slot of the stage for the duration of the block."""
+        queued_at = time.monotonic()
+        with span(f"scheduler.wait.{self.name}", category="scheduler"):
+            with self._condition:
+                ticket = self._next_ticket
+                self._next_ticket += 1
+                self._advance_clock()
+                self._waiting += 1
+                self._max_waiting = max(self._max_waiting, self._waiting)
+                while ticket != self._serving or self._busy >= self.capacity:
+                    self._condition.wait()
+                self._advance_clock()
+                self._waiting -= 1
+                self._busy += 1
+                self._serving += 1
+                self._wait_seconds += time.monotonic() - queued_at
+                self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._advance_clock()
+                self._busy -= 1
+                self._completed += 1
+                self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Capacity, completed items, utilization and queue metrics since creation."""
+        with self._condition:
+            self._advance_clock()
+            elapsed = max(self._last_change - self._started, 1e-9)
+            return {
+                "capacity": self.capacity,
+                "completed": self._completed,
+                "utilization": round(self._busy_seconds / (self.capacity * elapsed), 4),
+                "avg_queue_length": round(self._queue_seconds / elapsed, 3),
+                "max_queue_length": self._max_waiting,
+                "avg_wait_seconds": round(self._wait_seconds / max(self._completed + self._busy, 1), 4),
+            }
+
+
+class StagedScheduler:
+    """
+    The "llm" and "cpu" stages plus admission control of whole tasks.
+
+    Args:
+        llm_concurrency: Slots of the LLM stage (API concurrency limit).
+        test_workers: Slots of the CPU stage (default: CPU count).
+        queue_size: Tasks admitted beyond what fills both stages
+                    (default: llm_concurrency + test_workers).
+    """
+
+    def __init__(
+        self,
+        llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+        test_workers: int = None,
+        queue_size: int = None
+    ):
+        test_workers = test_workers or os.cpu_count() or 1
+        self.stages = {
+            "llm": Stage("llm", llm_concurrency),
+            "cpu": Stage("cpu", test_workers),
+        }
+        if queue_size is None:
+            queue_size = llm_concurrency + test_workers
+        self.max_in_flight = llm_concurrency + test_workers + queue_size
+        self._admission = threading.BoundedSemaphore(self.max_in_flight)
+
+    def slot(self, stage: str):
+        """Hold a slot of the "llm" or "cpu" stage."""
+        return self.stages[stage].slot()
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Run a whole task; blocks while max_in_flight tasks are running."""
+        with self._admission:
+            yield
+
+    def submit(self, executor: Executor, fn: Callable, *args) -> Future:
+        """
+        Submit fn(*args) to an executor as an admitted task.
+
+        Blocks the caller while max_in_flight tasks are submitted and not
+        finished, so jobs never pile up in the executor's queue.
+        """
+        self._admission.acquire()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._admission.release()
+            raise
+        future.add_done_callback(lambda _: self._admission.release())
+        return future
+
+    def stats(self) -> dict[str, dict]:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+
+_scheduler: Optional[StagedScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def enable_scheduler(
+    llm_concurrency: int = None,
+    test_workers: int = None,
+    queue_size: int = None
+) -> StagedScheduler:
+    """
+    Route LLM calls and test executions of every following run through a
+    new staged scheduler. Unset arguments come from LLM_CONCURRENCY,
+    TEST_WORKERS and STAGE_QUEUE_SIZE.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = _build_scheduler(llm_concurrency, test_workers, queue_size)
+        return _scheduler
+
+
+def _build_scheduler(
+    llm_concurrency: int = None,
+    test_workers: int = None,
+    queue_size: int = None
+) -> StagedScheduler:
+    def from_env(value: Optional[int], name: str) -> Optional[int]:
+        if value is not None:
+            return value
+        return int(os.environ[name]) if os.getenv(name) else None
+
+    return StagedScheduler(
+        llm_concurrency=from_env(llm_concurrency, "LLM_CONCURRENCY") or DEFAULT_LLM_CONCURRENCY,
+        test_workers=from_env(test_workers, "TEST_WORKERS"),
+        queue_size=from_env(queue_size, "STAGE_QUEUE_SIZE"),
+    )
+
+
+def disable_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
+
+
+def get_scheduler() -> Optional[StagedScheduler]:
+    """Return the active scheduler, enabling it from STAGED_SCHEDULER on first use."""
+    global _scheduler
+    if _scheduler is None and os.getenv("STAGED_SCHEDULER", "0").lower() in ("1", "true", "yes"):
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = _build_scheduler()
+    return _scheduler
+
+
+def stage_slot(stage: str):
+    """Slot of a stage of the active scheduler, or a no-op without one."""
+    scheduler = get_scheduler()
+    return scheduler.slot(stage) if scheduler is not None else nullcontext()
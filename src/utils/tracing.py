@@ -0,0 +1,166 @@
+"""
+Opt-in span tracing with Chrome trace / Perfetto export.
+
+When enabled (TRACE_FILE env var or enable_tracing()), graph nodes, LLM
+calls and test executions emit complete ("X") events tagged with the task
+id, architecture, developer tier and retry index. Events are streamed to
+the file in Chrome's JSON array format, which tolerates a missing closing
+bracket, and flushed after each span, so a crashed run still produces a
+loadable trace up to its last completed span.
+
+Load the file in https://ui.perfetto.dev or chrome://tracing. With several
+processes, put "{pid}" in the path to get one file per process; Perfetto
+can open them together.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+# Per-task attributes attached to every span emitted while a node runs
+_span_context: contextvars.ContextVar[dict] = contextvars.ContextVar("span_context", default={})
+
+
+class ChromeTracer:
+    """Appends trace events to a Chrome trace JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path.format(pid=os.getpid())
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._named_threads: set[int] = set()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._emit({
+            "name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+            "args": {"name": f"sweep worker {os.getpid()}"},
+        })
+
+    def _emit(self, event: dict) -> None:
+        self._file.write(json.dumps(event) + ",\n")
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: dict) -> None:
+        """Record a completed span. Times are time.perf_counter() seconds."""
+        tid = threading.get_ident()
+        with self._lock:
+            if self._file.closed:
+                return
+            if tid not in self._named_threads:
+                self._named_threads.add(tid)
+                self._emit({
+                    "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                })
+            self._emit({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": args,
+            })
+            self._file.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_tracer: Optional[ChromeTracer] = None
+
+
+def enable_tracing(path: str) -> ChromeTracer:
+    """Start writing spans to `path` (may contain "{pid}")."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = ChromeTracer(path)
+    return _tracer
+
+
+def disable_tracing() -> None:
+    """Stop tracing and close the trace file."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = None
+
+
+@atexit.register
+def _close_at_exit() -> None:
+    if _tracer is not None:
+        _tracer.close()
+
+
+def get_tracer() -> Optional[ChromeTracer]:
+    """Return the active tracer, enabling it from TRACE_FILE on first use."""
+    if _tracer is None and os.getenv("TRACE_FILE"):
+        enable_tracing(os.environ["TRACE_FILE"])
+    return _tracer
+
+
+@contextmanager
+def span(name: str, category: str = "pipeline", **args):
+    """
+    Time a block of code as a trace span.
+
+    The span inherits the task attributes of the enclosing traced node.
+    This is a no-op when tracing is disabled.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.add_span(name, category, start, time.perf_counter(), {**_span_context.get(), **args})
+
+
+def traced_node(name: str, node: Callable, architecture=None) -> Callable:
+    """
+    Wrap a graph node so each execution is recorded as a span.
+
+    The task id, architecture, developer tier and retry index (Developer
+    loops after a failed test run so far) are read from the incoming state and attached to
+    the node span and to any nested span (LLM calls, test executions).
+    """
+    @functools.wraps(node)
+    def wrapper(state):
+        if get_tracer() is None:
+            return node(state)
+
+        attributes = {
+            "task_id": state.get("task_id"),
+            "architecture": architecture.value if architecture is not None else None,
+            "tier": state.get("developer_tier"),
+            "retry": state.get("retries", 0),
+        }
+        token = _span_context.set(attributes)
+        try:
+            with span(name, category="node"):
+                return node(state)
+        finally:
+            _span_context.reset(token)
+
+    return wrapper
@@ -0,0 +1,57 @@
+"""Offline stand-ins for the LLM client used by graph tests."""
+
+from src.agents.usage import record_llm_call
+from src.models.llm_responses import PlannerResponse, DeveloperResponse, ReviewerResponse
+
+
+ECHO_SOLUTION = "print(input())"
+
+
+class FakeLLMClient:
+    """
+    Deterministic replacement for LLMClient.
+
+    Records every role invocation in `calls` so tests can assert which
+    LLM round trips were (or were not) paid for.
+    """
+
+    def __init__(
+        self,
+        story_points: int = 3,
+        code: str = ECHO_SOLUTION,
+        fail_on: str = None,
+        tokens_per_call: int = 100,
+    ):
+        self.story_points = story_points
+        self.code = code
+        self.fail_on = fail_on
+        self.tokens_per_call = tokens_per_call
+        self.calls: list[str] = []
+
+    def _record(self, role: str) -> None:
+        self.calls.append(role)
+        if role == self.fail_on:
+            raise RuntimeError(f"Injected failure in {role}")
+        record_llm_call(prompt_tokens=self.tokens_per_call, completion_tokens=0)
+
+    def planner(self, task_description: str, task_id: str) -> PlannerResponse:
+        self._record("planner")
+        return PlannerResponse(id=task_id, story_points=self.story_points, rationale="fake plan")
+
+    def developer(self, **kwargs) -> DeveloperResponse:
+        self._record("developer")
+        return DeveloperResponse(generated_code=self.code)
+
+    def single_agent(self, task_description: str) -> DeveloperResponse:
+        self._record("single_agent")
+        return DeveloperResponse(generated_code=self.code)
+
+    def reviewer(self, code: str, task_description: str) -> ReviewerResponse:
+        self._record("reviewer")
+        return ReviewerResponse(feedback="fake review", reviewed_code=code)
+
+
+def install_fake_client(monkeypatch, client: FakeLLMClient) -> FakeLLMClient:
+    """Route every node's get_llm_client() call to `client`."""
+    monkeypatch.setattr("src.graph.nodes.get_llm_client", lambda *args, **kwargs: client)
+    return client
@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from src.agents.llm import Architecture
+from src.evaluation.artifacts import ArtifactStore, disable_artifact_store, enable_artifact_store
+from src.graph.graph import run_graph
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = enable_artifact_store(str(tmp_path / "artifacts.sqlite"))
+    yield store
+    disable_artifact_store()
+
+
+def test_every_attempt_is_recorded_with_deduplicated_code(monkeypatch, store):
+    install_fake_client(monkeypatch, FakeLLMClient(story_points=1, code="print('wrong')"))
+
+    run_graph("apps_1", "Echo the input.", ["1\n"], ["1\n"], architecture=Architecture.C)
+
+    attempts = list(store.iter_attempts(task_id="apps_1"))
+    assert [a["attempt"] for a in attempts] == [1, 2, 3]
+    assert [a["tier"] for a in attempts] == ["S", "M", "L"]
+    assert attempts[0]["model"] == "Qwen/Qwen2.5-Coder-1.5B-Instruct"
+    assert not any(a["passed"] for a in attempts)
+    assert [a["verdict_reused"] for a in attempts] == [False, True, True]
+    assert {a["failure_kind"] for a in attempts} == {"wrong_answer"}
+
+    # One code blob, shared by every generated/reviewed program
+    assert len({a["generated_hash"] for a in attempts} | {a["reviewed_hash"] for a in attempts}) == 1
+    assert store.get_text(attempts[0]["reviewed_hash"]) == "print('wrong')"
+    assert store.get_errors(attempts[2]) == ["Test 1: Expected '1', got 'wrong'"]
+    assert store.stats()["attempts"] == 3
+
+
+def test_queries_by_outcome_and_model_use_indexes(store):
+    for i in range(200):
+        store.record_attempt(
+            task_id=f"apps_{i}", architecture="C", attempt=1, passed=i % 4 == 0,
+            tier="S", model="small", generated_code="x = 1\n" * 500,
+        )
+
+    assert sum(1 for _ in store.iter_attempts(passed=True, model="small")) == 50
+    stats = store.stats()
+    assert stats["blobs"] == 1
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 20
+
+    plan = sqlite3.connect(store.path).execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM attempts WHERE model = ? AND passed = ?", ("small", 1)
+    ).fetchall()
+    assert "idx_attempts_model" in str(plan)
+
+
+def test_rerecording_an_attempt_replaces_it_within_a_run(tmp_path):
+    path = str(tmp_path / "a.sqlite")
+    store = ArtifactStore(path, run_id="sweep-1")
+    store.record_attempt(task_id="apps_1", architecture="B", attempt=1, passed=False)
+    store.record_attempt(task_id="apps_1", architecture="B", attempt=1, passed=True)
+    store.close()
+
+    # Another sweep of the same task keeps its own attempts
+    other = ArtifactStore(path, run_id="sweep-2")
+    other.record_attempt(task_id="apps_1", architecture="B", attempt=1, passed=False, model="other")
+
+    assert [(a["run_id"], a["passed"]) for a in other.iter_attempts()] == [("sweep-1", True), ("sweep-2", False)]
+    assert [a["model"] for a in other.iter_attempts(run_id="sweep-2")] == ["other"]
+    other.close()
+
+
+def test_store_failures_do_not_fail_the_task(monkeypatch, store):
+    install_fake_client(monkeypatch, FakeLLMClient())
+
+    def locked(**kwargs):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(store, "record_attempt", locked)
+
+    result = run_graph("apps_1", "Echo the input.", ["1\n"], ["1\n"], architecture=Architecture.C)
+
+    assert result["status"] == "passed"
@@ -0,0 +1,19 @@
+from benchmarks.compare import compare
+from benchmarks.run import run_suites
+
+
+def test_json_suite_produces_timings():
+    report = run_suites(["json"], quick=True)
+
+    results = report["results"]["json"]
+    assert set(results) >= {"planner_bare", "developer_code", "reviewer_with_prose"}
+    assert all(stats["median_ms"] > 0 for stats in results.values())
+
+
+def test_compare_flags_relative_changes():
+    old = {"results": {"graph": {"run": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}}}
+    new = {"results": {"graph": {"run": {"median_ms": 12.5}}}}
+
+    assert compare(old, new) == [("graph.run", 10.0, 12.5, 0.25, "slower")]
+    assert compare(old, new, threshold=0.5) == [("graph.run", 10.0, 12.5, 0.25, "")]
+    assert compare(new, old)[0][4] == "faster"
@@ -0,0 +1,69 @@
+from src.agents.llm import Architecture
+from src.graph.budget import BUDGET_EXHAUSTED, TaskBudget
+from src.graph.graph import run_graph
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+FAILING_TASK = dict(
+    task_id="apps_budget",
+    task_description="Echo the input line.",
+    test_inputs=["1\n"],
+    test_outputs=["1\n"],
+    architecture=Architecture.B,
+)
+
+
+def _budget(**limits) -> TaskBudget:
+    return TaskBudget(**{"max_tokens": None, "max_llm_calls": None, "max_wall_seconds": None, **limits})
+
+
+def test_usage_is_accounted_in_state(monkeypatch):
+    install_fake_client(monkeypatch, FakeLLMClient(tokens_per_call=50))
+    result = run_graph(**FAILING_TASK, budget=_budget())
+
+    assert result["status"] == "passed"
+    assert result["llm_calls"] == 3
+    assert result["total_tokens"] == 150
+
+
+def test_token_budget_ends_task_after_tester(monkeypatch):
+    client = install_fake_client(monkeypatch, FakeLLMClient(story_points=1, code="print(0)"))
+    result = run_graph(**FAILING_TASK, budget=_budget(max_tokens=300))
+
+    # planner + developer + reviewer use the whole budget: no escalation
+    assert client.calls == ["planner", "developer", "reviewer"]
+    assert result["status"] == BUDGET_EXHAUSTED
+    assert not result["test_passed"]
+    assert result["escalations"] == 0
+    assert result["failure_history"][-1].startswith("Budget exhausted: tokens")
+
+
+def test_call_budget_is_checked_before_llm_calls(monkeypatch):
+    client = install_fake_client(monkeypatch, FakeLLMClient())
+    result = run_graph(**FAILING_TASK, budget=_budget(max_llm_calls=2))
+
+    # No Reviewer call, but the generated code is still tested
+    assert client.calls == ["planner", "developer"]
+    assert result["status"] == "passed"
+    assert result["test_passed"]
+    assert result["tests_passed"] == 1
+
+
+def test_code_generated_before_the_budget_ran_out_is_tested(monkeypatch):
+    client = install_fake_client(monkeypatch, FakeLLMClient(code="print(0)"))
+    result = run_graph(**FAILING_TASK, budget=_budget(max_llm_calls=2))
+
+    assert client.calls == ["planner", "developer"]
+    assert result["status"] == BUDGET_EXHAUSTED
+    assert result["tests_total"] == 1
+    assert result["escalations"] == 0
+    assert sum(line.startswith("Budget exhausted") for line in result["failure_history"]) == 1
+
+
+def test_wall_budget_skips_remaining_test_cases(monkeypatch):
+    install_fake_client(monkeypatch, FakeLLMClient(code="import time; time.sleep(0.5); print(input())"))
+    task = dict(FAILING_TASK, test_inputs=["1\n"] * 5, test_outputs=["1\n"] * 5)
+    result = run_graph(**task, budget=_budget(max_wall_seconds=0.3))
+
+    assert result["status"] == BUDGET_EXHAUSTED
+    assert "Not run" in "\n".join(result["failure_history"])
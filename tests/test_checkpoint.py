@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from src.agents.llm import Architecture
+from src.graph.checkpoint import get_checkpointer, get_task_status, thread_config
+from src.data.case_store import get_case_store
+from src.graph.budget import BUDGET_EXHAUSTED, TaskBudget
+from src.graph.graph import build_graph, run_graph
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+TASK = dict(
+    task_id="apps_test_1",
+    task_description="Echo the input line.",
+    test_inputs=["hello\n"],
+    test_outputs=["hello\n"],
+    architecture=Architecture.B,
+)
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    return get_checkpointer(str(tmp_path / "checkpoints.sqlite"))
+
+
+def test_completed_task_is_skipped_on_resume(monkeypatch, checkpointer):
+    client = install_fake_client(monkeypatch, FakeLLMClient())
+
+    first = run_graph(**TASK, checkpointer=checkpointer)
+    assert first["test_passed"]
+    assert client.calls == ["planner", "developer", "reviewer"]
+
+    resumed = run_graph(**TASK, checkpointer=checkpointer, resume=True)
+    assert resumed["test_passed"]
+    assert resumed["generated_code"] == first["generated_code"]
+    assert client.calls == ["planner", "developer", "reviewer"]
+
+
+def test_interrupted_task_resumes_from_last_node(monkeypatch, checkpointer):
+    install_fake_client(monkeypatch, FakeLLMClient(fail_on="reviewer"))
+    with pytest.raises(RuntimeError):
+        run_graph(**TASK, checkpointer=checkpointer)
+
+    graph = build_graph(Architecture.B, checkpointer=checkpointer)
+    config = thread_config(TASK["task_id"], Architecture.B)
+    assert get_task_status(graph, config) == "in_progress"
+
+    client = install_fake_client(monkeypatch, FakeLLMClient())
+    result = run_graph(**TASK, checkpointer=checkpointer, resume=True)
+
+    assert result["test_passed"]
+    assert client.calls == ["reviewer"]
+    assert get_task_status(graph, config) == "completed"
+
+
+def test_threads_are_keyed_by_architecture():
+    assert thread_config("apps_1", Architecture.B) != thread_config("apps_1", Architecture.C)
+
+
+def test_checkpoints_reference_test_data_instead_of_copying(monkeypatch, checkpointer):
+    install_fake_client(monkeypatch, FakeLLMClient())
+    big_input = "x" * 100_000 + "\n"
+    task = dict(TASK, task_id="apps_test_big", test_inputs=[big_input], test_outputs=[big_input])
+
+    result = run_graph(**task, checkpointer=checkpointer)
+
+    assert result["test_passed"]
+    assert result["test_ref"] == "B/apps_test_big"
+    assert "test_inputs" not in result
+    assert "B/apps_test_big" not in get_case_store()
+
+
+def test_runs_of_one_task_under_two_architectures_do_not_share_cases(monkeypatch):
+    install_fake_client(monkeypatch, FakeLLMClient())
+    store = get_case_store()
+    other = store.put(TASK["task_id"], ["other\n"], ["other\n"], architecture="C")
+
+    result = run_graph(**TASK)
+
+    assert result["test_passed"]
+    assert other in store and store.get(other) == (["other\n"], ["other\n"])
+    assert "B/apps_test_1" not in store
+    store.release(other)
+
+
+def test_resume_does_not_charge_downtime_to_the_wall_budget(monkeypatch, checkpointer):
+    install_fake_client(monkeypatch, FakeLLMClient(fail_on="reviewer"))
+    budget = TaskBudget(max_tokens=None, max_llm_calls=None, max_wall_seconds=60)
+    with pytest.raises(RuntimeError):
+        run_graph(**TASK, checkpointer=checkpointer, budget=budget)
+
+    # The process comes back an hour later
+    now = time.time() + 3600
+    monkeypatch.setattr("src.graph.budget.time.time", lambda: now)
+    client = install_fake_client(monkeypatch, FakeLLMClient())
+    result = run_graph(**TASK, checkpointer=checkpointer, resume=True, budget=budget)
+
+    assert client.calls == ["reviewer"]
+    assert result["status"] != BUDGET_EXHAUSTED and result["test_passed"]
+    assert result["started_at"] == now
+    assert 0 <= result["elapsed_before_resume"] < 60
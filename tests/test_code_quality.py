@@ -0,0 +1,42 @@
+from src.evaluation.code_quality import QualityCache, analyze_batch, analyze_solutions, quality_table
+
+
+CLEAN = "def solve(n):\n    if n > 1:\n        return n * 2\n    return n\n\n\nprint(solve(int(input())))\n"
+BROKEN = "def solve(:\n    pass\n"
+
+
+def test_metrics_and_cache(tmp_path, monkeypatch):
+    cache = QualityCache(str(tmp_path / "quality.sqlite"))
+    clean, broken, missing, duplicate = analyze_solutions([CLEAN, BROKEN, None, CLEAN], cache=cache)
+
+    assert clean == duplicate
+    assert clean["loc"] == 7
+    assert clean["max_cyclomatic_complexity"] == 2
+    assert 0 < clean["pylint_score"] <= 10
+    assert clean["flake8_violations"] == 0
+    assert broken["maintainability_index"] is None and broken["pylint_score"] is None
+    assert missing is None
+
+    # Cached solutions are never analyzed again
+    monkeypatch.setattr("src.evaluation.code_quality.analyze_batch", None)
+    assert analyze_solutions([CLEAN, BROKEN], cache=cache) == [clean, broken]
+
+
+def test_flake8_violations_are_counted_per_file_of_a_batch():
+    results = analyze_batch([CLEAN, "import os\nx=1\n", CLEAN])
+
+    assert [metrics["flake8_violations"] for metrics in results] == [0, 2, 0]
+
+
+def test_quality_table_reports_generated_and_reviewed_code():
+    records = [
+        {"task_id": "apps_1", "architecture": "A", "generated_code": CLEAN, "reviewed_code": None},
+        {"task_id": "apps_1", "architecture": "B", "generated_code": BROKEN, "reviewed_code": CLEAN},
+    ]
+    table = quality_table(records)
+
+    assert list(zip(table["architecture"], table["solution"])) == [
+        ("A", "generated_code"), ("B", "generated_code"), ("B", "reviewed_code")
+    ]
+    assert table["loc"].tolist() == [7, 2, 7]
+    assert table["pylint_score"].isna().tolist() == [False, True, False]
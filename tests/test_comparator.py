@@ -0,0 +1,56 @@
+import pytest
+
+from src.graph.comparator import describe_mismatch, outputs_match
+from src.graph.escalation import FailureKind, classify_error
+
+
+@pytest.mark.parametrize("actual, expected", [
+    ("1 2 3\n", "1 2 3"),
+    ("1  2 3   \r\n4\r\n", "1 2 3\n4\n"),
+    ("a\n\n\nb\n", "a\nb"),
+    ("0.50000\n", "0.5"),
+    ("3.1415926\n", "3.14159265"),
+    ("1\n2\n", ["1", "2"]),
+    ("1\n2\n", '["1", "2"]'),
+    ("7\n", 7),
+    ("+7\n", "7"),
+    ("3\n", "3.0000000"),
+    ("-0\n", "0"),
+    ("1" * 5000 + "\n", "+" + "1" * 5000),
+])
+def test_accepted_outputs(actual, expected):
+    assert outputs_match(actual, expected, tolerance=1e-6, mode="tokens")
+
+
+@pytest.mark.parametrize("actual, expected", [
+    ("1 2\n3", "1\n2 3"),
+    ("0.5001", "0.5"),
+    ("12", "1 2"),
+    ("YES", "yes"),
+    ("1\n2\n3", '["1", "2"]'),
+    ("123456789", "123456790"),
+    ("2000000", "2000001"),
+    ("9223372036854775807", "9223372036854775806"),
+    ("-1000000000000000000", "-1000000000000000001"),
+    ("-5", "5"),
+])
+def test_rejected_outputs(actual, expected):
+    assert not outputs_match(actual, expected, tolerance=1e-6, mode="tokens")
+
+
+def test_exact_mode_and_zero_tolerance():
+    assert not outputs_match("0.50000", "0.5", tolerance=1e-6, mode="exact")
+    assert not outputs_match("0.50000", "0.5", tolerance=0, mode="tokens")
+    assert outputs_match("1 2  \n", "1 2", tolerance=0, mode="tokens")
+
+
+def test_large_outputs_are_compared_and_previewed_compactly():
+    expected = "\n".join(f"{i} {i / 3:.6f}" for i in range(200_000))
+    actual = expected.replace("\n", "  \r\n")
+    assert outputs_match(actual, expected, tolerance=1e-6, mode="tokens")
+
+    wrong = actual.replace("199999 ", "199998 ")
+    message = describe_mismatch(wrong, expected)
+    assert len(message) < 600
+    assert "first difference at line 200000" in message
+    assert classify_error(f"Test 1: {message}") == FailureKind.WRONG_ANSWER
@@ -0,0 +1,86 @@
+from src.agents.llm import Architecture
+from src.data.case_store import registered_cases
+from src.graph.escalation import (
+    EscalationAction,
+    EscalationPolicy,
+    FailureAwareEscalationPolicy,
+    FailureKind,
+    classify_failure,
+    failure_signature,
+)
+from src.graph.graph import build_graph, run_graph
+from src.graph.state import create_initial_state
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+def _failed_state(tier: str, errors: list[str], **overrides):
+    state = create_initial_state(task_id="apps_esc", task_description="")
+    state.update(
+        developer_tier=tier,
+        test_passed=False,
+        last_errors=errors,
+        failure_signatures=[failure_signature(errors)],
+        **overrides,
+    )
+    return state
+
+
+def test_classify_failure_kinds():
+    assert classify_failure(["Test 1: Execution error - Timeout after 10 seconds"]) == FailureKind.TIMEOUT
+    assert classify_failure([
+        "Test 1: Expected '1', got '2'",
+        'Test 2: Execution error -   File "/tmp/x.py", line 1\nSyntaxError: invalid syntax',
+    ]) == FailureKind.SYNTAX_ERROR
+    assert classify_failure(["Test 1: Execution error - ZeroDivisionError"]) == FailureKind.RUNTIME_ERROR
+    assert classify_failure(["Test 1: Expected '1', got '2'"]) == FailureKind.WRONG_ANSWER
+
+
+def test_failure_signature_ignores_temp_paths():
+    first = failure_signature(['Test 1: Execution error - File "/tmp/tmpa1.py", line 3'])
+    second = failure_signature(['Test 1: Execution error - File "/tmp/tmpz9.py", line 3'])
+    assert first == second
+
+
+def test_linear_policy_matches_original_limits():
+    policy = EscalationPolicy()
+    assert policy.decide(_failed_state("S", ["Test 1: Expected '1', got '2'"])) == EscalationAction.ESCALATE
+    assert policy.decide(_failed_state("L", ["Test 1: Expected '1', got '2'"])) == EscalationAction.STOP
+    assert policy.decide(_failed_state("M", ["x"], escalations=2)) == EscalationAction.STOP
+
+
+def test_failure_aware_policy_decisions():
+    policy = FailureAwareEscalationPolicy()
+    timeout = ["Test 1: Execution error - Timeout after 10 seconds"]
+    syntax = ["Test 1: Execution error - SyntaxError: invalid syntax"]
+
+    assert policy.decide(_failed_state("S", timeout)) == EscalationAction.JUMP_TO_L
+    assert policy.decide(_failed_state("S", syntax)) == EscalationAction.RETRY_SAME
+    assert policy.decide(_failed_state("S", syntax, tier_retries=1)) == EscalationAction.ESCALATE
+
+    repeated = _failed_state("M", timeout)
+    repeated["failure_signatures"] = repeated["failure_signatures"] * 2
+    assert policy.decide(repeated) == EscalationAction.STOP
+
+
+def test_identical_failures_stop_early(monkeypatch):
+    task = dict(
+        task_id="apps_esc_graph",
+        task_description="Echo the input line.",
+        test_inputs=["1\n"],
+        test_outputs=["1\n"],
+        architecture=Architecture.B,
+    )
+
+    client = install_fake_client(monkeypatch, FakeLLMClient(story_points=1, code="print('wrong')"))
+    linear = run_graph(**task)
+    # Each retry reproduces the failed program and is re-prompted once
+    assert client.calls.count("developer") == 1 + 2 * 2
+    assert linear["developer_tier"] == "L"
+
+    client = install_fake_client(monkeypatch, FakeLLMClient(story_points=1, code="print('wrong')"))
+    graph = build_graph(Architecture.B, escalation_policy=FailureAwareEscalationPolicy())
+    with registered_cases(task["task_id"], ["1\n"], ["1\n"]) as test_ref:
+        result = graph.invoke(create_initial_state(task["task_id"], task["task_description"], test_ref=test_ref))
+    assert client.calls.count("developer") == 1 + 2
+    assert result["developer_tier"] == "M"
+    assert result["escalations"] == 1
@@ -0,0 +1,87 @@
+from src.agents.llm import Architecture
+from src.graph import nodes
+from src.graph.fingerprint import code_fingerprint
+from src.graph.graph import run_graph
+from src.models.llm_responses import ReviewerResponse
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+def test_fingerprint_ignores_formatting_comments_and_docstrings():
+    original = 'def f(x):\n    """Double."""\n    return x*2\n\nprint(f(int(input())))\n'
+    reformatted = "# solution\ndef f(x):\n    return x * 2  # double\n\n\nprint(f(int(input())))"
+
+    assert code_fingerprint(original) == code_fingerprint(reformatted)
+    assert code_fingerprint(original) != code_fingerprint(original.replace("x*2", "x*3"))
+    assert code_fingerprint("def f(:\n  pass") == code_fingerprint("def f(:   pass")
+
+
+class RepeatingDeveloper(FakeLLMClient):
+    """Developer that repeats each failing program once before switching to another one."""
+
+    def __init__(self):
+        super().__init__(story_points=1, code="print('wrong')")
+        self.programs = iter(["print('wrong')", "print('wrong')  # again", "print(0)", "print(0)", "print(0)"])
+
+    def developer(self, **kwargs):
+        response = super().developer(**kwargs)
+        response.generated_code = next(self.programs)
+        return response
+
+
+class ReformattingReviewer(FakeLLMClient):
+    """Reviewer that returns the same program every time, reformatted and with a new comment."""
+
+    def developer(self, **kwargs):
+        response = super().developer(**kwargs)
+        response.generated_code = f"print({self.calls.count('developer')})"
+        return response
+
+    def reviewer(self, code, task_description):
+        super().reviewer(code, task_description)
+        review = self.calls.count("reviewer")
+        return ReviewerResponse(feedback="ok", reviewed_code=f"# review {review}\nprint( 'wrong' )\n")
+
+
+def _run_counting_executions(monkeypatch) -> tuple[dict, list[str]]:
+    executions = []
+    original_execute = nodes._execute_code
+
+    def counting_execute(code, stdin, timeout=10):
+        executions.append(code)
+        return original_execute(code, stdin, timeout)
+
+    monkeypatch.setattr(nodes, "_execute_code", counting_execute)
+    result = run_graph(
+        task_id="apps_fingerprint",
+        task_description="Echo the input line.",
+        test_inputs=["1\n"],
+        test_outputs=["1\n"],
+        architecture=Architecture.B,
+    )
+    return result, executions
+
+
+def test_program_returned_again_by_the_reviewer_is_not_run_again(monkeypatch):
+    client = install_fake_client(monkeypatch, ReformattingReviewer(story_points=1))
+
+    result, executions = _run_counting_executions(monkeypatch)
+
+    # Three rounds (S, M, L) with new Developer code, but the reviewed program only runs once
+    assert client.calls.count("reviewer") == 3
+    assert executions == ["# review 1\nprint( 'wrong' )\n"]
+    assert result["test_runs"] == 3
+    assert result["failure_history"][-1].startswith("Program identical to test run 1")
+
+
+def test_known_programs_reuse_verdicts_and_retries_are_reprompted(monkeypatch):
+    client = install_fake_client(monkeypatch, RepeatingDeveloper())
+
+    result, executions = _run_counting_executions(monkeypatch)
+
+    # Each retry first reproduces a failed program and is re-prompted once;
+    # the second answer of retry 2 is still print(0), whose verdict is reused.
+    assert client.calls.count("developer") == 1 + 2 + 2
+    assert executions == ["print('wrong')", "print(0)"]
+    assert result["test_runs"] == 3
+    assert result["failure_history"][-1].startswith("Program identical to test run 2")
+    assert not result["test_passed"]
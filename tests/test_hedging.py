@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from huggingface_hub import InferenceClient
+
+from src.agents.client import LLMClient
+from src.agents.hedging import Hedger, LatencyTracker
+from src.agents.llm import Architecture
+from src.agents.usage import track_usage
+from src.utils.scheduler import Stage
+
+
+SLOW_SECONDS = 1.0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """OpenAI-style chat endpoint; the first request of a "slow" prompt stalls."""
+
+    seen: Counter = Counter()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        with self.lock:
+            self.seen[prompt] += 1
+            attempt = self.seen[prompt]
+        if prompt.startswith("slow") and attempt == 1:
+            time.sleep(SLOW_SECONDS)
+
+        payload = json.dumps({
+            "id": "chatcmpl", "object": "chat.completion", "created": 0,
+            "model": body["model"], "system_fingerprint": "",
+            "choices": [{
+                "index": 0, "finish_reason": "stop", "logprobs": None,
+                "message": {"role": "assistant", "content": f"{prompt} (attempt {attempt})"},
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    StandInHandler.seen = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield InferenceClient(base_url=f"http://127.0.0.1:{server.server_port}")
+    server.shutdown()
+
+
+def _chat(client: InferenceClient, prompt: str):
+    return lambda: client.chat_completion(
+        model="stand-in", messages=[{"role": "user", "content": prompt}], max_tokens=8
+    ).choices[0].message.content
+
+
+def _warm_up(hedger: Hedger, client: InferenceClient, calls: int = 10) -> None:
+    for i in range(calls):
+        hedger.call("stand-in", _chat(client, f"fast {i}"))
+
+
+def test_slow_call_is_hedged_and_duplicate_wins(endpoint):
+    hedger = Hedger(percentile=90, max_extra_rate=0.5, tracker=LatencyTracker(min_samples=5))
+    _warm_up(hedger, endpoint)
+
+    start = time.monotonic()
+    content = hedger.call("stand-in", _chat(endpoint, "slow task"))
+
+    assert time.monotonic() - start < SLOW_SECONDS / 2
+    assert content == "slow task (attempt 2)"
+    assert hedger.stats() == {"calls": 11, "hedged": 1, "hedge_wins": 1}
+
+
+def test_extra_request_rate_is_capped(endpoint):
+    hedger = Hedger(percentile=90, max_extra_rate=0.05, tracker=LatencyTracker(min_samples=5))
+    _warm_up(hedger, endpoint)
+
+    content = hedger.call("stand-in", _chat(endpoint, "slow task"))
+
+    # 1 hedge in 11 calls would exceed 5%: wait for the slow primary instead
+    assert content == "slow task (attempt 1)"
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_no_hedging_before_enough_samples(endpoint):
+    hedger = Hedger(percentile=90, max_extra_rate=1.0, tracker=LatencyTracker(min_samples=50))
+    _warm_up(hedger, endpoint, calls=3)
+
+    assert hedger.call("stand-in", _chat(endpoint, "slow task")) == "slow task (attempt 1)"
+
+
+def test_client_uses_hedger_and_charges_the_abandoned_duplicate(endpoint, monkeypatch):
+    hedger = Hedger(percentile=90, max_extra_rate=0.5, tracker=LatencyTracker(min_samples=5))
+    _warm_up(hedger, endpoint)
+    monkeypatch.setattr("src.agents.client.get_hedger", lambda: hedger)
+    monkeypatch.setattr("src.agents.client.get_local_model", lambda name: None)
+
+    client = LLMClient(Architecture.B)
+    client._client = endpoint
+    with track_usage() as usage:
+        text = client._invoke_chat("stand-in", [{"role": "user", "content": "slow review"}])
+
+    assert text == "slow review (attempt 2)"
+    # The slow primary is still in flight and will be billed as well
+    assert usage.llm_calls == 2
+    assert usage.total_tokens == 30
+
+
+def test_hedged_duplicate_waits_for_a_stage_slot(endpoint):
+    hedger = Hedger(percentile=90, max_extra_rate=0.5, tracker=LatencyTracker(min_samples=5))
+    _warm_up(hedger, endpoint)
+    stage = Stage("llm", 1)
+    charged = []
+
+    content = hedger.call("stand-in", _chat(endpoint, "slow task"), charge_duplicate=charged.append, slot=stage.slot)
+
+    # The duplicate only got the slot after the primary succeeded: never sent
+    assert content == "slow task (attempt 1)"
+    assert hedger.stats()["hedged"] == 1
+    time.sleep(0.1)
+    assert StandInHandler.seen["slow task"] == 1
+    assert charged == []
+    assert stage.stats()["max_queue_length"] == 1
+
+
+def test_latency_excludes_time_queued_for_a_worker():
+    hedger = Hedger(max_workers=1, tracker=LatencyTracker(min_samples=1))
+    busy = hedger._executor.submit(time.sleep, 0.3)
+
+    hedger.call("m", lambda: time.sleep(0.01))
+
+    assert busy.done()
+    assert hedger.tracker.percentile("m", 100) < 0.2
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(min_samples=3)
+    for seconds in (1.0, 2.0, 3.0, 4.0, 5.0):
+        tracker.record("m", seconds)
+
+    assert tracker.percentile("m", 50) == 3.0
+    assert tracker.percentile("m", 90) == pytest.approx(4.6)
+    assert tracker.percentile("other", 50) is None
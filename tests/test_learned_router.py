@@ -0,0 +1,145 @@
+import os
+import time
+
+import numpy as np
+
+from src.agents.llm import Architecture
+from src.graph.graph import build_graph, get_learned_router, run_graph
+from src.graph.state import create_initial_state
+from src.graph.learned_router import (
+    FEATURE_NAMES,
+    LearnedRouter,
+    evaluate,
+    needed_tier,
+    task_features,
+    training_examples,
+)
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+EASY = "Print the sum of two integers a and b (1 <= a, b <= 100).\n\n-----Examples-----\nInput\n1 2\nOutput\n3"
+HARD = (
+    "Given a tree with n vertices (1 ≤ n ≤ 2*10^5) answer q queries (1 ≤ q ≤ 10^5): the maximum "
+    "weight on the path between two nodes, modulo 10^9+7.\n" * 3
+)
+
+
+def _records(count: int = 60) -> list[dict]:
+    records = []
+    for i in range(count):
+        hard = i % 2 == 1
+        records.append({
+            "task_id": f"apps_{i}",
+            "architecture": "C",
+            "status": "passed",
+            "test_passed": True,
+            "developer_tier_initial": "M",
+            "developer_tier_final": "L" if hard else "S",
+            "routed_by": "planner",
+            "task_features": task_features(HARD if hard else EASY, "competition" if hard else "introductory"),
+        })
+    return records
+
+
+def test_features_capture_constraints_and_keywords():
+    easy, hard = task_features(EASY, "introductory"), task_features(HARD, "competition")
+
+    assert list(hard) == FEATURE_NAMES
+    assert easy["examples"] == 1
+    assert easy["max_bound_log10"] == 2
+    assert hard["max_bound_log10"] == 9  # 10^9+7
+    assert hard["kw_graph"] > 0 and hard["kw_query"] > 0 and easy["kw_graph"] == 0
+    assert hard["difficulty_competition"] == 1 and easy["difficulty_competition"] == 0
+
+
+def test_needed_tier_labels():
+    assert needed_tier({"test_passed": True, "developer_tier_final": "M"}) == "M"
+    assert needed_tier({"test_passed": False, "developer_tier_final": "S"}) == "L"
+
+
+def test_runs_routed_by_the_router_are_not_training_data():
+    records = _records(4)
+    for record in records[:2]:
+        record["routed_by"] = "learned_router"
+
+    features, labels, planner_tiers = training_examples(records)
+
+    assert features.shape == (2, len(FEATURE_NAMES))
+    assert labels == ["S", "L"]
+    assert planner_tiers == ["M", "M"]
+
+
+def test_runs_out_of_budget_are_not_training_data():
+    records = _records(4)
+    records[0].update(status="budget_exhausted", test_passed=False)
+
+    _, labels, _ = training_examples(records)
+
+    assert labels == ["L", "S", "L"]
+
+
+def test_router_model_is_loaded_once_per_file_version(monkeypatch, tmp_path):
+    path = str(tmp_path / "router.json")
+    features, labels, _ = training_examples(_records())
+    LearnedRouter.fit(features, labels).save(path)
+    monkeypatch.setenv("ROUTER_MODEL", path)
+    loads = []
+    load = LearnedRouter.load
+    monkeypatch.setattr(LearnedRouter, "load", lambda path: loads.append(path) or load(path))
+
+    first = get_learned_router()
+    assert get_learned_router() is first
+    assert len(loads) == 1
+
+    modified = os.path.getmtime(path) + 10
+    os.utime(path, (modified, modified))  # retrained
+    assert get_learned_router() is not first
+    assert len(loads) == 2
+
+
+def test_router_trains_in_milliseconds_and_beats_constant_planner(tmp_path):
+    features, labels, planner_tiers = training_examples(_records())
+
+    start = time.perf_counter()
+    router = LearnedRouter.fit(features, labels)
+    assert time.perf_counter() - start < 0.5
+
+    path = str(tmp_path / "router.json")
+    router.save(path)
+    loaded = LearnedRouter.load(path)
+    assert loaded.predict(EASY, "introductory").tier == "S"
+    assert loaded.predict(HARD, "competition").tier == "L"
+
+    report = evaluate(features, labels, planner_tiers, confidence=0.8)
+    assert report["tasks"] == 60
+    assert report["router_accuracy"] == 1.0
+    assert report["planner_accuracy"] == 0.0  # the Planner said M for everything
+    assert report["coverage"] == 1.0
+
+
+def test_confident_router_skips_planner(monkeypatch, tmp_path):
+    client = install_fake_client(monkeypatch, FakeLLMClient(story_points=8))
+    features, labels, _ = training_examples(_records())
+    LearnedRouter.fit(features, labels).save(str(tmp_path / "router.json"))
+    monkeypatch.setenv("ROUTER_MODEL", str(tmp_path / "router.json"))
+
+    result = run_graph("apps_1", EASY, ["1 2\n"], ["1 2\n"], architecture=Architecture.C, difficulty="introductory")
+
+    assert "planner" not in client.calls
+    assert result["routed_by"] == "learned_router"
+    assert result["developer_tier"] == "S"
+    assert result["router_confidence"] >= 0.8
+    assert result["test_passed"]
+
+
+def test_unsure_router_falls_back_to_planner(monkeypatch):
+    client = install_fake_client(monkeypatch, FakeLLMClient(story_points=8))
+    uniform = LearnedRouter(np.zeros((len(FEATURE_NAMES), 3)), np.zeros(3), np.zeros(len(FEATURE_NAMES)), np.ones(len(FEATURE_NAMES)))
+
+    graph = build_graph(Architecture.C, learned_router=uniform)
+    result = graph.invoke(create_initial_state("apps_1", EASY, architecture=Architecture.C))
+
+    assert client.calls[0] == "planner"
+    assert result["routed_by"] == "planner"
+    assert result["story_points_initial"] == 8
+    assert round(result["router_confidence"], 2) == 0.33
@@ -0,0 +1,87 @@
+import threading
+
+from src.agents.client import LLMClient
+from src.agents.local_backend import GenerationRequest, LocalCompletion, LocalModel, RequestBatcher
+from src.agents.llm import Architecture
+from src.agents.usage import track_usage
+
+
+def _messages(system: str, user: str) -> list[dict]:
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+class EchoGenerator:
+    """Stands in for TransformersGenerator: echoes the user prompt."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+        self.release = threading.Event()
+
+    def generate_batch(self, batch):
+        self.release.wait(timeout=5)
+        self.batches.append([r.messages[-1]["content"] for r in batch])
+        return [LocalCompletion(text=r.messages[-1]["content"], prompt_tokens=10, completion_tokens=2) for r in batch]
+
+
+def _submit_concurrently(batcher, requests):
+    results = [None] * len(requests)
+
+    def submit(i):
+        results[i] = batcher.submit(requests[i]).text
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_requests_share_one_batch():
+    generator = EchoGenerator()
+    batcher = RequestBatcher(generator.generate_batch, max_batch_size=8, batch_wait_ms=200)
+
+    requests = [GenerationRequest(_messages("sys", f"task {i}"), 64, 0.01) for i in range(4)]
+    threads, results = _submit_concurrently(batcher, requests)
+    generator.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [f"task {i}" for i in range(4)]
+    assert sum(batcher.batch_sizes) == 4
+    assert max(batcher.batch_sizes) > 1
+
+
+def test_batches_only_group_compatible_requests():
+    generator = EchoGenerator()
+    generator.release.set()
+    batcher = RequestBatcher(generator.generate_batch, max_batch_size=2, batch_wait_ms=200)
+
+    requests = [
+        GenerationRequest(_messages("planner", "a"), 64, 0.01),
+        GenerationRequest(_messages("developer", "b"), 64, 0.01),
+        GenerationRequest(_messages("planner", "c"), 64, 0.01),
+        GenerationRequest(_messages("planner", "d"), 64, 0.01),
+        GenerationRequest(_messages("planner", "a"), 64, 0.01),  # duplicate prompt
+    ]
+    threads, results = _submit_concurrently(batcher, requests)
+    for thread in threads:
+        thread.join()
+
+    assert results == ["a", "b", "c", "d", "a"]
+    assert all(len(batch) <= 2 for batch in generator.batches)
+    for batch in generator.batches:
+        assert len({prompt == "b" for prompt in batch}) == 1
+
+
+def test_client_routes_local_models_and_counts_usage(monkeypatch):
+    generator = EchoGenerator()
+    generator.release.set()
+    local = LocalModel("Qwen/Qwen2.5-Coder-1.5B-Instruct", generator=generator)
+    monkeypatch.setattr("src.agents.client.get_local_model", lambda name: local if name == local.model_name else None)
+
+    client = LLMClient(Architecture.C)
+    with track_usage() as usage:
+        text = client._invoke_chat("Qwen/Qwen2.5-Coder-1.5B-Instruct", _messages("sys", "hello"))
+
+    assert text == "hello"
+    assert usage.llm_calls == 1
+    assert usage.total_tokens == 12
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from src.evaluation.metrics import ResultsAggregator, wilson_interval
+
+
+def _record(task_id, architecture, passed, retries=0, difficulty="interview", tier="S"):
+    return {
+        "task_id": task_id,
+        "architecture": architecture,
+        "difficulty_ground_truth": difficulty,
+        "story_points_initial": 2,
+        "developer_tier_initial": tier,
+        "developer_tier_final": "L" if retries else tier,
+        "escalations": retries,
+        "retry_count": retries,
+        "status": "passed" if passed else "failed",
+        "test_passed": passed,
+        "total_tokens": 1000,
+        "api_calls": 4,
+        "execution_time_seconds": 2.0,
+        "generated_code": "print(input())",
+    }
+
+
+def _append(path, *records, tail=""):
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def test_summary_metrics(tmp_path):
+    _append(
+        tmp_path / "run.jsonl",
+        _record("apps_1", "B", passed=True),
+        _record("apps_2", "B", passed=True, retries=2),
+        _record("apps_3", "B", passed=False, retries=2),
+        _record("apps_1", "A", passed=False),
+    )
+    summary = ResultsAggregator(str(tmp_path)).summary()
+
+    assert summary.loc["B", "tasks"] == 3
+    assert summary.loc["B", "pass_rate"] == pytest.approx(2 / 3)
+    assert summary.loc["B", "pass_at_1"] == pytest.approx(1 / 3)
+    assert summary.loc["A", "pass_rate"] == 0
+    assert summary.loc["B", "ci_low"] < 2 / 3 < summary.loc["B", "ci_high"]
+
+
+def test_refresh_reads_only_appended_complete_lines(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _append(path, _record("apps_1", "C", passed=False), tail='{"task_id": "apps_2", "arch')
+    aggregator = ResultsAggregator(str(path))
+    assert len(aggregator) == 1
+
+    # Finish the partial line, rerun apps_1 successfully
+    with open(path, "a") as f:
+        f.write('itecture": "C", "test_passed": true}\n')
+    _append(path, _record("apps_1", "C", passed=True))
+
+    assert aggregator.refresh() == 2
+    assert aggregator.refresh() == 0
+    frame = aggregator.frame.set_index("task_id")
+    assert frame.loc["apps_1", "test_passed"]  # the later record wins
+    assert len(frame) == 2
+
+
+def test_tier_tables(tmp_path):
+    _append(
+        tmp_path / "run.jsonl",
+        _record("apps_1", "C", passed=True, tier="S"),
+        _record("apps_2", "C", passed=True, retries=1, tier="M"),
+        _record("apps_3", "C", passed=False, difficulty="competition", tier="M"),
+    )
+    aggregator = ResultsAggregator(str(tmp_path))
+
+    assert aggregator.tier_distribution().loc["C", "M"] == pytest.approx(2 / 3)
+    patterns = aggregator.escalation_patterns()
+    assert patterns.loc[("C", "M -> L"), "tasks"] == 1
+    assert aggregator.pass_rate_by_difficulty().loc["competition", "C"] == 0
+
+
+def test_wilson_interval_handles_empty_groups():
+    low, high = wilson_interval([0, 5], [0, 10])
+    assert low[1] == pytest.approx(0.2366, abs=1e-3)
+    assert high[1] == pytest.approx(0.7634, abs=1e-3)
@@ -1,5 +1,12 @@
+import os
+
 import pytest
-from src.graph.graph import graph, create_initial_state
+from src.graph.graph import build_graph
+from src.graph.state import create_initial_state
+
+
+# These tests call the live Hugging Face Inference API
+pytestmark = pytest.mark.skipif(not os.getenv("HF_TOKEN"), reason="HF_TOKEN not set")
 
 
 SAMPLE_TASK = """
@@ -36,7 +43,7 @@ def test_planner_returns_valid_story_points():
         task_description=SAMPLE_TASK
     )
     
-    result = graph.invoke(initial_state)
+    result = build_graph().invoke(initial_state)
     
     # Verify plan exists
     assert result["plan"] is not None, "Plan should not be None"
@@ -64,7 +71,7 @@ def test_planner_complex_task():
         task_description=COMPLEX_TASK
     )
     
-    result = graph.invoke(initial_state)
+    result = build_graph().invoke(initial_state)
     
     assert result["plan"]["story_points"] >= 3, (
         f"Complex task should have story points >= 3, got {result['plan']['story_points']}"
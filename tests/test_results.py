@@ -0,0 +1,61 @@
+import json
+
+from src.agents.llm import Architecture
+from src.data.task_loader import Task
+from src.evaluation.results import ResultsWriter, build_record, merge_results, read_results, recorded_keys
+from src.graph.graph import run_graph
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+TASK = Task(
+    problem_id=7,
+    question="Echo the input line.",
+    difficulty="introductory",
+    inputs=["1\n"],
+    outputs=["1\n"],
+    starter_code="",
+)
+
+
+def test_build_record_follows_evaluation_schema(monkeypatch):
+    install_fake_client(monkeypatch, FakeLLMClient(story_points=1))
+    state = run_graph(TASK.task_id, TASK.question, TASK.inputs, TASK.outputs, architecture=Architecture.C)
+
+    record = build_record(TASK, "C", state, elapsed_seconds=1.23456)
+
+    assert record["task_id"] == "apps_7"
+    assert record["difficulty_ground_truth"] == "introductory"
+    assert record["developer_tier_initial"] == "S"
+    assert record["status"] == "passed"
+    assert record["api_calls"] == 3
+    assert record["execution_time_seconds"] == 1.235
+    json.dumps(record)
+
+
+def test_writer_appends_across_runs_and_repairs_truncated_line(tmp_path):
+    path = str(tmp_path / "results" / "run.jsonl")
+    with ResultsWriter(path) as writer:
+        writer.write({"task_id": "apps_1", "architecture": "A", "status": "passed"})
+    with open(path, "a") as f:
+        f.write('{"task_id": "apps_2", "archi')  # writer killed mid-line
+
+    with ResultsWriter(path) as writer:
+        writer.write({"task_id": "apps_3", "architecture": "A", "status": "error"})
+
+    assert [r["task_id"] for r in read_results(path)] == ["apps_1", "apps_3"]
+    assert recorded_keys(path) == {("apps_1", "A")}
+
+
+def test_merge_keeps_last_record_per_task(tmp_path):
+    first, second = str(tmp_path / "a.jsonl"), str(tmp_path / "b.jsonl")
+    with ResultsWriter(first) as writer:
+        writer.write({"task_id": "apps_1", "architecture": "C", "status": "error"})
+        writer.write({"task_id": "apps_2", "architecture": "C", "status": "failed"})
+    with open(first, "a", encoding="utf-8") as f:
+        f.write('{"task_id": "apps_3", "archi')  # shard killed mid-line
+    with ResultsWriter(second) as writer:
+        writer.write({"task_id": "apps_1", "architecture": "C", "status": "passed"})
+
+    merged = str(tmp_path / "merged.jsonl")
+    assert merge_results([first, second], merged) == 2
+    assert {r["task_id"]: r["status"] for r in read_results(merged)} == {"apps_1": "passed", "apps_2": "failed"}
@@ -0,0 +1,156 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.agents.llm import Architecture
+from src.data.task_loader import Task
+from src.graph import nodes
+from src.graph.budget import TaskBudget
+from src.graph.graph import run_graph
+from src.graph.state import create_initial_state
+from src.utils.scheduler import Stage, StagedScheduler, disable_scheduler, enable_scheduler
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+class Peak:
+    """Highest number of threads inside the block at the same time."""
+
+    def __init__(self):
+        self.current = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+def test_stage_bounds_concurrency_and_reports_metrics():
+    stage = Stage("cpu", capacity=2)
+    inside = Peak()
+
+    def work(_):
+        with stage.slot(), inside:
+            time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(work, range(6)))
+
+    stats = stage.stats()
+    assert inside.peak == 2
+    assert stats["completed"] == 6
+    assert stats["max_queue_length"] >= 3
+    assert stats["utilization"] > 0.8
+    assert stats["avg_wait_seconds"] > 0
+
+
+def test_both_stages_are_saturated_at_once():
+    scheduler = StagedScheduler(llm_concurrency=4, test_workers=2, queue_size=2)
+
+    def task(_):
+        with scheduler.admit():
+            for _ in range(3):
+                with scheduler.slot("llm"):
+                    time.sleep(0.04)  # API round trip
+                with scheduler.slot("cpu"):
+                    time.sleep(0.02)  # test run
+
+    # More tasks than admitted: the extra threads wait for admission
+    with ThreadPoolExecutor(max_workers=scheduler.max_in_flight * 2) as pool:
+        list(pool.map(task, range(40)))
+
+    stats = scheduler.stats()
+    assert stats["llm"]["completed"] == stats["cpu"]["completed"] == 120
+    assert stats["llm"]["utilization"] > 0.6
+    assert stats["cpu"]["utilization"] > 0.6
+    assert stats["llm"]["max_queue_length"] + stats["cpu"]["max_queue_length"] <= scheduler.max_in_flight
+
+
+def test_admission_applies_backpressure():
+    scheduler = StagedScheduler(llm_concurrency=1, test_workers=1, queue_size=1)
+    admitted = Peak()
+
+    def task(_):
+        with scheduler.admit(), admitted:
+            time.sleep(0.02)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        list(pool.map(task, range(20)))
+
+    assert admitted.peak == scheduler.max_in_flight == 3
+
+
+@pytest.fixture
+def scheduler():
+    yield enable_scheduler(llm_concurrency=2, test_workers=1)
+    disable_scheduler()
+
+
+def test_test_executions_run_in_the_cpu_stage(monkeypatch, scheduler):
+    install_fake_client(monkeypatch, FakeLLMClient(story_points=1))
+
+    state = run_graph("apps_1", "Echo the input.", ["1\n", "2\n", "3\n"], ["1\n", "2\n", "3\n"],
+                      architecture=Architecture.C)
+
+    assert state["test_passed"]
+    assert scheduler.stats()["cpu"]["completed"] == 3
+
+
+def test_sweep_admits_tasks_at_the_pace_of_the_stages(monkeypatch, tmp_path):
+    import main
+
+    monkeypatch.setenv("LLM_CONCURRENCY", "1")
+    monkeypatch.setenv("TEST_WORKERS", "1")
+    monkeypatch.setenv("STAGE_QUEUE_SIZE", "1")
+    tasks = [Task(problem_id=i, question="", difficulty="interview", inputs=["1"], outputs=["1"]) for i in range(12)]
+    monkeypatch.setattr("src.data.task_loader.APPSTaskLoader", lambda split: None)
+    monkeypatch.setattr(main, "select_tasks", lambda loader, args: tasks)
+    running = Peak()
+
+    def fake_run_graph(task_id, task_description, architecture, **kwargs):
+        with running:
+            time.sleep(0.02)
+        return create_initial_state(task_id, task_description, architecture=architecture)
+
+    monkeypatch.setattr("src.graph.graph.run_graph", fake_run_graph)
+    pending = Peak()  # jobs submitted to the pool and not finished
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            pending.__enter__()
+            future = super().submit(fn, *args, **kwargs)
+            future.add_done_callback(lambda _: pending.__exit__())
+            return future
+
+    monkeypatch.setattr(main, "ThreadPoolExecutor", CountingExecutor)
+    # More threads than the admission limit: only the scheduler can hold them back
+    args = main.parse_args(["run", "--staged", "--concurrency", "10", "--output", str(tmp_path / "out.jsonl")])
+    try:
+        assert main.run_sweep(args) == 0
+    finally:
+        disable_scheduler()
+
+    assert running.peak == 3  # 1 LLM slot + 1 test worker + 1 queued
+    assert pending.peak == 3  # the loader waited instead of queuing all 12 jobs
+    assert len((tmp_path / "out.jsonl").read_text().splitlines()) == 12
+
+
+def test_test_timeout_is_computed_after_waiting_for_a_cpu_slot(monkeypatch, scheduler):
+    state = create_initial_state("apps_1", "", budget=TaskBudget(max_tokens=None, max_llm_calls=None, max_wall_seconds=5))
+    timeouts = []
+    monkeypatch.setattr("src.graph.nodes._execute_code",
+                        lambda code, stdin, timeout: timeouts.append(timeout) or (True, "1\n", ""))
+
+    with scheduler.slot("cpu"):  # every CPU slot is taken for a second
+        worker = threading.Thread(target=nodes._run_test_cases, args=("print(1)", [(0, ("", "1"))], state))
+        worker.start()
+        time.sleep(1.0)
+    worker.join()
+
+    assert timeouts and timeouts[0] < 4.2
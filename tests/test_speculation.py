@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from src.agents.llm import Architecture
+from src.graph.budget import TaskBudget
+from src.graph import nodes
+from src.graph.graph import build_graph, run_graph
+from src.graph.state import create_initial_state
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+LATENCY = 0.3
+
+
+class SlowLLMClient(FakeLLMClient):
+    """Fake client whose Planner and Developer calls each take LATENCY seconds."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tiers: list[str] = []
+        self.prompted_points: list[int] = []
+
+    def planner(self, task_description, task_id):
+        time.sleep(LATENCY)
+        return super().planner(task_description, task_id)
+
+    def developer(self, **kwargs):
+        time.sleep(LATENCY)
+        self.tiers.append(kwargs["developer_tier"])
+        self.prompted_points.append(kwargs["story_points"])
+        return super().developer(**kwargs)
+
+
+def _run(budget: TaskBudget = None):
+    build_graph(Architecture.C)  # keep first-use imports out of the timing
+    start = time.monotonic()
+    state = run_graph("apps_1", "Echo the input.", ["1\n"], ["1\n"], architecture=Architecture.C, budget=budget)
+    return state, time.monotonic() - start
+
+
+def test_hit_overlaps_planner_and_developer(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=3))
+
+    state, elapsed = _run()
+
+    assert state["speculation"] == "hit"
+    assert state["test_passed"]
+    assert client.tiers == ["M"]
+    assert state["llm_calls"] == 3  # planner, speculative developer, reviewer
+    assert elapsed < 2 * LATENCY + LATENCY / 2
+
+
+def test_miss_is_discarded_but_charged(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=1))
+
+    state, _ = _run()
+
+    assert state["speculation"] == "miss"
+    assert state["developer_tier"] == "S"
+    assert sorted(client.tiers) == ["M", "S"]
+    assert state["llm_calls"] == 4
+
+
+def test_other_story_points_of_the_same_tier_are_a_miss(monkeypatch):
+    # The speculative prompt said 3 story points; the Planner's 5 changes the prompt
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=5))
+
+    state, _ = _run()
+
+    assert state["speculation"] == "miss"
+    assert client.prompted_points == [3, 5]
+    assert state["llm_calls"] == 4
+
+
+def test_planner_failure_charges_the_running_speculation(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(fail_on="planner"))
+    state = create_initial_state("apps_1", "Echo the input.", architecture=Architecture.C)
+
+    with pytest.raises(RuntimeError):
+        nodes.planner_node(state)
+
+    assert not nodes._speculations
+    assert client.tiers == ["M"]
+    assert state["llm_calls"] == 1  # the speculative Developer call
+
+
+def test_miss_is_charged_before_the_developer_checks_the_budget(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=1))
+
+    state, _ = _run(TaskBudget(max_tokens=None, max_llm_calls=2, max_wall_seconds=None))
+
+    assert state["speculation"] == "miss"
+    assert client.tiers == ["M"]
+    assert state["llm_calls"] == 2
+    assert state["status"] == "budget_exhausted"
+
+
+@pytest.mark.parametrize("limits", [
+    {"max_tokens": None, "max_llm_calls": 1},
+    {"max_tokens": 1000, "max_llm_calls": None},  # less than the two completion budgets
+])
+def test_no_speculation_without_budget_for_both_calls(monkeypatch, limits):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=3))
+
+    state, _ = _run(TaskBudget(max_wall_seconds=None, **limits))
+
+    assert state["speculation"] is None
+    assert client.tiers == ([] if limits["max_llm_calls"] else ["M"])
+
+
+def test_speculation_is_released_when_the_run_fails(monkeypatch):
+    monkeypatch.setenv("SPECULATIVE_DEVELOPER_TIER", "M")
+    install_fake_client(monkeypatch, SlowLLMClient(story_points=3))
+
+    def failing_router(state, policy=None):
+        raise RuntimeError("router failed")
+    monkeypatch.setattr("src.graph.graph.router_node", failing_router)
+
+    with pytest.raises(RuntimeError):
+        _run()
+
+    assert not nodes._speculations
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("SPECULATIVE_DEVELOPER_TIER", raising=False)
+    client = install_fake_client(monkeypatch, SlowLLMClient(story_points=5))
+
+    state, elapsed = _run()
+
+    assert state["speculation"] is None
+    assert client.tiers == ["M"]
+    assert elapsed >= 2 * LATENCY
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.bench_startup import import_cost
+
+
+@pytest.mark.parametrize("module", ["main", "src.graph.graph", "src.graph.nodes"])
+def test_entry_points_defer_heavy_imports(module):
+    _, heavy = import_cost(module)
+    assert heavy == []
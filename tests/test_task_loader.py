@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+from datasets import Dataset, load_from_disk
+
+from src.data.lazy_io import iter_json_array_field
+from src.data.task_loader import APPSTaskLoader
+
+
+DIFFICULTIES = ["introductory", "interview", "competition"]
+
+
+def _row(problem_id: int) -> dict:
+    io = {"inputs": [f"{problem_id}\n"], "outputs": [f"{problem_id}\n"]}
+    if problem_id == 4:
+        io = {"inputs": [], "outputs": []}
+    return {
+        "problem_id": problem_id,
+        "question": f"Question {problem_id}",
+        "solutions": "[]",
+        "input_output": json.dumps(io),
+        "difficulty": DIFFICULTIES[problem_id % 3],
+        "url": "",
+        "starter_code": "",
+    }
+
+
+@pytest.fixture
+def loader(tmp_path):
+    path = str(tmp_path / "apps")
+    Dataset.from_list([_row(i) for i in range(30)]).save_to_disk(path)
+    loader = APPSTaskLoader(cache_dir=str(tmp_path / "cache"))
+    loader._dataset = load_from_disk(path)
+    return loader
+
+
+def test_get_task_by_id(loader):
+    task = loader.get_task(17)
+    assert task.problem_id == 17
+    assert task.inputs == ["17\n"]
+    assert loader.get_task(999) is None
+
+
+def test_load_by_difficulty_uses_dataset_order_and_skips_empty(loader):
+    tasks = loader.load_by_difficulty("interview", limit=3)
+    # problem 4 is an interview task with no tests
+    assert [t.problem_id for t in tasks] == [1, 7, 10]
+    assert all(t.difficulty == "interview" for t in tasks)
+
+
+def test_seeded_sampling_is_reproducible(loader):
+    first = [t.problem_id for t in loader.load_balanced(per_level=2, seed=7)]
+    second = [t.problem_id for t in loader.load_balanced(per_level=2, seed=7)]
+    assert first == second
+    assert len(first) == 6
+
+
+def test_index_is_persisted_next_to_dataset_cache(loader):
+    index = loader.index
+    path = loader._index_path()
+    assert os.path.exists(path)
+
+    reloaded = APPSTaskLoader(cache_dir=loader.cache_dir)
+    reloaded._dataset = loader.dataset
+    assert reloaded._load_index() == index
+
+
+def test_local_cache_is_used_without_the_hf_dataset(loader):
+    expected = loader.load_by_difficulty("interview", limit=3)
+    loader.build_local_cache(batch_size=7)
+
+    offline = APPSTaskLoader(cache_dir=loader.cache_dir)
+    assert len(offline) == 30
+    assert offline.get_task(17) == loader.get_task(17)
+    assert offline.load_by_difficulty("interview", limit=3) == expected
+    assert offline._dataset is None
+
+
+def test_test_cases_are_decoded_lazily(loader):
+    task = loader.get_task(5)
+    assert repr(task.inputs) == "LazyTestCases(not decoded)"
+    assert [case for case in task.outputs] == ["5\n"]
+    assert repr(task.outputs) == "LazyTestCases(not decoded)"
+    assert len(task.inputs) == 1
+
+
+def test_iter_json_array_field_streams_one_field():
+    raw = json.dumps({"fn_name": "f", "inputs": [[1, 2], "a\n"], "outputs": ["x", "y"]})
+    assert list(iter_json_array_field(raw, "outputs")) == ["x", "y"]
+    assert list(iter_json_array_field(raw, "inputs")) == [[1, 2], "a\n"]
+    assert list(iter_json_array_field(raw, "missing")) == []
+
+
+@pytest.mark.parametrize("raw", [
+    '{"inputs": ["1", "2"], "outputs": ["1", ',
+    '{"inputs": ["1"], "outputs": ["1"]} trailing',
+    '{"inputs": ["1"], "outputs": ["1"], 3: []}',
+    '["1"]',
+])
+def test_malformed_test_data_drops_the_task(loader, raw):
+    assert loader._parse_task({**_row(1), "input_output": raw}) is None
+
+
+def test_streaming_mode_reads_rows_incrementally(monkeypatch, tmp_path):
+    rows = Dataset.from_list([_row(i) for i in range(30)])
+    monkeypatch.setattr(
+        "src.data.task_loader.load_dataset",
+        lambda *args, **kwargs: rows.to_iterable_dataset(),
+    )
+    loader = APPSTaskLoader(cache_dir=str(tmp_path))
+
+    tasks = loader.load_by_difficulty("competition", limit=2, streaming=True)
+
+    assert [t.problem_id for t in tasks] == [2, 5]
+    assert loader._dataset is None
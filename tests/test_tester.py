@@ -0,0 +1,61 @@
+from src.data.case_store import get_case_store
+from src.graph import nodes
+from src.graph.state import create_initial_state
+
+
+ECHO = "print(input())"
+
+
+def _state(code: str, inputs: list[str], outputs: list[str]):
+    test_ref = get_case_store().put("apps_tester", inputs, outputs)
+    state = create_initial_state("apps_tester", "", test_ref=test_ref)
+    state["generated_code"] = code
+    return state
+
+
+def teardown_function():
+    get_case_store().release("apps_tester")
+
+
+def test_smoke_subset_is_deterministic_and_stratified():
+    sizes = [50, 1, 30, 2, 40, 3, 20, 4, 10]
+    subset = nodes._select_smoke_cases(sizes, 3)
+
+    assert subset == nodes._select_smoke_cases(sizes, 3)
+    assert len(subset) == 3
+    # one small, one medium and one large case
+    assert sorted(sizes[i] for i in subset) == [2, 10, 40]
+    assert nodes._select_smoke_cases([5, 6], 3) == {0, 1}
+
+
+def test_full_mode_reports_single_stage(monkeypatch):
+    monkeypatch.setenv("TESTER_MODE", "full")
+    state = nodes.tester_node(_state(ECHO, ["1\n", "2\n"], ["1\n", "3\n"]))
+
+    assert not state["test_passed"]
+    assert state["test_report"] == {"full": {"total": 2, "passed": 1}}
+    assert (state["tests_total"], state["tests_passed"]) == (2, 1)
+
+
+def test_staged_mode_stops_after_failing_smoke_stage(monkeypatch):
+    monkeypatch.setenv("TESTER_MODE", "staged")
+    monkeypatch.setenv("SMOKE_TEST_CASES", "2")
+    inputs = [f"{i}\n" for i in range(10)]
+    state = nodes.tester_node(_state("print('x')", inputs, inputs))
+
+    assert not state["test_passed"]
+    assert state["test_report"] == {"smoke": {"total": 2, "passed": 0}, "full": None}
+    assert len(state["last_errors"]) == 2
+
+
+def test_staged_mode_runs_full_suite_after_passing_smoke(monkeypatch):
+    monkeypatch.setenv("TESTER_MODE", "staged")
+    monkeypatch.setenv("SMOKE_TEST_CASES", "2")
+    inputs = [f"{i}\n" for i in range(5)]
+    outputs = inputs[:4] + ["wrong\n"]
+    state = nodes.tester_node(_state(ECHO, inputs, outputs))
+
+    assert not state["test_passed"]
+    assert state["test_report"]["smoke"] == {"total": 2, "passed": 2}
+    assert state["test_report"]["full"] == {"total": 5, "passed": 4}
+    assert state["last_errors"] == ["Test 5: Expected 'wrong', got '4'"]
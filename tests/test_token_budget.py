@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.client import LLMClient
+from src.agents.llm import Architecture
+from src.agents.token_budget import DEFAULT_MAX_TOKENS, TokenBudgets
+from src.agents.usage import allowance_exhausted, track_usage
+from src.graph import nodes
+from src.graph.budget import TaskBudget
+from src.graph.state import create_initial_state
+
+
+def test_budget_defaults_until_enough_samples():
+    budgets = TokenBudgets(min_samples=3)
+
+    assert budgets.budget("planner", "m") == 512
+    assert budgets.budget("developer", "m") == DEFAULT_MAX_TOKENS
+
+    for length in (100, 120, 140):
+        budgets.record("planner", "m", length)
+    assert budgets.budget("planner", "m") == pytest.approx(175, abs=1)  # p99 (~140) * 1.25
+    assert budgets.budget("planner", "other-model") == 512
+
+
+def test_budget_is_clamped():
+    budgets = TokenBudgets(min_samples=1, min_tokens=128, ceiling=1000)
+    budgets.record("reviewer", "m", 10)
+    budgets.record("developer", "m", 5000)
+
+    assert budgets.budget("reviewer", "m") == 128
+    assert budgets.budget("developer", "m") == 1000
+    assert budgets.retry_budget(300) == 600
+    assert budgets.retry_budget(800) == 1000
+    assert budgets.retry_budget(1000) is None
+
+    # Retries never go beyond the old fixed budget
+    assert TokenBudgets(ceiling=4096).retry_budget(1500) == DEFAULT_MAX_TOKENS
+    assert TokenBudgets(ceiling=4096).retry_budget(DEFAULT_MAX_TOKENS) is None
+
+
+class ScriptedInference:
+    """chat_completion stand-in: the response depends on max_tokens."""
+
+    def __init__(self, full_text: str, tokens: int, truncated_text: str = None):
+        self.full_text = full_text
+        self.truncated_text = truncated_text or full_text[:len(full_text) // 2]
+        self.tokens = tokens
+        self.max_tokens: list[int] = []
+
+    def chat_completion(self, model, messages, max_tokens, temperature):
+        self.max_tokens.append(max_tokens)
+        truncated = max_tokens < self.tokens
+        text = self.truncated_text if truncated else self.full_text
+        return SimpleNamespace(
+            choices=[SimpleNamespace(
+                message=SimpleNamespace(content=text),
+                finish_reason="length" if truncated else "stop",
+            )],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=min(max_tokens, self.tokens)),
+        )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    budgets = TokenBudgets(min_samples=2, ceiling=4096)
+    monkeypatch.setattr("src.agents.client.get_token_budgets", lambda: budgets)
+    monkeypatch.setattr("src.agents.client.get_local_model", lambda name: None)
+    monkeypatch.setattr("src.agents.client.get_hedger", lambda: None)
+    client = LLMClient(Architecture.B)
+    client.budgets = budgets
+    return client
+
+
+def test_truncated_json_is_retried_with_larger_budget(client):
+    client._client = ScriptedInference('{"id": "1", "story_points": 3, "rationale": "long"}', tokens=900)
+
+    with track_usage() as usage:
+        text = client._invoke_chat("m", [{"role": "user", "content": "plan"}], role="planner")
+
+    assert text.endswith("}")
+    assert client._client.max_tokens == [512, 1024]
+    assert usage.llm_calls == 2  # the truncated attempt is paid for too
+
+
+def test_learned_budget_is_used_and_complete_json_not_retried(client):
+    client._client = ScriptedInference('{"feedback": "ok", "reviewed_code": "print(1)"}', tokens=200)
+    for _ in range(2):
+        client._invoke_chat("m", [{"role": "user", "content": "review"}], role="reviewer")
+    assert client._client.max_tokens == [DEFAULT_MAX_TOKENS, DEFAULT_MAX_TOKENS]
+
+    client._invoke_chat("m", [{"role": "user", "content": "review"}], role="reviewer")
+    assert client._client.max_tokens[-1] == 250
+
+
+def test_cut_off_after_complete_json_is_not_retried(client):
+    code = '{"generated_code": "print(1)"}'
+    client._client = ScriptedInference(code + " Explanation: ...", tokens=300, truncated_text=code + " Expla")
+    client.budgets.record("developer", "m", 10)
+    client.budgets.record("developer", "m", 10)
+
+    text = client._invoke_chat("m", [{"role": "user", "content": "write"}], role="developer")
+
+    assert text == code + " Expla"
+    assert client._client.max_tokens == [128]
+
+
+def test_degenerate_completion_is_retried_only_once(client):
+    # Never finishes, whatever the budget
+    client._client = ScriptedInference("{", tokens=10**9, truncated_text='{"generated_code": "a a a')
+    for _ in range(2):
+        client.budgets.record("developer", "m", 480)
+
+    with track_usage() as usage:
+        client._invoke_chat("m", [{"role": "user", "content": "write"}], role="developer")
+
+    assert client._client.max_tokens == [600, 1200]
+    assert usage.llm_calls == 2
+
+
+def test_no_retry_once_the_task_budget_is_spent(client):
+    client._client = ScriptedInference('{"id": "1", "story_points": 3, "rationale": "long"}', tokens=900)
+
+    with track_usage(max_tokens=400) as usage:
+        client._invoke_chat("m", [{"role": "user", "content": "plan"}], role="planner")
+
+    assert client._client.max_tokens == [512]
+    assert usage.llm_calls == 1
+
+
+def test_nodes_pass_the_rest_of_the_task_budget_to_the_client():
+    budget = TaskBudget(max_tokens=1000, max_llm_calls=None, max_wall_seconds=None)
+    state = create_initial_state("apps_budget", "", budget=budget)
+
+    with nodes._charge_usage(state):
+        assert not allowance_exhausted()
+    state["total_tokens"] = 1000
+    with nodes._charge_usage(state):
+        assert allowance_exhausted()
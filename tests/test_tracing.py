@@ -0,0 +1,58 @@
+import json
+
+from src.agents.llm import Architecture
+from src.graph.graph import run_graph
+from src.utils.tracing import enable_tracing, disable_tracing
+from tests.fakes import FakeLLMClient, install_fake_client
+
+
+def _load_trace(path) -> list[dict]:
+    # Streamed traces are an unterminated JSON array
+    text = open(path, encoding="utf-8").read().rstrip().rstrip(",")
+    return json.loads(text + "]")
+
+
+def test_graph_run_emits_chrome_trace_spans(monkeypatch, tmp_path):
+    install_fake_client(monkeypatch, FakeLLMClient())
+    trace_path = tmp_path / "trace.json"
+    enable_tracing(str(trace_path))
+    try:
+        run_graph(
+            task_id="apps_trace",
+            task_description="Echo the input line.",
+            test_inputs=["1\n", "2\n"],
+            test_outputs=["1\n", "2\n"],
+            architecture=Architecture.B,
+        )
+    finally:
+        disable_tracing()
+
+    spans = [e for e in _load_trace(trace_path) if e["ph"] == "X"]
+    names = [e["name"] for e in spans]
+    assert names.count("tester.execute_code") == 2
+    for node in ("planner", "router", "developer", "reviewer", "tester"):
+        assert node in names
+
+    developer = next(e for e in spans if e["name"] == "developer")
+    assert developer["args"] == {"task_id": "apps_trace", "architecture": "B", "tier": "M", "retry": 0}
+
+    execution = next(e for e in spans if e["name"] == "tester.execute_code")
+    assert execution["args"]["task_id"] == "apps_trace"
+    assert execution["dur"] > 0
+
+
+def test_spans_are_on_disk_before_close_and_tagged_with_retries(monkeypatch, tmp_path):
+    # A syntax error is retried at the same tier: `escalations` stays 0, `retries` moves
+    monkeypatch.setenv("ESCALATION_POLICY", "failure_aware")
+    install_fake_client(monkeypatch, FakeLLMClient(story_points=1, code="print("))
+    trace_path = tmp_path / "trace.json"
+    enable_tracing(str(trace_path))
+    try:
+        run_graph("apps_trace", "Echo the input line.", ["1\n"], ["1\n"], architecture=Architecture.B)
+        # Not closed yet, as after a crash
+        spans = [e for e in _load_trace(trace_path) if e["ph"] == "X"]
+    finally:
+        disable_tracing()
+
+    developer = [(e["args"]["tier"], e["args"]["retry"]) for e in spans if e["name"] == "developer"]
+    assert developer[:2] == [("S", 0), ("S", 1)]
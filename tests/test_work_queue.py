@@ -0,0 +1,67 @@
+import time
+
+from src.data.task_loader import Task
+from src.data.work_queue import WorkQueue, shard_of, shard_tasks
+
+
+def _tasks(n: int) -> list[Task]:
+    return [Task(problem_id=i, question="", difficulty="interview", inputs=["1"], outputs=["1"]) for i in range(n)]
+
+
+def test_sharding_is_deterministic_and_partitions_tasks():
+    tasks = _tasks(50)
+    shards = [shard_tasks(tasks, i, 4) for i in range(4)]
+
+    assert sorted(t.problem_id for shard in shards for t in shard) == list(range(50))
+    assert shard_of("apps_7", 4) == shard_of("apps_7", 4)
+
+
+def test_queue_leases_each_item_once(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    assert queue.enqueue(_tasks(3), architectures=["B", "C"]) == 6
+    assert queue.enqueue(_tasks(3), architectures=["B", "C"]) == 0
+
+    other_worker = WorkQueue(queue.path)
+    leased = []
+    while True:
+        item = (queue if len(leased) % 2 else other_worker).lease(worker_id=f"w{len(leased)}")
+        if item is None:
+            break
+        leased.append((item.task_id, item.architecture))
+        queue.complete(item)
+
+    assert len(set(leased)) == 6
+    assert queue.counts() == {"done": 6}
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=0.05, max_attempts=2)
+    queue.enqueue(_tasks(1), architectures=["C"])
+
+    crashed = queue.lease(worker_id="crashed")
+    assert queue.lease(worker_id="other") is None
+    time.sleep(0.1)
+
+    retried = queue.lease(worker_id="other")
+    assert (retried.task_id, retried.attempts) == (crashed.task_id, 2)
+    queue.fail(retried, "boom")
+    assert queue.counts() == {"failed": 1}
+
+
+def test_stale_worker_cannot_touch_a_re_leased_item(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=0.05)
+    queue.enqueue(_tasks(1), architectures=["C"])
+
+    stale = queue.lease(worker_id="slow")
+    time.sleep(0.1)
+    current = queue.lease(worker_id="fast")
+
+    assert not queue.complete(stale)
+    assert not queue.fail(stale, "boom")
+    assert not queue.renew(stale)
+    assert queue.counts() == {"leased": 1}
+
+    assert queue.renew(current)
+    assert queue.complete(current)
+    assert queue.counts() == {"done": 1}
+    assert not queue.complete(current)